@@ -13,7 +13,11 @@ setup(
     install_requires=[
         "python-dateutil>=2.8.2",  # 依赖的python-dateutil库，版本号大于等于2.8.2
         "faker>=18.11.2",  # 依赖的faker库，版本号大于等于18.11.2
+        "numpy>=1.24.0",  # 依赖的numpy库，用于向量化批量生成
     ],
+    extras_require={
+        "parquet": ["pyarrow>=12.0.0"],  # 可选：Parquet 列式输出
+    },
     python_requires=">=3.8",  # 依赖的python版本号大于等于3.8
     classifiers=[
         "Programming Language :: Python :: 3",  # 编程语言为Python 3
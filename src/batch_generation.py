@@ -0,0 +1,333 @@
+"""
+模块名称：batch_generation.py
+模块职责：向量化批量生成职位数据（以NumPy数组一次性抽取N条记录的全部随机字段）
+作者：D.C.Y.
+创建时间：2026/10/18 10:12:30
+最后修改时间：2026/10/19 05:52:08
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import permutations
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from data_definitions import (
+    POSITION_ADVANTAGES,
+    GENERAL_TAGS,
+    COMPANY_TYPES,
+    FINANCE_STAGES,
+    COMPANY_SIZES,
+    EDUCATION_LEVELS,
+)
+from data_generation import allocate_unique_ids
+from knowledge_base import KnowledgeBase, builtin_knowledge_base
+from record_schema import JOB_TYPES, JOB_TYPE_PIECES, JobRow
+from weighted_sampling import AliasTable
+
+_DATE_SPAN_DAYS = 365  # 发布时间跨度：近一年
+
+_rng = np.random.default_rng()  # 模块默认随机数生成器
+
+# ---------------------------------------------------------------------------
+# 预编译查找表：只在导入时构建一次，批量生成时全部按下标取值
+# （公司、行业、福利、地址、薪资上下界和岗位要求来自知识库，见 knowledge_base）
+# ---------------------------------------------------------------------------
+_JOB_TYPES = list(JOB_TYPES)
+_PIECES = [JOB_TYPE_PIECES[job] for job in _JOB_TYPES]
+_COMPANY_TYPES = np.array(COMPANY_TYPES, dtype=object)
+_FINANCE_STAGES = np.array(FINANCE_STAGES, dtype=object)
+_COMPANY_SIZES = np.array(COMPANY_SIZES, dtype=object)
+_EDUCATION_LEVELS = np.array(EDUCATION_LEVELS, dtype=object)
+_POSITION_ADVANTAGES = np.array(POSITION_ADVANTAGES, dtype=object)
+_GENERAL_TAGS = np.array(GENERAL_TAGS, dtype=object)
+
+_JOB_TYPE_VALUES = np.array(_JOB_TYPES, dtype=object)
+_POSITION_NAMES = np.array([pieces.position_name for pieces in _PIECES], dtype=object)
+
+# 职位描述：三个要点的全排列（与 random.sample(..., 3) 等价），形状 (职位数, 6)
+_JOB_DESCRIPTION_POOL = np.array([
+    [pieces.description_prefix + "、".join(p) for p in permutations(pieces.description_points)]
+    for pieces in _PIECES
+], dtype=object)
+
+# 申请要求、额外标签按职位类型分组，形状 (职位数, 候选数)
+_APPLICATION_POOL = np.array([pieces.application_requirements for pieces in _PIECES], dtype=object)
+_EXTRA_TAG_POOL = np.array([pieces.extra_tags for pieces in _PIECES], dtype=object)
+
+# 技术标签的固定前缀：技术栈前三项 + 平台标签 + 认证标签
+_LABEL_PREFIXES = [pieces.label_prefix for pieces in _PIECES]
+
+# 薪资字符串表：下标 lower * 101 + upper
+_SALARY_STRINGS = np.array([f"{lower}k-{upper}k" for lower in range(101) for upper in range(101)], dtype=object)
+
+# 工作年限字符串表：下标 (起始年限-1) * 5 + (截止年限-4)
+_WORK_YEAR_STRINGS = np.array([f"{low}-{high}年" for low in range(1, 4) for high in range(4, 9)], dtype=object)
+
+
+def set_seed(seed: Optional[int]):
+    """
+    重置模块默认随机数生成器
+    :param seed: 随机种子，None表示使用系统熵
+    """
+    global _rng
+    _rng = np.random.default_rng(seed)
+
+
+def generate_batch_records(batch_size: int, rng: Optional[np.random.Generator] = None,
+                           position_ids: Optional[List[int]] = None,
+                           reference_date: Optional[date] = None,
+                           distributions: Optional[Dict[str, AliasTable]] = None,
+                           knowledge_base: Optional[KnowledgeBase] = None) -> List[Dict]:
+    """
+    向量化生成一批职位记录，字段分布与 data_generation.generate_job_record 一致
+    :param batch_size: 记录数量
+    :param rng: NumPy随机数生成器，默认使用模块级生成器
+    :param position_ids: 预先分配的职位ID（按页生成时由ID分配器按序号计算），默认在本进程内分配
+    :param reference_date: 发布时间的基准日期（近一年的截止日），默认当天
+    :param distributions: 字段名 -> 别名表（见 weighted_sampling），未配置的字段按均匀分布抽取
+    :param knowledge_base: 公司、行业、地址等目录所在的知识库，默认为内置知识库
+    :return: 职位记录列表
+    """
+    # 按列组装为记录字典：键顺序固定，每条记录只构造一个字典
+    records = []
+    for (company, short_name, company_type, finance_stage, company_size, industry, business_area, address,
+         position_name, first_type, education, work_year, salary, welfare, advantage, description,
+         requirement, application, position_id, create_time, label) in zip(
+            *_draw_columns(batch_size, rng, position_ids, reference_date, distributions, knowledge_base)):
+        record = {
+            "companyFullName": company,
+            "companyShortName": short_name,
+            "companyType": company_type,
+            "financeStage": finance_stage,
+            "companySize": company_size,
+            "industryField": industry,
+            "businessArea": business_area,
+            "workAddress": address,
+            "positionName": position_name,
+            "firstType": first_type,
+            "education": education,
+            "workYear": work_year,
+            "salary": salary,
+            "welfare": welfare,
+            "positionAdvantage": advantage,
+            "jobDescription": description,
+            "requirements": requirement,
+            "applicationRequirements": application,
+            "positionId": position_id,
+            "formatCreateTime": create_time
+        }
+        if label is not None:
+            record["positionLables"] = label
+        records.append(record)
+    return records
+
+
+def generate_batch_rows(batch_size: int, rng: Optional[np.random.Generator] = None,
+                        position_ids: Optional[List[int]] = None,
+                        reference_date: Optional[date] = None,
+                        distributions: Optional[Dict[str, AliasTable]] = None,
+                        knowledge_base: Optional[KnowledgeBase] = None) -> List[JobRow]:
+    """
+    向量化生成一批紧凑行形式的职位记录（元组，不为每条记录构造字典），内容与 generate_batch_records 相同
+    :param batch_size: 记录数量
+    :param rng: NumPy随机数生成器，默认使用模块级生成器
+    :param position_ids: 预先分配的职位ID，默认在本进程内分配
+    :param reference_date: 发布时间的基准日期，默认当天
+    :param distributions: 字段名 -> 别名表，未配置的字段按均匀分布抽取
+    :param knowledge_base: 知识库，默认为内置知识库
+    :return: 职位记录行列表
+    """
+    return list(map(JobRow, *_draw_columns(batch_size, rng, position_ids, reference_date, distributions,
+                                           knowledge_base)))
+
+
+def _draw_columns(batch_size: int, rng: Optional[np.random.Generator] = None,
+                  position_ids: Optional[List[int]] = None,
+                  reference_date: Optional[date] = None,
+                  distributions: Optional[Dict[str, AliasTable]] = None,
+                  knowledge_base: Optional[KnowledgeBase] = None) -> List[List]:
+    """
+    一次性抽取一批记录的全部字段
+    :param batch_size: 记录数量
+    :param rng: NumPy随机数生成器，默认使用模块级生成器
+    :param position_ids: 预先分配的职位ID，默认在本进程内分配
+    :param reference_date: 发布时间的基准日期，默认当天
+    :param distributions: 字段名 -> 别名表，未配置的字段按均匀分布抽取
+    :param knowledge_base: 知识库，默认为内置知识库
+    :return: 按 RECORD_FIELDS 顺序排列的各字段取值列表
+    """
+    rng = rng if rng is not None else _rng
+    n = batch_size
+    skew = distributions or {}
+    kb = knowledge_base if knowledge_base is not None else builtin_knowledge_base()
+
+    # 基础字段：全部以下标数组一次性抽取（配置了权重的字段改由别名表抽取）
+    job_idx = _draw_index(rng, n, len(_JOB_TYPES), skew.get("firstType"))
+    company_idx = _draw_index(rng, n, len(kb.companies), skew.get("companyFullName"))
+    company_names = kb.companies.take(company_idx)
+    short_names = kb.short_names.take(company_idx)
+    company_types = _COMPANY_TYPES[_draw_index(rng, n, len(_COMPANY_TYPES), skew.get("companyType"))].tolist()
+    finance_stages = _FINANCE_STAGES[_draw_index(rng, n, len(_FINANCE_STAGES), skew.get("financeStage"))].tolist()
+    company_sizes = _COMPANY_SIZES[_draw_index(rng, n, len(_COMPANY_SIZES), skew.get("companySize"))].tolist()
+    industry_fields = kb.industries.take(_draw_index(rng, n, len(kb.industries), skew.get("industryField")))
+    business_areas = _sample_rows(rng, kb.industries, rng.integers(1, 4, n), rng.random(n) > 0.1)
+    addresses = _draw_addresses(rng, n, kb, skew.get("workAddress"))
+    position_names = _POSITION_NAMES[job_idx].tolist()
+    first_types = _JOB_TYPE_VALUES[job_idx].tolist()
+    educations = _masked(_EDUCATION_LEVELS[_draw_index(rng, n, len(_EDUCATION_LEVELS), skew.get("education"))],
+                         rng.random(n) > 0.05)
+    work_years = _masked(
+        _WORK_YEAR_STRINGS[rng.integers(0, 3, n) * 5 + rng.integers(0, 5, n)], rng.random(n) > 0.05
+    )
+    salaries = _draw_salaries(rng, kb, company_idx, job_idx)
+    descriptions = _JOB_DESCRIPTION_POOL[job_idx, rng.integers(0, 6, n)].tolist()
+    position_ids = position_ids if position_ids is not None else allocate_unique_ids(n)
+    reference_date = reference_date if reference_date is not None else date.today()
+    create_times = _date_strings(reference_date.toordinal())[rng.integers(0, _DATE_SPAN_DAYS + 1, n)].tolist()
+
+    # 动态字段
+    welfares = _sample_rows(rng, kb.welfare, rng.integers(2, 6, n), rng.random(n) > 0.2)
+    advantages = _masked(_POSITION_ADVANTAGES[rng.integers(0, len(_POSITION_ADVANTAGES), n)], rng.random(n) > 0.3)
+    requirements = _masked(kb.requirements[job_idx], rng.random(n) > 0.1)
+    application_requirements = _sample_rows(
+        rng, _APPLICATION_POOL, rng.integers(2, 4, n), rng.random(n) > 0.2, group_idx=job_idx
+    )
+    labels = _draw_labels(rng, job_idx, rng.random(n) > 0.05)
+
+    return [company_names, short_names, company_types, finance_stages, company_sizes, industry_fields,
+            business_areas, addresses, position_names, first_types, educations, work_years, salaries, welfares,
+            advantages, descriptions, requirements, application_requirements, position_ids, create_times, labels]
+
+
+def _draw_index(rng: np.random.Generator, n: int, size: int, table: Optional[AliasTable]) -> np.ndarray:
+    """
+    抽取 n 个候选下标：未配置权重时均匀抽取（随机数流与不支持权重时完全相同），否则由别名表 O(1) 抽取
+    :param rng: 随机数生成器
+    :param n: 数量
+    :param size: 候选数
+    :param table: 别名表
+    :return: 下标数组
+    """
+    if table is None:
+        return rng.integers(0, size, n)
+    if len(table) != size:
+        raise ValueError(f"别名表的候选数 {len(table)} 与字段候选数 {size} 不一致")
+    return table.draw(rng, n)
+
+
+def _masked(values: np.ndarray, keep: np.ndarray) -> List:
+    """
+    按掩码将未保留的位置置为None
+    :param values: 取值数组（object类型）
+    :param keep: 布尔掩码，True表示保留
+    :return: 转换后的Python列表
+    """
+    return np.where(keep, values, None).tolist()
+
+
+def _sample_rows(rng: np.random.Generator, pool: Union[np.ndarray, Sequence], sizes: np.ndarray, keep: np.ndarray,
+                 group_idx: Optional[np.ndarray] = None) -> List:
+    """
+    每行从候选池中无放回有序抽样，与逐条调用 random.sample(pool, k) 同分布
+    :param rng: 随机数生成器
+    :param pool: 候选池，一维数组或知识库字符串表；或二维数组（配合 group_idx 按行选择分组）
+    :param sizes: 每行抽样数量
+    :param keep: 布尔掩码，False的行结果为None
+    :param group_idx: 每行所属分组下标
+    :return: 抽样结果列表
+    """
+    n, k = len(sizes), int(sizes.max(initial=0))
+    width = len(pool) if group_idx is None else pool.shape[-1]
+    # 稀疏的部分 Fisher-Yates 洗牌：第 i 步在 [i, width) 中随机取位置 j，取出 j 处的当前值，再把 i 处的当前值换到 j；
+    # 只记录被换过的位置，每行 O(k²)，与候选池大小无关（k 不超过5）
+    order = np.empty((n, k), dtype=np.int64)
+    swapped_at = np.empty((n, k), dtype=np.int64)
+    swapped_value = np.empty((n, k), dtype=np.int64)
+    for i in range(k):
+        j = rng.integers(i, width, n)
+        order[:, i] = _current_positions(j, swapped_at[:, :i], swapped_value[:, :i])
+        swapped_at[:, i] = j
+        swapped_value[:, i] = _current_positions(np.full(n, i), swapped_at[:, :i], swapped_value[:, :i])
+    if group_idx is None:
+        chosen = np.array(pool.take(order.ravel()), dtype=object).reshape(n, k)
+    else:
+        chosen = pool[group_idx[:, None], order]
+    return [row[:size] if flag else None for row, size, flag in zip(chosen.tolist(), sizes.tolist(), keep.tolist())]
+
+
+def _current_positions(positions: np.ndarray, swapped_at: np.ndarray, swapped_value: np.ndarray) -> np.ndarray:
+    """
+    部分洗牌后各位置上的当前候选下标：该位置被换过时取最后一次换入的值，否则为位置本身
+    :param positions: 每行要查询的位置
+    :param swapped_at: 每行已换过的位置（按步骤顺序）
+    :param swapped_value: 每次换入的候选下标
+    :return: 候选下标数组
+    """
+    if not swapped_at.shape[1]:
+        return positions
+    match = swapped_at == positions[:, None]
+    last = swapped_at.shape[1] - 1 - np.argmax(match[:, ::-1], axis=1)
+    return np.where(match.any(axis=1), swapped_value[np.arange(len(positions)), last], positions)
+
+
+def _draw_addresses(rng: np.random.Generator, n: int, kb: KnowledgeBase,
+                    city_table: Optional[AliasTable] = None) -> List[str]:
+    """
+    先选择城市（内置目录中每个地址模板即一个城市），再在该城市的枚举地址中均匀选择
+    :param rng: 随机数生成器
+    :param n: 数量
+    :param kb: 知识库（地址池及各城市在池中的偏移量和长度）
+    :param city_table: 城市的别名表，默认均匀选择
+    :return: 地址列表
+    """
+    template_idx = _draw_index(rng, n, len(kb.address_sizes), city_table)
+    sizes = kb.address_sizes[template_idx]
+    return kb.addresses.take(kb.address_offsets[template_idx] + (rng.random(n) * sizes).astype(np.int64))
+
+
+def _draw_salaries(rng: np.random.Generator, kb: KnowledgeBase, company_idx: np.ndarray,
+                   job_idx: np.ndarray) -> List[str]:
+    """
+    按公司与职位的薪资上下界表向量化生成薪资区间
+    :param rng: 随机数生成器
+    :param kb: 知识库（形如 (公司数, 职位数, 2) 的薪资上下界表）
+    :param company_idx: 公司下标数组
+    :param job_idx: 职位类型下标数组
+    :return: 薪资字符串列表
+    """
+    bounds = kb.salary_bounds[company_idx, job_idx].astype(np.int64)
+    min_salary = bounds[:, 0]
+    max_salary = bounds[:, 1]
+    lower = rng.integers(min_salary, max_salary - 5, endpoint=True)
+    upper = rng.integers(lower + 5, max_salary, endpoint=True)
+    return _SALARY_STRINGS[lower * 101 + upper].tolist()
+
+
+def _draw_labels(rng: np.random.Generator, job_idx: np.ndarray, keep: np.ndarray) -> List:
+    """
+    生成技术标签：固定前缀 + 3个额外标签 + 2个通用标签
+    :param rng: 随机数生成器
+    :param job_idx: 职位类型下标数组
+    :param keep: 布尔掩码，False的行结果为None
+    :return: 标签列表
+    """
+    n = len(job_idx)
+    extra_order = np.argsort(rng.random((n, _EXTRA_TAG_POOL.shape[1])), axis=1)[:, :3]
+    extra = _EXTRA_TAG_POOL[job_idx[:, None], extra_order].tolist()
+    general = _GENERAL_TAGS[np.argsort(rng.random((n, len(_GENERAL_TAGS))), axis=1)[:, :2]].tolist()
+    return [
+        [*_LABEL_PREFIXES[j], *e, *g] if flag else None
+        for j, e, g, flag in zip(job_idx.tolist(), extra, general, keep.tolist())
+    ]
+
+
+@lru_cache(maxsize=1)
+def _date_strings(today_ordinal: int) -> np.ndarray:
+    """
+    生成近一年内每一天的ISO日期字符串表
+    :param today_ordinal: 当天日期序数（作为缓存键，跨天自动刷新）
+    :return: 日期字符串数组，下标0为一年前，最后一项为当天
+    """
+    start = date.fromordinal(today_ordinal) - timedelta(days=_DATE_SPAN_DAYS)
+    return np.array([(start + timedelta(days=i)).isoformat() for i in range(_DATE_SPAN_DAYS + 1)], dtype=object)
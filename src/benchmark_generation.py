@@ -0,0 +1,280 @@
+"""
+模块名称：benchmark_generation.py
+模块职责：生成热路径基准测试：分阶段计时（逐条生成各环节、校验、JSON编码），统计吞吐、各阶段占比、内存峰值与垃圾回收耗时，
+         输出机器可读的JSON结果，并可与历史结果对比发现性能回退
+作者：D.C.Y.
+创建时间：2026/10/18 20:31:09
+最后修改时间：2026/10/19 05:31:16
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import data_generation
+from batch_generation import generate_batch_records
+from core_logic import generate_address, generate_salary
+from pipeline import validate_and_fix_data
+from sinks import encode_records
+
+try:
+    import resource  # 仅类Unix系统提供，用于读取进程内存峰值
+except ImportError:
+    resource = None
+
+BATCH_RECORDS = 10000  # 每批计时的记录数，大规模测试时按批生成并丢弃，内存占用不随规模增长
+PAGE_RECORDS = 1000  # 单文件（页）记录数，对应 README 中"单文件生成<500ms、峰值<50MB"的口径
+
+# 参与占比计算的阶段：逐条生成 + 校验 + 编码构成完整流水线；parent 表示该阶段的耗时已包含在上级阶段中
+STAGES = [
+    ("generate_job_record", None),
+    ("_build_base_record", "generate_job_record"),
+    ("generate_salary", "_build_base_record"),
+    ("generate_address", "_build_base_record"),
+    ("faker_date_between", "_build_base_record"),
+    ("_generate_unique_id", "_build_base_record"),
+    ("_add_dynamic_fields", "generate_job_record"),
+    ("validate_and_fix_data", None),
+    ("json_encoding", None),
+    ("generate_batch_records", "batch"),  # 向量化批量生成引擎，作为逐条生成的对照，不计入占比
+]
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    主执行函数
+    :param argv: 命令行参数，默认读取 sys.argv
+    """
+    args = parse_args(argv)
+    data_generation.set_seed(args.seed, id_width=10)  # 千万级规模超出默认7位ID空间
+    random.seed(args.seed)
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "page": measure_page(),
+        "scales": [],
+    }
+    print(f"单文件（{PAGE_RECORDS}条）生成+校验+编码: {results['page']['seconds'] * 1000:.0f}ms, "
+          f"Python堆峰值 {results['page']['peak_traced_bytes'] / (1 << 20):.1f}MB")
+    for records in args.scales:
+        scale = measure_scale(records)
+        results["scales"].append(scale)
+        print_scale(scale)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n基准测试结果已写入 {args.output}")
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            raise SystemExit(1)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    解析命令行参数
+    :param argv: 命令行参数列表
+    :return: 解析结果
+    """
+    parser = argparse.ArgumentParser(description="生成热路径基准测试")
+    parser.add_argument("--scales", type=lambda text: [parse_count(part) for part in text.split(",")],
+                        default=[1000, 100000], help="测试规模（记录数），逗号分隔，支持 k/M 后缀（默认 1k,100k；10M 需数十分钟）")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子（默认42）")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON结果输出路径（默认 benchmark_results.json）")
+    parser.add_argument("--baseline", help="用于对比的历史结果JSON，任一阶段吞吐下降超过容差时以状态码1退出")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="允许的吞吐下降比例（默认0.1，即10%%）")
+    return parser.parse_args(argv)
+
+
+def parse_count(text: str) -> int:
+    """
+    解析记录数，支持 k/M 后缀，如 "1k"、"100k"、"10M"
+    :param text: 记录数字符串
+    :return: 记录数
+    """
+    text = text.strip()
+    multiplier = {"k": 1000, "K": 1000, "m": 1000000, "M": 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if multiplier > 1 else text) * multiplier)
+
+
+def measure_scale(records: int) -> Dict:
+    """
+    在指定规模下逐阶段计时
+    :param records: 记录数
+    :return: 该规模的测试结果
+    """
+    seconds = {name: 0.0 for name, _ in STAGES}
+    gc_timer = GcTimer()
+    gc.callbacks.append(gc_timer)
+    try:
+        _measure_batches(records, seconds)
+    finally:
+        gc.callbacks.remove(gc_timer)
+
+    pipeline_seconds = sum(seconds[name] for name, parent in STAGES if parent is None)
+    stages = {}
+    for name, parent in STAGES:
+        stages[name] = {
+            "seconds": round(seconds[name], 6),
+            "records_per_sec": round(records / seconds[name], 1) if seconds[name] else None,
+            "share": round(seconds[name] / pipeline_seconds, 4) if parent != "batch" and pipeline_seconds else None,
+            "parent": parent,
+        }
+    return {
+        "records": records,
+        "pipeline_seconds": round(pipeline_seconds, 6),
+        "pipeline_records_per_sec": round(records / pipeline_seconds, 1) if pipeline_seconds else None,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "gc_seconds": round(gc_timer.seconds, 6),
+        "gc_collections": gc_timer.collections,
+        "stages": stages,
+    }
+
+
+def _measure_batches(records: int, seconds: Dict[str, float]):
+    """
+    按批生成并逐阶段累计耗时
+    :param records: 记录数
+    :param seconds: 各阶段累计耗时
+    """
+    for start in range(0, records, BATCH_RECORDS):
+        count = min(BATCH_RECORDS, records - start)
+        batch = _timed(seconds, "generate_job_record", lambda: [data_generation.generate_job_record()
+                                                                for _ in range(count)])
+        job_types = [record["firstType"] for record in batch]
+        companies = [record["companyFullName"] for record in batch]
+        _timed(seconds, "_build_base_record", lambda: [data_generation._build_base_record(job_type)
+                                                       for job_type in job_types])
+        _timed(seconds, "generate_salary", lambda: [generate_salary(job_type, company)
+                                                    for job_type, company in zip(job_types, companies)])
+        _timed(seconds, "generate_address", lambda: [generate_address() for _ in range(count)])
+        faker = data_generation.get_faker()
+        _timed(seconds, "faker_date_between", lambda: [faker.date_between(start_date="-1y").isoformat()
+                                                       for _ in range(count)])
+        _timed(seconds, "_generate_unique_id", lambda: [data_generation._generate_unique_id() for _ in range(count)])
+        _timed(seconds, "_add_dynamic_fields", lambda: [data_generation._add_dynamic_fields(record, job_type)
+                                                        for record, job_type in zip(batch, job_types)])
+        validated = _timed(seconds, "validate_and_fix_data", lambda: validate_and_fix_data(batch))
+        _timed(seconds, "json_encoding", lambda: encode_records(validated))
+        _timed(seconds, "generate_batch_records", lambda: generate_batch_records(count))
+
+
+def measure_page() -> Dict:
+    """
+    测量单文件（一页）逐条生成、校验、编码的耗时与Python堆内存峰值
+    :return: 单文件测试结果
+    """
+    start = time.perf_counter()
+    encode_records(validate_and_fix_data([data_generation.generate_job_record() for _ in range(PAGE_RECORDS)]))
+    seconds = time.perf_counter() - start
+
+    # 内存峰值单独再跑一遍，避免 tracemalloc 的开销计入耗时
+    tracemalloc.start()
+    payload = encode_records(validate_and_fix_data([data_generation.generate_job_record()
+                                                    for _ in range(PAGE_RECORDS)]))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"records": PAGE_RECORDS, "seconds": round(seconds, 6), "bytes": len(payload), "peak_traced_bytes": peak}
+
+
+def compare_with_baseline(results: Dict, baseline_path: str, tolerance: float) -> List[str]:
+    """
+    与历史结果逐规模、逐阶段对比吞吐
+    :param results: 本次结果
+    :param baseline_path: 历史结果JSON路径
+    :param tolerance: 允许的吞吐下降比例
+    :return: 发生回退的"规模/阶段"列表
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {scale["records"]: scale for scale in json.load(f)["scales"]}
+    regressions = []
+    print(f"\n与基线 {baseline_path} 对比（容差 {tolerance:.0%}）:")
+    for scale in results["scales"]:
+        previous = baseline.get(scale["records"])
+        if previous is None:
+            continue
+        for name, stage in scale["stages"].items():
+            old = previous["stages"].get(name, {}).get("records_per_sec")
+            new = stage["records_per_sec"]
+            if not old or not new:
+                continue
+            change = new / old - 1
+            flag = "回退" if change < -tolerance else ""
+            if flag:
+                regressions.append(f"{scale['records']}/{name}")
+            print(f"  {scale['records']:>10,} {name:<24}{old:>14,.0f} -> {new:>14,.0f} 条/秒 {change:+7.1%} {flag}")
+    print(f"共 {len(regressions)} 项性能回退" if regressions else "未发现性能回退")
+    return regressions
+
+
+def print_scale(scale: Dict):
+    """
+    输出一个规模的测试结果表格
+    :param scale: 该规模的测试结果
+    """
+    rss = scale["peak_rss_bytes"]
+    print(f"\n规模 {scale['records']:,} 条：流水线 {scale['pipeline_records_per_sec']:,.0f} 条/秒"
+          + (f"，进程内存峰值 {rss / (1 << 20):.1f}MB" if rss else "")
+          + f"，垃圾回收 {scale['gc_collections']} 次共 {scale['gc_seconds']:.3f}s")
+    print(f"  {'阶段':<26}{'耗时(s)':>10}{'条/秒':>14}{'占比':>8}")
+    for name, parent in STAGES:
+        stage = scale["stages"][name]
+        indent = "  " if parent not in (None, "batch", "generate_job_record") else ""
+        share = f"{stage['share']:.1%}" if stage["share"] is not None else "-"
+        print(f"  {indent + name:<26}{stage['seconds']:>10.3f}{stage['records_per_sec'] or 0:>14,.0f}{share:>8}")
+
+
+class GcTimer:
+    """
+    垃圾回收计时器：注册到 gc.callbacks 后累计每次回收的停顿时间和次数
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.collections = 0
+        self._start = 0.0
+
+    def __call__(self, phase: str, info: Dict):
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self.seconds += time.perf_counter() - self._start
+            self.collections += 1
+
+
+def _timed(seconds: Dict[str, float], name: str, stage: Callable[[], object]) -> object:
+    """
+    执行并累计某一阶段的耗时
+    :param seconds: 各阶段累计耗时
+    :param name: 阶段名
+    :param stage: 阶段函数
+    :return: 阶段函数的返回值
+    """
+    start = time.perf_counter()
+    result = stage()
+    seconds[name] += time.perf_counter() - start
+    return result
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """
+    读取进程常驻内存峰值
+    :return: 字节数，当前系统不支持时返回 None
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux 以KB为单位，macOS 以字节为单位
+
+
+if __name__ == "__main__":
+    main()
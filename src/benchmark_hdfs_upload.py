@@ -0,0 +1,113 @@
+"""
+模块名称：benchmark_hdfs_upload.py
+模块职责：基于本地 WebHDFS 替身服务压测 HDFS 上传流程，输出不同并发度下的端到端吞吐（条/秒、MB/秒）
+作者：D.C.Y.
+创建时间：2026/10/18 18:32:05
+最后修改时间：2026/10/19 05:24:37
+"""
+import argparse
+import contextlib
+import io
+import time
+from typing import List, Optional
+
+import generate_data_to_upload_to_hdfs as hdfs_generator
+from batch_generation import generate_batch_records
+from local_webhdfs import LocalWebHdfsServer
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    主执行函数
+    :param argv: 命令行参数，默认读取 sys.argv
+    """
+    args = parse_args(argv)
+    records = args.page_count * args.page_size
+    print(f"压测参数: {args.page_count}页 × {args.page_size}条, 请求延迟 {args.latency * 1000:.0f}ms, "
+          f"错误率 {args.error_rate:.0%}, 生成进程数 {args.workers}")
+    print(f"{'上传方式':<24}{'耗时(s)':>10}{'条/秒':>12}{'MB/秒':>10}{'注入错误':>10}")
+
+    with LocalWebHdfsServer(latency=args.latency, error_rate=args.error_rate, error_seed=args.seed,
+                            keep_data=False) as server:
+        if not args.skip_serial:
+            elapsed = run_serial(server, args)
+            print_row("逐页串行 upload_data_to_hdfs", elapsed, records, server)
+        for concurrency in args.concurrency:
+            elapsed = run_concurrent(server, args, concurrency)
+            print_row(f"并发上传 ×{concurrency}", elapsed, records, server)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    解析命令行参数
+    :param argv: 命令行参数列表
+    :return: 解析结果
+    """
+    parser = argparse.ArgumentParser(description="使用本地 WebHDFS 替身服务压测 HDFS 上传吞吐")
+    parser.add_argument("--concurrency", type=lambda text: [int(c) for c in text.split(",")], default=[1, 2, 4, 8],
+                        help="要测试的并发上传数，逗号分隔（默认 1,2,4,8）")
+    parser.add_argument("--page-count", type=int, default=30, help="上传页数（默认30）")
+    parser.add_argument("--page-size", type=int, default=1000, help="每页记录数（默认1000）")
+    parser.add_argument("--workers", type=int, default=1, help="数据生成进程数（默认1）")
+    parser.add_argument("--latency", type=float, default=0.02, help="替身服务每个请求的延迟秒数（默认0.02）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="替身服务写入失败的概率（默认0）")
+    parser.add_argument("--seed", type=int, default=42, help="数据与错误注入的随机种子（默认42）")
+    parser.add_argument("--skip-serial", action="store_true", help="跳过逐页串行上传的基线测试")
+    return parser.parse_args(argv)
+
+
+def run_serial(server: LocalWebHdfsServer, args: argparse.Namespace) -> float:
+    """
+    基线：逐页生成后调用 upload_data_to_hdfs 串行上传
+    :param server: 替身服务
+    :param args: 压测参数
+    :return: 耗时（秒）
+    """
+    client = hdfs_generator.create_hdfs_client(server.url)
+    server.reset_counters()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for file_index in range(1, args.page_count + 1):
+            hdfs_generator.upload_data_to_hdfs(file_index, client, generate_batch_records(args.page_size))
+    return time.perf_counter() - start
+
+
+def run_concurrent(server: LocalWebHdfsServer, args: argparse.Namespace, concurrency: int) -> float:
+    """
+    完整运行 HDFS 生成器主流程（流式生成 + 并发上传 + 失败重试）
+    :param server: 替身服务
+    :param args: 压测参数
+    :param concurrency: 并发上传数
+    :return: 耗时（秒）
+    """
+    argv = [
+        "--hdfs-url", server.url, "--page-count", str(args.page_count), "--page-size", str(args.page_size),
+        "--workers", str(args.workers), "--seed", str(args.seed), "--upload-workers", str(concurrency),
+        "--retry-backoff", "0.05",
+    ]
+    server.reset_counters()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            hdfs_generator.main(argv)
+        except SystemExit:
+            # 重试耗尽的页面只影响结果统计，不中断压测
+            pass
+    return time.perf_counter() - start
+
+
+def print_row(label: str, elapsed: float, records: int, server: LocalWebHdfsServer):
+    """
+    输出一行压测结果
+    :param label: 上传方式
+    :param elapsed: 耗时（秒）
+    :param records: 记录数
+    :param server: 替身服务（提供实际接收的字节数）
+    """
+    megabytes = server.bytes_received / (1 << 20)
+    print(f"{label:<24}{elapsed:>10.2f}{records / elapsed:>12,.0f}{megabytes / elapsed:>10.1f}"
+          f"{server.injected_errors:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+模块名称：checkpoint.py
+模块职责：运行断点：记录已提交的页（或滚动输出的文件边界）、失败页及随机种子/职位ID密钥等状态，中断后重新运行时跳过已完成的部分并从断点继续
+作者：D.C.Y.
+创建时间：2026/10/18 22:40:12
+最后修改时间：2026/10/19 01:43:26
+"""
+import argparse
+import json
+import os
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from parallel_generation import format_page_ranges, parse_date, parse_page_ranges
+from pipeline import RollingState, RollingWriter
+
+CHECKPOINT_VERSION = 1
+
+# 决定输出内容与文件布局的参数，断点续跑时必须与首次运行一致
+FINGERPRINT_ARGUMENTS = (
+    "page_count", "page_size", "pages", "roll_size", "roll_records", "max_bytes", "format", "compress",
+    "compress_level", "row_group_size", "id_width", "id_offset", "output_dir", "hdfs_url", "hdfs_dir", "shard", "shards",
+    "skew", "zipf", "knowledge_base",
+)
+
+
+class RunCheckpoint:
+    """
+    运行断点，保存为本地JSON文件。
+
+    - 种子、基准日期和职位ID密钥在首次运行时确定并写入断点，续跑时生成的数据与不中断时逐字节一致；
+    - 按页输出时记录已提交的页，续跑时只生成其余页；页面先写临时文件再改名，断点中的页一定是完整的；
+    - 滚动输出时记录已提交文件之后下一条记录在生成流中的位置，续跑时从该位置继续生成；
+    - 断点文件先写临时文件再替换，任何时刻中断都不会损坏断点；所有方法可在上传线程中调用。
+    """
+
+    def __init__(self, path: str, fingerprint: Dict, seed: int, run_key: int, reference_date: date,
+                 pages: Iterable[int] = (), failed_pages: Optional[Dict[int, str]] = None,
+                 rolling: Optional[RollingState] = None, completed: bool = False):
+        """
+        :param path: 断点文件路径
+        :param fingerprint: 决定输出内容的运行参数
+        :param seed: 随机种子
+        :param run_key: 职位ID分配密钥
+        :param reference_date: 数据基准日期
+        :param pages: 已提交的页码
+        :param failed_pages: 失败页码及其错误信息
+        :param rolling: 滚动输出已提交到的文件边界
+        :param completed: 运行是否已全部完成
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self.seed = seed
+        self.run_key = run_key
+        self.reference_date = reference_date
+        self.pages = set(pages)
+        self.failed_pages: Dict[int, str] = failed_pages or {}
+        self.rolling = rolling
+        self.completed = completed
+        self._failed_now = set()  # 本次运行中失败的页，之后的完成回调不能将其记为已提交
+        self._closed: Dict[int, RollingState] = {}  # 已写完、尚未确认上传成功的滚动文件
+        self._confirmed = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: str, args: argparse.Namespace) -> "RunCheckpoint":
+        """
+        打开断点文件（不存在时新建），并将其中的种子、基准日期和职位ID密钥回填到运行参数中
+        :param path: 断点文件路径
+        :param args: 命令行解析结果（会被修改）
+        :return: 运行断点
+        """
+        # 经一次JSON往返，使元组等取值与从断点文件读回的形式一致
+        fingerprint = json.loads(json.dumps({name: getattr(args, name, None) for name in FINGERPRINT_ARGUMENTS}))
+        if not os.path.exists(path):
+            # 未指定种子时也固定一个随机种子，中断后才能生成完全相同的剩余数据
+            seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+            run_key = args.run_key if args.run_key is not None else seed
+            checkpoint = cls(path, fingerprint, seed, run_key, args.date or date.today())
+            checkpoint.save()
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CHECKPOINT_VERSION:
+                raise ValueError(f"不支持的断点文件版本: {data.get('version')}")
+            changed = [name for name in FINGERPRINT_ARGUMENTS if data["fingerprint"].get(name) != fingerprint[name]]
+            if changed:
+                raise ValueError(f"运行参数与断点文件不一致: {', '.join(changed)}")
+            checkpoint = cls(path, data["fingerprint"], data["seed"], data["run_key"], parse_date(data["date"]),
+                             parse_page_ranges(data["pages"]) if data["pages"] else (),
+                             {int(page): error for page, error in data["failed_pages"].items()},
+                             RollingState(*data["rolling"]) if data["rolling"] else None, data["completed"])
+            for name, value in (("seed", checkpoint.seed), ("run_key", checkpoint.run_key),
+                                ("date", checkpoint.reference_date)):
+                if getattr(args, name) is not None and getattr(args, name) != value:
+                    raise ValueError(f"--{name.replace('_', '-')} 与断点文件中的值 {value} 不一致")
+        args.seed, args.run_key, args.date = checkpoint.seed, checkpoint.run_key, checkpoint.reference_date
+        return checkpoint
+
+    def save(self):
+        """
+        保存断点：先写临时文件，再替换正式文件
+        """
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "fingerprint": self.fingerprint,
+            "seed": self.seed,
+            "run_key": self.run_key,
+            "date": self.reference_date.strftime("%Y%m%d"),
+            "pages": format_page_ranges(self.pages),
+            "failed_pages": {str(page): error for page, error in sorted(self.failed_pages.items())},
+            "rolling": list(self.rolling) if self.rolling else None,
+            "completed": self.completed,
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def remaining(self, pages: Iterable[int]) -> List[int]:
+        """
+        过滤出尚未提交的页
+        :param pages: 本次运行的全部页码
+        :return: 需要生成的页码
+        """
+        return [page for page in pages if page not in self.pages]
+
+    def commit_page(self, page_index: int):
+        """
+        记录一页已完整写入（本次运行中失败的页忽略）
+        :param page_index: 页码
+        """
+        with self._lock:
+            if page_index in self._failed_now:
+                return
+            self.pages.add(page_index)
+            self.failed_pages.pop(page_index, None)
+            self.save()
+
+    def record_failure(self, page_index: int, error: Exception):
+        """
+        记录一页写入或上传失败，续跑时重新生成
+        :param page_index: 页码（或滚动输出的文件序号）
+        :param error: 异常
+        """
+        with self._lock:
+            self._failed_now.add(page_index)
+            self.failed_pages[page_index] = str(error)
+            self.save()
+
+    def close_file(self, writer: RollingWriter):
+        """
+        记录滚动输出的一个文件已写完（尚未确认持久化）
+        :param writer: 滚动写入器，刚写完的文件序号为 writer.files_written
+        """
+        state = writer.state()
+        if state is None:
+            # 生成流结束时关闭的最后一个文件，之后不再有续跑位置
+            return
+        with self._lock:
+            self._closed[state.files_written] = state
+
+    def confirm_file(self, file_index: int):
+        """
+        确认滚动输出的一个文件已持久化（如上传成功），从已提交边界起连续确认的文件依次推进断点
+        :param file_index: 文件序号
+        """
+        with self._lock:
+            self._confirmed.add(file_index)
+            advanced = False
+            while True:
+                next_index = (self.rolling.files_written if self.rolling else 0) + 1
+                if next_index not in self._confirmed or next_index not in self._closed:
+                    break
+                self.rolling = self._closed.pop(next_index)
+                self._confirmed.discard(next_index)
+                advanced = True
+            if advanced:
+                self.save()
+
+    def commit_file(self, writer: RollingWriter):
+        """
+        记录滚动输出的一个文件已写完并持久化（本地输出关闭文件即提交）
+        :param writer: 滚动写入器
+        """
+        self.close_file(writer)
+        self.confirm_file(writer.files_written)
+
+    def finish(self):
+        """
+        运行结束：本次没有失败时标记为已完成
+        """
+        with self._lock:
+            self.completed = not self._failed_now
+            self.save()
+
+
+def open_run_checkpoint(args: argparse.Namespace) -> Optional[RunCheckpoint]:
+    """
+    按 --checkpoint 参数打开运行断点
+    :param args: 命令行解析结果（会回填种子、基准日期和职位ID密钥）
+    :return: 运行断点，未指定 --checkpoint 时返回 None
+    """
+    if not args.checkpoint:
+        return None
+    try:
+        checkpoint = RunCheckpoint.open(args.checkpoint, args)
+    except ValueError as e:
+        raise SystemExit(f"断点文件 {args.checkpoint} 无法续跑: {e}")
+    if checkpoint.pages or checkpoint.rolling:
+        print(f"从断点 {args.checkpoint} 继续（种子 {checkpoint.seed}）")
+    return checkpoint
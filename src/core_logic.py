@@ -3,11 +3,55 @@
 模块职责：负责核心业务逻辑处理
 作者：D.C.Y.
 创建时间：2025/03/14 15:35:12
-最后修改时间：2025/03/21 23:59:20
+最后修改时间：2026/10/19 06:24:13
 """
 
 import random
-from typing import Dict, Tuple
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from data_definitions import (
+    ADDRESS_TEMPLATES,
+    BIGDATA_COMPANIES,
+    PROVINCE_SALARY_RANGES,
+    REGION_CLASSIFICATION,
+    TECH_REQUIREMENTS,
+)
+from region_resolver import KeywordMatcher
+from weighted_sampling import AliasTable
+
+# 互联网巨头关键词（优先于城市匹配）
+_GIANT_KEYWORDS = ("阿里", "腾讯", "百度", "字节", "华为", "京东", "美团", "拼多多")
+
+# 城市 -> (地区, 省份)，按 REGION_CLASSIFICATION 的顺序匹配
+_CITY_REGIONS = tuple(
+    (city, region, city if city in ["上海", "香港", "澳门"] else f"{city}省")
+    for city, region in REGION_CLASSIFICATION.items()
+)
+
+# 地区匹配自动机：巨头关键词优先，其次按城市顺序，与逐个子串判断的首个匹配结果一致
+_REGION_MATCHER = KeywordMatcher(list(_GIANT_KEYWORDS) + [city for city, _, _ in _CITY_REGIONS])
+_REGION_RESULTS = [("巨头", "巨头")] * len(_GIANT_KEYWORDS) + [(region, province) for _, region, province in _CITY_REGIONS]
+_UNRESOLVED_REGION = ("其他", "其他")
+_COMPANY_REGIONS: Dict[str, Tuple[str, str]] = {}  # 公司 -> (地区, 省份) 解析缓存
+
+# 职位类型系数
+_JOB_COEFFICIENTS = {
+    "大数据开发": 1.0,
+    "数据架构": 1.15,
+    "数据分析": 0.9,
+    "数据挖掘": 1.05,
+    "数据科学家": 1.25
+}
+
+# 地区调节系数
+_REGION_FACTORS = {
+    "长三角": 1.15,
+    "珠三角": 1.10,
+    "港澳": 1.30,
+    "巨头": 1.25,
+    "其他": 1.0
+}
 
 
 def generate_salary(job_type: str, company_name: str) -> str:
@@ -18,6 +62,33 @@ def generate_salary(job_type: str, company_name: str) -> str:
     :param company_name: 公司全称
     :return: 薪资范围字符串，格式为"xk-yk"
     """
+    salaries, table = _salary_pool(*salary_bounds(job_type, company_name))
+    return salaries[table.sample()]
+
+
+def salary_bounds(job_type: str, company_name: str) -> Tuple[int, int]:
+    """
+    查询职位类型和公司对应的薪资上下界（不含随机部分）。
+
+    :param job_type: 职位类型
+    :param company_name: 公司全称
+    :return: 薪资下界和上界的元组（单位：k）
+    """
+    bounds = _SALARY_BOUNDS.get((company_name, job_type))
+    if bounds is None:
+        # 公司库之外的公司按需计算并缓存
+        bounds = _SALARY_BOUNDS[(company_name, job_type)] = compute_salary_bounds(job_type, company_name)
+    return bounds
+
+
+def compute_salary_bounds(job_type: str, company_name: str) -> Tuple[int, int]:
+    """
+    计算职位类型和公司对应的薪资上下界。
+
+    :param job_type: 职位类型
+    :param company_name: 公司全称
+    :return: 薪资下界和上界的元组（单位：k）
+    """
     # 解析公司所在地区和省份
     region, province = _parse_company_region(company_name)
 
@@ -35,34 +106,68 @@ def generate_salary(job_type: str, company_name: str) -> str:
     # 边界保护，确保薪资范围在合理区间内
     min_salary = max(15, min_salary)
     max_salary = min(100, max(max_salary, min_salary + 5))
+    return min_salary, max_salary
 
-    # 生成合理区间
-    lower = random.randint(min_salary, max_salary - 5)
-    upper = random.randint(lower + 5, max_salary)
-    return f"{lower}k-{upper}k"
 
+@lru_cache(maxsize=None)
+def _salary_pool(min_salary: int, max_salary: int) -> Tuple[List[str], AliasTable]:
+    """
+    枚举给定上下界下所有可能的薪资区间，并按各区间的概率构建别名表（每次抽取 O(1)）。
+    下界在 [min, max-5] 中均匀选取，上界在 [下界+5, max] 中均匀选取。
 
-def _parse_company_region(company_name: str) -> Tuple[str, str]:
+    :param min_salary: 薪资下界
+    :param max_salary: 薪资上界
+    :return: 薪资字符串列表和对应的别名表
     """
-    解析公司所属地区和省份。
+    salaries, weights = [], []
+    lower_count = max_salary - 5 - min_salary + 1
+    for lower in range(min_salary, max_salary - 4):
+        upper_count = max_salary - lower - 5 + 1
+        for upper in range(lower + 5, max_salary + 1):
+            salaries.append(f"{lower}k-{upper}k")
+            weights.append(1.0 / (lower_count * upper_count))
+    return salaries, AliasTable(weights)
+
+
+def register_companies(companies: Iterable[str]) -> List[str]:
+    """
+    预编译自定义公司库：一次性解析每家公司的地区并生成薪资上下界表。
+
+    :param companies: 公司全称序列
+    :return: 未能解析出地区的公司（按"其他"地区处理）
+    """
+    unresolved = []
+    for company in companies:
+        if _parse_company_region(company) is _UNRESOLVED_REGION:
+            unresolved.append(company)
+        for job_type in TECH_REQUIREMENTS:
+            salary_bounds(job_type, company)
+    return unresolved
+
+
+def company_region(company_name: str) -> str:
+    """
+    公司所属地区（与计算薪资时使用的地区一致：巨头公司为"巨头"，无法解析时为"其他"）。
 
     :param company_name: 公司全称
-    :return: 地区和省份的元组
+    :return: 地区
     """
-    from data_definitions import REGION_CLASSIFICATION, BIGDATA_COMPANIES
+    return _parse_company_region(company_name)[0]
 
-    # 优先匹配互联网巨头
-    for keyword in ["阿里", "腾讯", "百度", "字节", "华为", "京东", "美团", "拼多多"]:
-        if keyword in company_name:
-            return ("巨头", "巨头")
 
-    # 匹配城市区域
-    for city in REGION_CLASSIFICATION:
-        if city in company_name:
-            province = city if city in ["上海", "香港", "澳门"] else f"{city}省"
-            return (REGION_CLASSIFICATION[city], province)
+def _parse_company_region(company_name: str) -> Tuple[str, str]:
+    """
+    解析公司所属地区和省份（巨头关键词优先，其次匹配城市）。
 
-    return ("其他", "其他")
+    :param company_name: 公司全称
+    :return: 地区和省份的元组
+    """
+    regions = _COMPANY_REGIONS.get(company_name)
+    if regions is None:
+        index = _REGION_MATCHER.first_match(company_name)
+        regions = _REGION_RESULTS[index] if index >= 0 else _UNRESOLVED_REGION
+        _COMPANY_REGIONS[company_name] = regions
+    return regions
 
 
 def _get_base_range(job_type: str, province: str) -> Tuple[int, int]:
@@ -73,16 +178,8 @@ def _get_base_range(job_type: str, province: str) -> Tuple[int, int]:
     :param province: 省份
     :return: 基准薪资范围的元组
     """
-    from data_definitions import PROVINCE_SALARY_RANGES
-
     # 职位类型系数
-    job_coefficient = {
-        "大数据开发": 1.0,
-        "数据架构": 1.15,
-        "数据分析": 0.9,
-        "数据挖掘": 1.05,
-        "数据科学家": 1.25
-    }.get(job_type, 1.0)
+    job_coefficient = _JOB_COEFFICIENTS.get(job_type, 1.0)
 
     # 获取省份基准薪资范围
     base_min, base_max = PROVINCE_SALARY_RANGES.get(province, (18, 45))
@@ -101,13 +198,7 @@ def _apply_region_factor(base_range: Tuple[int, int], region: str) -> Tuple[int,
     :param region: 地区
     :return: 调节后的薪资范围
     """
-    region_factor = {
-        "长三角": 1.15,
-        "珠三角": 1.10,
-        "港澳": 1.30,
-        "巨头": 1.25,
-        "其他": 1.0
-    }.get(region, 1.0)
+    region_factor = _REGION_FACTORS.get(region, 1.0)
 
     return (
         int(base_range[0] * region_factor),
@@ -115,37 +206,61 @@ def _apply_region_factor(base_range: Tuple[int, int], region: str) -> Tuple[int,
     )
 
 
-def generate_address() -> str:
+def generate_address(template_index: Optional[int] = None) -> str:
     """
-    增强版地址生成器，增加区域编号校验。
+    增强版地址生成器，从预先枚举的地址池中按模板等概率抽取。
 
+    :param template_index: 指定地址模板（城市）的下标时，只在该模板的地址中等概率抽取
     :return: 生成的地址字符串
     """
-    from data_definitions import ADDRESS_TEMPLATES
+    if template_index is not None:
+        return random.choice(_ADDRESS_GROUPS[template_index])
+    return _ADDRESS_POOL[_ADDRESS_TABLE.sample()]
 
-    try:
-        template = random.choice(ADDRESS_TEMPLATES)
-        if "软件园" in template:
-            # 生成更合理的园区编号
-            phase = _generate_phase_number(template)
-            building = random.randint(101, 199) if "大厦" in template else random.randint(1, 50)
-            return template.format(phase, building)
-        elif "科技园" in template:
-            return template.format(random.randint(1, 20))
-        return template.format(random.randint(1, 99))
-    except Exception as e:
-        return "北京市海淀区中关村大街1号"
 
-
-def _generate_phase_number(template: str) -> int:
+def enumerate_address_template(template: str) -> List[str]:
     """
-    生成合理的园区期数。
+    枚举地址模板所有可能的取值，列表中每个地址的出现概率相同。
+    软件园按期数和楼栋编号（厦门1-3期、深圳1-2期、其他1-5期），科技园编号1-20，其余编号1-99。
 
     :param template: 地址模板
-    :return: 园区期数
+    :return: 该模板可生成的全部地址列表
+    """
+    if "软件园" in template:
+        if "厦门" in template:
+            phases = [1, 2, 3]
+        elif "深圳" in template:
+            phases = [1, 2]
+        else:
+            phases = range(1, 6)
+        buildings = range(101, 200) if "大厦" in template else range(1, 51)
+        # 单占位符模板只使用期数，去重后各取值仍等概率
+        return list(dict.fromkeys(template.format(phase, building) for phase in phases for building in buildings))
+    elif "科技园" in template:
+        return [template.format(number) for number in range(1, 21)]
+    return [template.format(number) for number in range(1, 100)]
+
+
+def _build_address_pool() -> Tuple[List[str], AliasTable]:
+    """
+    展开全部地址模板：先等概率选模板，再在模板内等概率选地址。
+
+    :return: 地址池和对应的别名表
     """
-    if "厦门" in template:
-        return random.choice([1, 2, 3])
-    if "深圳" in template:
-        return random.choice([1, 2])
-    return random.randint(1, 5)
+    pool, weights = [], []
+    template_weight = 1.0 / len(ADDRESS_TEMPLATES)
+    for template in ADDRESS_TEMPLATES:
+        addresses = enumerate_address_template(template)
+        pool.extend(addresses)
+        weights.extend([template_weight / len(addresses)] * len(addresses))
+    return pool, AliasTable(weights)
+
+
+# 预编译查找表：(公司, 职位类型) -> 薪资上下界，以及枚举后的地址池
+_SALARY_BOUNDS: Dict[Tuple[str, str], Tuple[int, int]] = {
+    (company, job_type): compute_salary_bounds(job_type, company)
+    for company in BIGDATA_COMPANIES
+    for job_type in TECH_REQUIREMENTS
+}
+_ADDRESS_POOL, _ADDRESS_TABLE = _build_address_pool()
+_ADDRESS_GROUPS = [enumerate_address_template(template) for template in ADDRESS_TEMPLATES]  # 各模板的地址
@@ -313,6 +313,30 @@ PROVINCE_SALARY_RANGES = {
     "陕西": (19, 48), "其他": (18, 45)
 }
 
+# 公司类型、融资阶段、公司规模、学历的取值集合
+COMPANY_TYPES = ["上市公司", "独角兽", "行业龙头", "创业公司"]
+FINANCE_STAGES = ["已上市", "D轮及以上", "C轮", "B轮", "A轮", "天使轮"]
+COMPANY_SIZES = ["100-499人", "500-999人", "1000-9999人", "10000人以上"]
+EDUCATION_LEVELS = ["本科", "硕士", "博士"]
+
+# 职位描述要点（按职位类型）
+JOB_DESCRIPTIONS = {
+    "大数据开发": ["数据平台搭建", "ETL流程优化", "实时计算系统维护"],
+    "数据分析": ["业务指标分析", "数据可视化呈现", "AB测试设计"],
+    "数据挖掘": ["用户行为建模", "推荐算法优化", "数据特征工程"],
+    "数据架构": ["数据模型设计", "元数据管理", "数据治理体系搭建"],
+    "数据科学家": ["机器学习模型开发", "数据驱动决策支持", "因果推理分析"]
+}
+
+# 公司简称映射（未列出的公司取前四个字加"数据"）
+COMPANY_SHORT_NAMES = {
+    "阿里云数据科技": "阿里云",
+    "腾讯大数据中心": "腾讯云",
+    "华为数据工程部": "华为云",
+    "京东数科": "京东云",
+    "IBM中国大数据实验室": "IBM实验室"
+}
+
 # 基础数据模板
 BASE_TEMPLATE = {
     "companyFullName": None,
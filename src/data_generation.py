@@ -3,41 +3,95 @@
 模块职责：生成职位数据
 作者：D.C.Y.
 创建时间：2025/03/14 15:34:51
-最后修改时间：2025/03/22 0:10:11
+最后修改时间：2026/10/19 05:44:21
 """
-from copy import deepcopy  # 导入deepcopy函数，用于深拷贝字典
 import random  # 导入random模块，用于生成随机数据
-from faker import Faker  # 导入Faker模块，用于生成假数据
-from typing import Dict, List  # 导入Dict和List类型提示
+from typing import Dict, List, Optional, Sequence  # 导入类型提示
 
 # 导入依赖模块
 from data_definitions import (
     BIGDATA_COMPANIES,  # 大数据公司列表
     INDUSTRY_FIELDS,  # 行业领域列表
-    TECH_REQUIREMENTS,  # 技术要求字典
-    APPLICATION_REQUIREMENTS,  # 申请要求字典
-    POSITION_REQUIREMENTS,  # 职位要求字典
     WELFARE_OPTIONS,  # 福利选项列表
     POSITION_ADVANTAGES,  # 职位优势列表
-    EXTRA_TAGS,  # 额外标签字典
     GENERAL_TAGS,  # 通用标签列表
-    BASE_TEMPLATE  # 基础模板字典
+    COMPANY_TYPES,  # 公司类型列表
+    FINANCE_STAGES,  # 融资阶段列表
+    COMPANY_SIZES,  # 公司规模列表
+    EDUCATION_LEVELS,  # 学历列表
+    COMPANY_SHORT_NAMES,  # 公司简称映射
 )
 from core_logic import generate_salary, generate_address  # 导入生成薪资和地址的函数
+from id_allocator import PositionIdAllocator  # 导入职位ID分配器
+from record_schema import JOB_TYPES, JOB_TYPE_PIECES  # 职位类型及其预先计算的常量片段
+from weighted_sampling import AliasTable  # 加权字段的别名表
 
-fake = Faker("zh_CN")  # 创建Faker实例，用于生成中文假数据
-_generated_ids = set()  # 初始化已生成的ID集合，用于确保ID唯一性
+_fake = None  # Faker实例，首次使用时才创建（导入 faker 并加载中文语言包耗时较长，批量生成不需要它）
+_id_allocator = PositionIdAllocator(random.SystemRandom().getrandbits(64))  # 职位ID分配器（常数内存，保证唯一）
+_id_cursor = 0  # 下一个待分配的ID序号
+_distributions: Dict[str, AliasTable] = {}  # 配置了权重的字段 -> 别名表，未配置的字段均匀抽取
+
+
+def set_seed(seed: int, id_width: int = 7):
+    """
+    设置随机种子，使逐条生成（含薪资、地址和Faker日期）可复现
+    :param seed: 随机种子
+    :param id_width: 职位ID的十进制位数（生成超过约900万条时需加大）
+    """
+    global _id_allocator, _id_cursor
+    random.seed(seed)  # core_logic 同样使用 random 模块
+    get_faker().seed_instance(seed)  # Faker实例使用独立的随机数生成器
+    _id_allocator = PositionIdAllocator(seed, width=id_width)  # 职位ID序列同样由种子决定
+    _id_cursor = 0
+
+
+def set_field_distributions(distributions: Optional[Dict[str, AliasTable]]):
+    """
+    设置逐条生成时各字段的权重分布（见 weighted_sampling.build_field_distributions）
+    :param distributions: 字段名 -> 别名表，None 表示全部字段均匀抽取
+    """
+    global _distributions
+    _distributions = dict(distributions or {})
+
+
+def _choose(values: Sequence[str], field: str) -> str:
+    """
+    按字段的权重分布抽取一个候选值（未配置权重时与 random.choice 相同）
+    :param values: 候选值
+    :param field: 字段名
+    :return: 候选值
+    """
+    table = _distributions.get(field)
+    return random.choice(values) if table is None else values[table.sample()]
+
+
+def get_faker():
+    """
+    获取用于生成中文假数据的Faker实例（首次调用时创建）
+    :return: Faker实例
+    """
+    global _fake
+    if _fake is None:
+        from faker import Faker  # 导入Faker模块，用于生成假数据
+        _fake = Faker("zh_CN")
+    return _fake
+
+
+def __getattr__(name: str):
+    # 兼容以 data_generation.fake 访问Faker实例的代码
+    if name == "fake":
+        return get_faker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def generate_job_record() -> Dict:
     """
-    生成单个职位记录（带完整性校验）
+    生成单个职位记录（完整性校验由输出环节的 record_validator 统一完成）
     :return: 包含职位信息的字典
     """
     job_type = _get_valid_job_type()  # 获取有效职位类型
     record = _build_base_record(job_type)  # 构建基础记录结构
     _add_dynamic_fields(record, job_type)  # 添加动态字段
-    _ensure_data_integrity(record)  # 确保数据完整性
     return record  # 返回职位记录
 
 
@@ -46,39 +100,53 @@ def _get_valid_job_type() -> str:
     获取有效职位类型
     :return: 随机选择的有效职位类型
     """
-    return random.choice(list(TECH_REQUIREMENTS.keys()))  # 从技术要求字典的键中随机选择一个职位类型
+    return _choose(JOB_TYPES, "firstType")  # 从预先确定的职位类型中随机选择一个（不再每次构造键列表）
 
 
 def _build_base_record(job_type: str) -> Dict:
     """
-    构建完整的基础记录结构
+    构建完整的基础记录结构（按 BASE_TEMPLATE 的字段顺序一次构造，不再深拷贝模板后更新）
     :param job_type: 职位类型
     :return: 包含基础职位信息的字典
     """
-    record = deepcopy(BASE_TEMPLATE)  # 深拷贝基础模板
-    company_name = random.choice(BIGDATA_COMPANIES)  # 随机选择一个大数据公司
+    pieces = JOB_TYPE_PIECES[job_type]  # 该职位类型的常量片段
+    company_name = _choose(BIGDATA_COMPANIES, "companyFullName")  # 随机选择一个大数据公司（可按热度偏斜）
 
-    record.update({  # 更新记录字典
+    # 字段按书写顺序求值，随机数的抽取顺序与原先一致，相同种子的结果不变
+    return {
         "companyFullName": company_name,  # 公司全称
-        "companyShortName": _generate_short_name(company_name),  # 公司简称
-        "companyType": random.choice(["上市公司", "独角兽", "行业龙头", "创业公司"]),  # 公司类型
-        "financeStage": random.choice(["已上市", "D轮及以上", "C轮", "B轮", "A轮", "天使轮"]),  # 融资阶段
-        "companySize": random.choice(["100-499人", "500-999人", "1000-9999人", "10000人以上"]),  # 公司规模
-        "industryField": random.choice(INDUSTRY_FIELDS),  # 行业领域
+        "companyShortName": generate_short_name(company_name),  # 公司简称
+        "companyType": _choose(COMPANY_TYPES, "companyType"),  # 公司类型
+        "financeStage": _choose(FINANCE_STAGES, "financeStage"),  # 融资阶段
+        "companySize": _choose(COMPANY_SIZES, "companySize"),  # 公司规模
+        "industryField": _choose(INDUSTRY_FIELDS, "industryField"),  # 行业领域
         "businessArea": random.sample(INDUSTRY_FIELDS, k=random.randint(1, 3)) if random.random() > 0.1 else None,
         # 业务领域（10%概率为空）
-        "workAddress": generate_address(),  # 工作地址
-        "positionName": f"{job_type}工程师",  # 职位名称
+        "workAddress": generate_address(_sample_index("workAddress")),  # 工作地址（城市可按热度偏斜）
+        "positionName": pieces.position_name,  # 职位名称
         "firstType": job_type,  # 职位类型
-        "education": random.choice(["本科", "硕士", "博士"]) if random.random() > 0.05 else None,  # 学历（5%概率为空）
+        "education": _choose(EDUCATION_LEVELS, "education") if random.random() > 0.05 else None,  # 学历（5%概率为空）
         "workYear": f"{random.randint(1, 3)}-{random.randint(4, 8)}年" if random.random() > 0.05 else None,
         # 工作年限（5%概率为空）
         "salary": generate_salary(job_type, company_name),  # 薪资（传入公司名称）
-        "jobDescription": f"负责{job_type}相关工作，包括：{_generate_job_description(job_type)}",  # 职位描述
+        "welfare": None,  # 福利（由 _add_dynamic_fields 填充）
+        "positionAdvantage": None,  # 岗位优势
+        "jobDescription": pieces.description_prefix + _generate_job_description(job_type),  # 职位描述
+        "requirements": None,  # 技术要求
+        "applicationRequirements": None,  # 申请要求
         "positionId": _generate_unique_id(),  # 职位ID
-        "formatCreateTime": fake.date_between(start_date="-1y").isoformat()  # 创建时间
-    })
-    return record  # 返回基础记录
+        "formatCreateTime": get_faker().date_between(start_date="-1y").isoformat()  # 创建时间
+    }
+
+
+def _sample_index(field: str) -> Optional[int]:
+    """
+    按字段的权重分布抽取候选下标
+    :param field: 字段名
+    :return: 下标，未配置权重时返回 None
+    """
+    table = _distributions.get(field)
+    return None if table is None else table.sample()
 
 
 def _add_dynamic_fields(record: Dict, job_type: str):
@@ -87,6 +155,8 @@ def _add_dynamic_fields(record: Dict, job_type: str):
     :param record: 包含基础职位信息的字典
     :param job_type: 职位类型
     """
+    pieces = JOB_TYPE_PIECES[job_type]
+
     # 福利（80%生成概率）
     if random.random() > 0.2:
         record["welfare"] = random.sample(WELFARE_OPTIONS, k=random.randint(2, 5))
@@ -97,41 +167,31 @@ def _add_dynamic_fields(record: Dict, job_type: str):
 
     # 技术要求（90%生成概率）
     if random.random() > 0.1:
-        record["requirements"] = POSITION_REQUIREMENTS[job_type]
+        record["requirements"] = pieces.requirements
 
     # 申请要求（80%生成概率）
     if random.random() > 0.2:
         record["applicationRequirements"] = random.sample(
-            APPLICATION_REQUIREMENTS[job_type],
+            pieces.application_requirements,
             k=random.randint(2, 3)
         )
 
-    # 技术标签（95%生成概率）
+    # 技术标签（95%生成概率）：固定前缀 + 3个额外标签 + 2个通用标签，一次构造，不再拼接临时列表
     if random.random() > 0.05:
-        tech_tags = (
-                TECH_REQUIREMENTS[job_type][:3] +
-                ["大数据平台" if "数据" in job_type else "业务分析"] +
-                [f"{job_type}认证优先"] +
-                random.sample(EXTRA_TAGS.get(job_type, []), 3) +
-                random.sample(GENERAL_TAGS, 2)
-        )
-        record["positionLables"] = tech_tags
+        record["positionLables"] = [
+            *pieces.label_prefix,
+            *random.sample(pieces.extra_tags, 3),
+            *random.sample(GENERAL_TAGS, 2),
+        ]
 
 
-def _generate_short_name(company_name: str) -> str:
+def generate_short_name(company_name: str) -> str:
     """
     生成公司简称
     :param company_name: 公司全称
     :return: 公司简称
     """
-    name_map = {
-        "阿里云数据科技": "阿里云",
-        "腾讯大数据中心": "腾讯云",
-        "华为数据工程部": "华为云",
-        "京东数科": "京东云",
-        "IBM中国大数据实验室": "IBM实验室"
-    }
-    return name_map.get(company_name, company_name[:4] + "数据")  # 返回公司简称
+    return COMPANY_SHORT_NAMES.get(company_name, company_name[:4] + "数据")  # 返回公司简称
 
 
 def _generate_job_description(job_type: str) -> str:
@@ -140,39 +200,23 @@ def _generate_job_description(job_type: str) -> str:
     :param job_type: 职位类型
     :return: 职位描述字符串
     """
-    descriptions = {
-        "大数据开发": ["数据平台搭建", "ETL流程优化", "实时计算系统维护"],
-        "数据分析": ["业务指标分析", "数据可视化呈现", "AB测试设计"],
-        "数据挖掘": ["用户行为建模", "推荐算法优化", "数据特征工程"],
-        "数据架构": ["数据模型设计", "元数据管理", "数据治理体系搭建"],
-        "数据科学家": ["机器学习模型开发", "数据驱动决策支持", "因果推理分析"]
-    }
-    return "、".join(random.sample(descriptions[job_type], 3))  # 返回随机选择的职位描述
+    return "、".join(random.sample(JOB_TYPE_PIECES[job_type].description_points, 3))  # 返回随机选择的职位描述
 
 
 def _generate_unique_id() -> int:
     """
-    生成唯一ID（防止冲突）
+    生成唯一ID（按序号经带密钥置换得到，无需记录已生成ID）
     :return: 唯一的ID
     """
-    while True:
-        new_id = random.randint(10 ** 6, 10 ** 7)  # 生成一个随机ID
-        if new_id not in _generated_ids:  # 检查ID是否唯一
-            _generated_ids.add(new_id)  # 添加到已生成ID集合
-            return new_id  # 返回唯一ID
+    return allocate_unique_ids(1)[0]  # 分配一个ID
 
 
-def _ensure_data_integrity(record: Dict):
+def allocate_unique_ids(n: int) -> List[int]:
     """
-    数据完整性校验
-    :param record: 包含职位信息的字典
+    从本进程的职位ID序列中连续分配一段唯一ID
+    :param n: 数量
+    :return: 唯一ID列表
     """
-    # 强制字段校验
-    mandatory_fields = ["positionId", "companyFullName", "positionName"]
-    for field in mandatory_fields:
-        if not record.get(field):
-            raise ValueError(f"关键字段缺失: {field}")  # 抛出字段缺失异常
-
-    # 薪资格式校验
-    if "-" not in record["salary"]:
-        record["salary"] = "8k-20k"  # 设置默认薪资范围
+    global _id_cursor
+    start, _id_cursor = _id_cursor, _id_cursor + n  # 预留序号区间
+    return _id_allocator.ids_for(start, n) if n > 1 else [_id_allocator.id_at(start)]
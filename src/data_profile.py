@@ -0,0 +1,309 @@
+"""
+模块名称：data_profile.py
+模块职责：生成过程中的流式数据画像：按地区统计薪资上下界的直方图与分位数、可空字段的空值率、职位类型占比，
+         以及公司与职位ID的近似去重计数（HyperLogLog）；内存占用固定，各数据块（及各分片）的画像可合并，运行结束时写出画像报告
+作者：D.C.Y.
+创建时间：2026/10/19 00:18:36
+最后修改时间：2026/10/19 06:07:45
+"""
+import json
+import math
+import os
+from collections import Counter
+from hashlib import blake2b
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core_logic import company_region
+
+PROFILE_FILE_NAME = "_profile.json"  # 画像报告文件名（下划线开头，Hive/Spark 读取目录时会忽略）
+PROFILE_STATE_VERSION = 1  # 可合并画像状态（分片画像文件中的 state）的格式版本
+NULLABLE_FIELDS = (
+    "businessArea", "education", "workYear", "welfare", "positionAdvantage", "requirements",
+    "applicationRequirements", "positionLables",
+)  # 统计空值率的字段（缺失的字段按空值计）
+DISTINCT_FIELDS = ("companyFullName", "positionId")  # 近似去重计数的字段；positionId 的去重数应与记录数一致
+SALARY_BINS = 201  # 薪资直方图的格数：每格1k，覆盖 0k-200k，超出的计入最后一格
+QUANTILES = (0.5, 0.9, 0.99)  # 报告中的薪资分位数
+HLL_PRECISION = 12  # HyperLogLog 寄存器数为 2^12，相对误差约 1.6%
+MAX_CACHED_VALUES = 1 << 16  # 薪资解析、地区解析和哈希缓存的最大条目数，缓存满后不再加入新取值
+
+_SPLITMIX_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_SPLITMIX_MUL1 = np.uint64(0xBF58476D1CE4E5B9)
+_SPLITMIX_MUL2 = np.uint64(0x94D049BB133111EB)
+
+
+class _LookupCache(dict):
+    """
+    取值 -> 计算结果的缓存，未命中时调用计算函数，缓存未满时加入缓存（已缓存的常用取值不会被清空）
+    """
+
+    def __init__(self, compute):
+        """
+        :param compute: 计算函数
+        """
+        super().__init__()
+        self.compute = compute
+
+    def __missing__(self, value):
+        result = self.compute(value)
+        if len(self) < MAX_CACHED_VALUES:
+            self[value] = result
+        return result
+
+
+def parse_salary(salary) -> Optional[Tuple[int, int]]:
+    """
+    解析 "12k-25k" 格式的薪资
+    :param salary: 薪资字符串
+    :return: (下界, 上界)，单位k；无法解析时返回 None
+    """
+    if type(salary) is not str:
+        return None
+    lower, _, upper = salary.partition("-")
+    try:
+        return int(lower.rstrip("kK")), int(upper.rstrip("kK"))
+    except ValueError:
+        return None
+
+
+def _string_hash(value) -> int:
+    """
+    非整数取值的64位哈希（与进程无关，各工作进程的结果可以合并）
+    :param value: 取值
+    :return: 64位哈希
+    """
+    return int.from_bytes(blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+_salaries = _LookupCache(parse_salary)
+_regions = _LookupCache(company_region)
+_hashes = _LookupCache(_string_hash)
+
+
+class DistinctCounter:
+    """
+    HyperLogLog 近似去重计数器：内存固定为 2^precision 字节，合并即逐寄存器取最大值
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        """
+        :param precision: 寄存器数的以2为底的对数
+        """
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values: Sequence):
+        """
+        加入一批取值（None 忽略）
+        :param values: 取值序列，整数取值直接混合，其余取值按字符串哈希
+        """
+        keys = [value if type(value) is int and value >= 0 else _hashes[value] for value in values if value is not None]
+        if not keys:
+            return
+        # splitmix64 混合，使连续整数（如职位ID序号）的哈希也均匀分布
+        h = np.array(keys, dtype=np.uint64) + _SPLITMIX_GAMMA
+        h = (h ^ (h >> np.uint64(30))) * _SPLITMIX_MUL1
+        h = (h ^ (h >> np.uint64(27))) * _SPLITMIX_MUL2
+        h ^= h >> np.uint64(31)
+
+        index = (h & np.uint64(self.registers.size - 1)).astype(np.intp)
+        rest = h >> np.uint64(self.precision)
+        lowest_bit = rest & (~rest + np.uint64(1))
+        # 秩 = 剩余位中末尾0的个数 + 1（2的幂转换为浮点数是精确的）
+        rank = np.where(rest == 0, 64 - self.precision + 1, np.log2(lowest_bit.astype(np.float64)) + 1)
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: "DistinctCounter"):
+        """
+        合并另一个计数器
+        :param other: 精度相同的计数器
+        """
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """
+        估算去重后的取值个数
+        :return: 估算值
+        """
+        m = self.registers.size
+        zeros = int(np.count_nonzero(self.registers == 0))
+        raw = 0.7213 / (1 + 1.079 / m) * m * m / float(np.sum(np.exp2(-self.registers.astype(np.float64))))
+        if raw <= 2.5 * m and zeros:
+            # 小基数时改用线性计数
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+
+class DataProfile:
+    """
+    职位数据画像。
+
+    - 工作进程为每个数据块建立一份画像，随数据块统计返回主进程后合并，全程不保留记录本身；
+    - 薪资上下界按地区（与计算薪资时的地区一致）记入每格1k的直方图，分位数按直方图计算，精度为1k；
+    - 空值率、职位类型占比为精确计数，公司与职位ID为近似去重计数，内存占用与记录总数无关。
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.null_counts = dict.fromkeys(NULLABLE_FIELDS, 0)
+        self.job_types: Counter = Counter()
+        self.salary_histograms: Dict[str, np.ndarray] = {}  # 地区 -> 形如 (2, SALARY_BINS) 的下界、上界直方图
+        self.unparsed_salaries = 0
+        self.distinct = {field: DistinctCounter() for field in DISTINCT_FIELDS}
+
+    def add_records(self, records: List[Dict]):
+        """
+        统计一批记录
+        :param records: 职位记录列表
+        """
+        self.records += len(records)
+        for field in NULLABLE_FIELDS:
+            self.null_counts[field] += sum(1 for record in records if record.get(field) is None)
+        self.job_types.update(record.get("firstType") for record in records)
+        for field, counter in self.distinct.items():
+            counter.add([record.get(field) for record in records])
+
+        salaries = Counter((_regions[record.get("companyFullName")], _salaries[record.get("salary")])
+                           for record in records)
+        for (region, bounds), count in salaries.items():
+            if bounds is None:
+                self.unparsed_salaries += count
+                continue
+            histogram = self._salary_histogram(region)
+            histogram[0, min(max(bounds[0], 0), SALARY_BINS - 1)] += count
+            histogram[1, min(max(bounds[1], 0), SALARY_BINS - 1)] += count
+
+    def merge(self, other: "DataProfile"):
+        """
+        合并另一份画像（如一个数据块的画像）
+        :param other: 画像
+        """
+        self.records += other.records
+        for field, count in other.null_counts.items():
+            self.null_counts[field] = self.null_counts.get(field, 0) + count
+        self.job_types.update(other.job_types)
+        for region, histogram in other.salary_histograms.items():
+            self._salary_histogram(region)[:] += histogram
+        self.unparsed_salaries += other.unparsed_salaries
+        for field, counter in other.distinct.items():
+            self.distinct[field].merge(counter)
+
+    def report(self) -> Dict:
+        """
+        生成画像报告
+        :return: 报告字典
+        """
+        records = self.records or 1
+        overall = sum(self.salary_histograms.values(), np.zeros((2, SALARY_BINS), dtype=np.int64))
+        return {
+            "records": self.records,
+            "null_rates": {field: round(count / records, 6) for field, count in self.null_counts.items()},
+            "null_counts": dict(self.null_counts),
+            "job_types": {job_type: {"count": count, "share": round(count / records, 6)}
+                          for job_type, count in self.job_types.most_common()},
+            "distinct": {field: counter.estimate() for field, counter in self.distinct.items()},
+            "distinct_relative_error": round(1.04 / math.sqrt(1 << HLL_PRECISION), 4),
+            "salary": {
+                "unit": "k",
+                "unparsed": self.unparsed_salaries,
+                "overall": _salary_summary(overall),
+                "by_region": {region: _salary_summary(histogram)
+                              for region, histogram in sorted(self.salary_histograms.items())},
+                "histogram": {
+                    bound: {str(value): int(count) for value, count in enumerate(overall[row]) if count}
+                    for row, bound in enumerate(("lower", "upper"))
+                },
+            },
+        }
+
+    def to_state(self) -> Dict:
+        """
+        导出可合并的画像状态（精确计数、薪资直方图和 HyperLogLog 寄存器），供其他节点读回后合并
+        :return: 可JSON序列化的状态字典
+        """
+        return {
+            "version": PROFILE_STATE_VERSION,
+            "records": self.records,
+            "null_counts": dict(self.null_counts),
+            "job_types": [[job_type, count] for job_type, count in self.job_types.items()],
+            "salary_histograms": {region: histogram.tolist() for region, histogram in self.salary_histograms.items()},
+            "unparsed_salaries": self.unparsed_salaries,
+            "distinct": {field: counter.registers.tobytes().hex() for field, counter in self.distinct.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "DataProfile":
+        """
+        由 to_state 导出的状态重建画像
+        :param state: 状态字典
+        :return: 画像
+        """
+        if state.get("version") != PROFILE_STATE_VERSION:
+            raise ValueError(f"不支持的画像状态版本: {state.get('version')}")
+        profile = cls()
+        profile.records = state["records"]
+        profile.null_counts.update(state["null_counts"])
+        profile.job_types.update({job_type: count for job_type, count in state["job_types"]})
+        profile.salary_histograms = {region: np.array(histogram, dtype=np.int64)
+                                     for region, histogram in state["salary_histograms"].items()}
+        profile.unparsed_salaries = state["unparsed_salaries"]
+        for field, registers in state["distinct"].items():
+            profile.distinct[field].registers = np.frombuffer(bytes.fromhex(registers), dtype=np.uint8).copy()
+        return profile
+
+    def to_json(self, include_state: bool = False) -> str:
+        """
+        将画像报告格式化为JSON文本
+        :param include_state: 是否附带可合并的画像状态（分片画像需要在合并时读回）
+        :return: JSON文本
+        """
+        report = self.report()
+        if include_state:
+            report["state"] = self.to_state()
+        return json.dumps(report, ensure_ascii=False, indent=2)
+
+    def write_report(self, path: str):
+        """
+        将画像报告写入本地文件（先写临时文件再改名）
+        :param path: 报告文件路径
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        os.replace(temp_path, path)
+
+    def _salary_histogram(self, region: str) -> np.ndarray:
+        """
+        取某一地区的薪资直方图（不存在时新建）
+        :param region: 地区
+        :return: 形如 (2, SALARY_BINS) 的直方图
+        """
+        histogram = self.salary_histograms.get(region)
+        if histogram is None:
+            histogram = self.salary_histograms[region] = np.zeros((2, SALARY_BINS), dtype=np.int64)
+        return histogram
+
+
+def _salary_summary(histogram: np.ndarray) -> Dict:
+    """
+    由薪资直方图计算记录数、最小值、均值、分位数和最大值
+    :param histogram: 形如 (2, SALARY_BINS) 的下界、上界直方图
+    :return: 汇总字典
+    """
+    total = int(histogram[0].sum())
+    summary = {"count": total}
+    if not total:
+        return summary
+    values = np.arange(SALARY_BINS)
+    for row, bound in enumerate(("lower", "upper")):
+        counts = histogram[row]
+        cumulative = np.cumsum(counts)
+        nonzero = np.flatnonzero(counts)
+        stats = {"min": int(nonzero[0]), "mean": round(float(counts @ values) / total, 2)}
+        for q in QUANTILES:
+            stats[f"p{round(q * 100)}"] = int(np.searchsorted(cumulative, math.ceil(q * total)))
+        stats["max"] = int(nonzero[-1])
+        summary[bound] = stats
+    return summary
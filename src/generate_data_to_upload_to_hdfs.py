@@ -1,48 +1,394 @@
-import json
-from datetime import datetime
-from typing import List
-from data_generation import generate_job_record
-from hdfs import InsecureClient
+import argparse
+import time
+from datetime import date
+from functools import partial
+from itertools import count, groupby
+from operator import itemgetter
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+from batch_generation import generate_batch_records
+from checkpoint import RunCheckpoint, open_run_checkpoint
+from data_profile import PROFILE_FILE_NAME
+from hdfs_uploader import DEFAULT_SPOOL_SIZE, ConcurrentUploader, write_page_bytes
+from id_allocator import PositionIdAllocator, id_capacity
+from parallel_generation import (
+    add_generation_arguments,
+    build_id_allocator,
+    build_record_validator,
+    build_run_metrics,
+    check_output_arguments,
+    generate_chunks,
+    format_page_ranges,
+    is_rolling,
+    parse_size,
+    partition_id_count,
+)
+from partition_manifest import PartitionManifest, partition_dates, partition_name, partition_seed
+from pipeline import encode_data, encode_data_with_offsets, encode_parquet_data, run_rolling_pipeline
+from record_validator import RecordValidator
+from shard_plan import ShardPlan, merge_shard_manifests, write_shard_manifest
+from run_metrics import format_eta
+from sinks import BlockGzipSink, HdfsSink, write_hdfs_file
 
 """
 模块名称：generate_data_to_upload_to_hdfs.py
 模块职责：该脚本用于生成模拟的职位信息数据，并将其上传到 HDFS。
 作者: D.C.Y.
 创建日期: 2025/03/14 15:32:12
-最后修改日期: 2025/03/22 1:34:45
+最后修改日期: 2026/10/19 06:16:52
 """
 
+HDFS_URL = 'http://master:9870'  # 默认 NameNode WebHDFS 地址
+HDFS_USER = 'root'
+HDFS_DIR = '/JobData'  # 默认 HDFS 存储根目录
+DEFAULT_SALARY = "10k-25k"  # 薪资格式不符时替换的默认值
+_FULL_VALIDATOR = RecordValidator("full", default_salary=DEFAULT_SALARY)  # 逐页串行上传时逐条校验
 
-def main():
+
+def main(argv: Optional[List[str]] = None):
     """
     主执行函数
+    :param argv: 命令行参数，默认读取 sys.argv
     """
-    hdfs_client = InsecureClient('http://master:9870', user='root')
-    initialize_hdfs_directories(hdfs_client)
+    args = parse_args(argv)
+    checkpoint = open_run_checkpoint(args)  # 续跑时回填首次运行的种子、基准日期和职位ID密钥
+    if checkpoint is not None and checkpoint.completed:
+        print(f"断点 {args.checkpoint} 记录的运行已全部完成，无需重新上传")
+        return
+    client_factory = partial(create_hdfs_client, args.hdfs_url, args.hdfs_user)
+    hdfs_client = client_factory()
+    if args.merge_shards:
+        try:
+            manifest = merge_shard_manifests(hdfs_client, args.hdfs_dir, args.date, args.shards)
+        except ValueError as e:
+            raise SystemExit(f"分区 {partition_name(args.date)} 的分片无法合并: {e}")
+        print(f"已合并 {args.shards} 个分片，分区清单已更新: {manifest.path}")
+        return
+    shard = ShardPlan(args.shard, args.shards) if args.shard is not None else None
+    if args.append:
+        failed = append_partitions(args, client_factory, hdfs_client)
+    else:
+        if args.pages or shard is not None or (checkpoint is not None and (checkpoint.pages or checkpoint.rolling)):
+            # 只重建指定页、分片生成（其他节点同时写入）或从断点续跑时保留已有数据，仅确保目录存在
+            create_hdfs_directories(hdfs_client, args.hdfs_dir)
+        else:
+            initialize_hdfs_directories(hdfs_client, args.hdfs_dir)
+        if shard is not None:
+            pages = shard.pages(args.page_count)
+        else:
+            pages = args.pages or range(1, args.page_count + 1)
+        result = upload_partition(args, client_factory, args.date or date.today(), pages, args.page_size, args.seed,
+                                  build_id_allocator(args), report_seed=args.seed, checkpoint=checkpoint, shard=shard)
+        failed = bool(result.failed_pages)
+        if shard is not None:
+            write_shard_manifest(
+                hdfs_client, f"{args.hdfs_dir.rstrip('/')}/{partition_name(args.date)}", shard, args.date, args.seed,
+                args.run_key if args.run_key is not None else args.seed, args.id_width, args.id_offset,
+                args.page_count, args.page_size, "json.gz" if args.compress == "bgzf" else args.format,
+                result.uploaded, list(result.failed_pages), result.records, is_rolling(args))
+            print(f"分片 {shard.shard}/{shard.shards} 已完成，全部分片完成后运行一次 "
+                  f"--merge-shards --of {shard.shards} --date {partition_name(args.date)} 合并清单")
+        if checkpoint is not None:
+            checkpoint.finish()
+    if failed:
+        raise SystemExit(1)
+    print("数据已成功上传到 HDFS...")
 
-    total_files = 30
-    batch_size = 1000  # 定义 batch_size 变量
-    for file_index in range(1, total_files + 1):
-        dataset = generate_batch_data(batch_size)
-        print_progress(file_index, total_files, batch_size)  # 传递 batch_size 参数
-        upload_data_to_hdfs(file_index, hdfs_client, dataset)
 
-    print("数据已成功上传到 HDFS...")
+class PartitionResult(NamedTuple):
+    """
+    一个日期分区的上传结果
+    """
+    failed_pages: Dict[int, Exception]  # 重试后仍上传失败的页码（或文件序号）及其最后一次异常
+    uploaded: List[int]  # 上传成功的页码（或文件序号）
+    records: Optional[int]  # 滚动输出时写入的记录数，按页输出时为 None
+    ids_used: int  # 占用的职位ID序号数量
+
+
+def upload_partition(args: argparse.Namespace, client_factory: Callable[[], object], partition_date: date,
+                     pages: Sequence[int], page_size: int, seed: Optional[int], id_allocator: PositionIdAllocator,
+                     report_seed: Optional[int] = None, append: bool = False,
+                     checkpoint: Optional[RunCheckpoint] = None, shard: Optional[ShardPlan] = None) -> PartitionResult:
+    """
+    生成一个日期分区的数据并并发上传
+    :param args: 命令行解析结果（输出格式、滚动、上传并发与重试等参数）
+    :param client_factory: 创建 HDFS 客户端的函数
+    :param partition_date: 分区日期（同时作为数据基准日期）
+    :param pages: 要生成的页码（滚动输出时只取其起点和页数）
+    :param page_size: 每页记录数
+    :param seed: 随机种子
+    :param id_allocator: 职位ID分配器
+    :param report_seed: 上传失败时用于给出重建命令的种子
+    :param append: 是否为增量追加模式（影响重建命令的提示）
+    :param checkpoint: 运行断点：跳过已提交的页（或从已提交的文件边界继续），上传成功后提交、失败时记录
+    :param shard: 分片计划：滚动输出的文件名带上分片序号，避免与其他分片的文件冲突
+    :return: 上传结果
+    """
+    extension = "json.gz" if args.compress == "bgzf" else args.format
+    prefix = shard.file_prefix if shard is not None and is_rolling(args) else "page"
+    page_path = partial(hdfs_page_path, partition_date=partition_date, extension=extension, root=args.hdfs_dir,
+                        prefix=prefix)
+    validator = build_record_validator(args, DEFAULT_SALARY)
+    distributions, knowledge_base = args.distributions, args.opened_knowledge_base
+    if args.format == "parquet":
+        transform = partial(encode_parquet_data, validator=validator)
+        page_writer = partial(write_parquet_page, row_group_size=args.row_group_size)
+    elif args.compress == "bgzf":
+        transform = partial(encode_data, validator=validator)
+        page_writer = partial(write_bgzf_page, compresslevel=args.compress_level, threads=args.compress_threads)
+    else:
+        transform, page_writer = partial(encode_data, validator=validator), None
+    metrics = build_run_metrics(args)
+    if is_rolling(args):
+        resume = checkpoint.rolling if checkpoint is not None else None
+        done = count((resume.files_written if resume else 0) + 1)
+
+        def on_uploaded(file_index: int):
+            if checkpoint is not None:
+                checkpoint.confirm_file(file_index)
+            print(f"\r已上传 {next(done)} 个文件{format_eta(metrics.eta())}", end="")
+    else:
+        remaining = checkpoint.remaining(pages) if checkpoint is not None else pages
+        done = count(len(pages) - len(remaining) + 1)
+
+        def on_uploaded(file_index: int):
+            if checkpoint is not None:
+                checkpoint.commit_page(file_index)
+            print_progress(next(done), len(pages), page_size, eta=metrics.eta(), root=args.hdfs_dir)
+    uploader = ConcurrentUploader(
+        client_factory, concurrency=args.upload_workers, queue_size=args.upload_queue,
+        max_retries=args.retries, backoff=args.retry_backoff, page_writer=page_writer, on_uploaded=on_uploaded,
+        on_retry=lambda file_index, attempt, e: print(
+            f"\n\t上传 {page_path(file_index)} 失败，第{attempt}次重试: {str(e)}"), metrics=metrics,
+        spool_size=args.upload_spool)
+
+    with metrics:
+        if is_rolling(args):
+            # 按大小滚动输出：每个文件凑满目标大小（如一个 HDFS 块）后整体交给上传线程，超出 --upload-spool 的部分暂存本地临时文件
+            with uploader:
+                rolling = run_rolling_pipeline(
+                    page_size, lambda file_index: uploader.open_page(file_index, page_path(file_index)),
+                    partial(encode_data_with_offsets, validator=validator), max_file_bytes=args.roll_size, max_file_records=args.roll_records,
+                    byte_budget=args.max_bytes, total_records=None if args.max_bytes else len(pages) * page_size,
+                    workers=args.workers, seed=seed, reference_date=partition_date, id_allocator=id_allocator,
+                    on_file_done=checkpoint.close_file if checkpoint is not None else None, metrics=metrics,
+                    resume=resume, first_page=pages[0], distributions=distributions, knowledge_base=knowledge_base)
+            print(f"\n共生成 {rolling.files_written} 个文件，{rolling.records_written} 个职位信息，"
+                  f"{rolling.bytes_written / (1 << 20):.1f} MB")
+            # 滚动输出的文件与页不对应，无法按页重建，因此不给出重建命令
+            report_failed_pages(uploader.failed_pages, page_path, partition_date, page_size)
+            files, records = range(1, rolling.files_written + 1), rolling.records_written
+            ids_used = -(-metrics.records_generated // page_size) * page_size
+        else:
+            # 数据块的校验与编码在工作进程内完成；主进程按页汇总编码结果后交给上传线程，生成与上传同时进行
+            chunks = generate_chunks(remaining, page_size, workers=args.workers, transform=transform, seed=seed,
+                                     reference_date=partition_date, id_allocator=id_allocator, metrics=metrics,
+                                     distributions=distributions, knowledge_base=knowledge_base)
+            with uploader:
+                for file_index, page_chunks in groupby(chunks, key=itemgetter(0)):
+                    start = time.perf_counter()
+                    # 整页保留到上传成功以便重试，超出 --upload-spool 的部分暂存本地临时文件；上传队列已满时阻塞
+                    with uploader.open_page(file_index, page_path(file_index)) as page:
+                        for _, payload in page_chunks:
+                            page.write_encoded(payload)
+                    metrics.observe_write(page.chunks.nbytes, time.perf_counter() - start)
+            report_failed_pages(uploader.failed_pages, page_path, partition_date, page_size, report_seed, append)
+            files, records, ids_used = pages, None, max(pages, default=0) * page_size
+    if checkpoint is not None:
+        for file_index, error in uploader.failed_pages.items():
+            checkpoint.record_failure(file_index, error)
+    if metrics.profile is not None:
+        # 画像报告与数据文件放在同一分区目录下，无需再从 HDFS 读回数据统计分布；
+        # 分片生成时各分片写出带可合并状态的分片画像，由 --merge-shards 汇总为分区画像
+        profile_name = shard.profile_name if shard is not None else PROFILE_FILE_NAME
+        profile_path = f"{args.hdfs_dir.rstrip('/')}/{partition_name(partition_date)}/{profile_name}"
+        write_hdfs_file(client_factory(), profile_path,
+                        metrics.profile.to_json(include_state=shard is not None).encode("utf-8"))
+        print(f"数据画像已写入 HDFS {profile_path}")
+    if args.metrics_file:
+        print(f"{metrics.format_summary()}\n运行指标已写入 {args.metrics_file}")
+    uploaded = [file_index for file_index in files if file_index not in uploader.failed_pages]
+    return PartitionResult(uploader.failed_pages, uploaded, records, ids_used)
+
+
+def append_partitions(args: argparse.Namespace, client_factory: Callable[[], object], hdfs_client) -> bool:
+    """
+    增量追加模式：保留已有分区，只生成清单中还没有的日期分区（或重建已有分区的指定页），每个分区完成后更新清单
+    :param args: 命令行解析结果
+    :param client_factory: 创建 HDFS 客户端的函数
+    :param hdfs_client: HDFS 客户端
+    :return: 是否有页面上传失败
+    """
+    create_hdfs_directories(hdfs_client, args.hdfs_dir)
+    run_key = args.run_key if args.run_key is not None else args.seed
+    manifest = PartitionManifest.load(hdfs_client, args.hdfs_dir, run_key=run_key, id_width=args.id_width)
+    extension = "json.gz" if args.compress == "bgzf" else args.format
+    failed = False
+    for partition_date in partition_dates(args.date or date.today(), args.days):
+        name, existing = partition_name(partition_date), manifest.get(partition_date)
+        if args.pages:
+            if existing is None or existing["layout"] != "pages":
+                print(f"分区 {name} 不在清单中或为滚动输出，无法按页重建")
+                failed = True
+                continue
+            if existing["extension"] != extension:
+                # 重建的页必须与该分区其余页格式相同，否则同一分区内会混有不同格式的文件
+                print(f"分区 {name} 的文件格式为 {existing['extension']}，重建页面须使用相同的 --format/--compress 参数")
+                failed = True
+                continue
+            page_count = manifest.page_count(partition_date)
+            beyond = [page for page in args.pages if page > page_count]
+            if beyond:
+                # 超出范围的页会占用其他分区的职位ID区间
+                print(f"分区 {name} 共 {page_count} 页，无法重建页 {format_page_ranges(beyond)}")
+                failed = True
+                continue
+            # 重建页面时沿用该分区原有的种子、页大小和职位ID区间，结果与首次生成完全一致
+            seed, id_offset, page_size = existing["seed"], existing["id_offset"], existing["page_size"]
+            pages = args.pages
+        elif existing is not None:
+            print(f"分区 {name} 已存在（{len(existing['pages'])} 页），跳过")
+            continue
+        else:
+            if manifest.next_id_offset + partition_id_count(args) > id_capacity(manifest.id_width):
+                # 分区清单的ID位数在首次追加时已确定，容量不足时在写出任何数据之前停止
+                print(f"分区 {name} 需要 {partition_id_count(args)} 个职位ID，分区清单 {manifest.path} 的 "
+                      f"{manifest.id_width} 位ID空间只剩 {id_capacity(manifest.id_width) - manifest.next_id_offset} 个")
+                failed = True
+                break
+            # 指定种子时每天的种子由 (种子, 日期) 派生，不同日期的数据互不相同
+            seed = np.random.SeedSequence().entropy if args.seed is None else partition_seed(args.seed, partition_date)
+            id_offset, page_size, pages = manifest.next_id_offset, args.page_size, range(1, args.page_count + 1)
+
+        print(f"正在生成分区 {name}...")
+        id_allocator = PositionIdAllocator(manifest.run_key, width=manifest.id_width, offset=id_offset)
+        result = upload_partition(args, client_factory, partition_date, pages, page_size, seed, id_allocator,
+                                  report_seed=seed, append=True)
+        if existing is None:
+            manifest.reserve_ids(result.ids_used)
+            page_count = result.ids_used // page_size  # 新分区占用的职位ID区间恰好为整数页
+        manifest.record_partition(partition_date, seed, id_offset, page_size, result.uploaded,
+                                  extension, records=result.records,
+                                  rolling=is_rolling(args), page_count=page_count)
+        manifest.save(hdfs_client)
+        failed = failed or bool(result.failed_pages)
+    print(f"分区清单已更新: {manifest.path}（共 {len(manifest.partitions)} 个分区）")
+    return failed
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    解析命令行参数
+    :param argv: 命令行参数列表
+    :return: 解析结果
+    """
+    parser = argparse.ArgumentParser(description="生成职位数据并上传到 HDFS")
+    add_generation_arguments(parser)
+    parser.add_argument("--hdfs-url", default=HDFS_URL, help=f"WebHDFS 地址（默认 {HDFS_URL}）")
+    parser.add_argument("--hdfs-user", default=HDFS_USER, help=f"HDFS 用户（默认 {HDFS_USER}）")
+    parser.add_argument("--hdfs-dir", default=HDFS_DIR, help=f"HDFS 存储根目录（默认 {HDFS_DIR}）")
+    parser.add_argument("--upload-workers", type=int, default=4, help="并发上传的 WebHDFS 写入流数量（默认4）")
+    parser.add_argument("--upload-queue", type=int, help="等待上传的页面队列长度，默认为并发上传数的2倍")
+    parser.add_argument("--upload-spool", type=parse_size, default=DEFAULT_SPOOL_SIZE,
+                        help="每个待上传页面在内存中保留的最大字节数，超出部分暂存本地临时文件（默认16MB）")
+    parser.add_argument("--retries", type=int, default=3, help="单页上传失败后的最大重试次数（默认3）")
+    parser.add_argument("--retry-backoff", type=float, default=1.0, help="首次重试前的等待秒数，之后每次翻倍（默认1.0）")
+    parser.add_argument("--append", action="store_true",
+                        help="增量追加：不清空存储根目录，只生成分区清单中还没有的日期分区（配合 --pages 重建已有分区的指定页）")
+    parser.add_argument("--days", type=int, default=1, help="追加模式下生成以 --date 为最后一天的连续天数（默认1）")
+    parser.add_argument("--shard", type=int,
+                        help="分片生成：本节点负责的分片序号（1..N），各节点只生成自己的页区间并直接写入 HDFS，需配合 --of")
+    parser.add_argument("--of", dest="shards", type=int, help="分片总数 N（所有节点须使用相同的 --seed、--date 和页参数）")
+    parser.add_argument("--merge-shards", action="store_true",
+                        help="全部分片完成后运行一次：校验 --date 分区下 --of 个分片的清单并合并到分区清单中")
+    args = parser.parse_args(argv)
+    # 知识库与字段权重分布在校验参数时已构建，随解析结果传给各分区的生成流程
+    args.opened_knowledge_base, args.distributions = check_output_arguments(parser, args)
+    if args.days != 1 and not args.append:
+        parser.error("--days 仅适用于 --append 模式")
+    if args.append and args.id_offset:
+        parser.error("追加模式下职位ID区间由分区清单分配，不能指定 --id-offset")
+    check_shard_arguments(parser, args)
+    return args
 
 
-def initialize_hdfs_directories(hdfs_client):
+def check_shard_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """
+    检查分片生成相关参数：各节点必须得到完全相同的分片划分与数据内容
+    :param parser: 命令行解析器
+    :param args: 命令行解析结果
+    """
+    if args.shard is None and args.shards is None and not args.merge_shards:
+        return
+    if args.shards is None or args.shards < 1:
+        parser.error("分片生成与合并需要 --of N（N至少为1）")
+    if args.date is None:
+        # 各节点的当天日期可能不同，分区日期必须显式指定
+        parser.error("分片生成与合并需要指定 --date")
+    if args.merge_shards:
+        if args.shard is not None:
+            parser.error("--merge-shards 合并全部分片，不能指定 --shard")
+        return
+    if args.shard is None or not 1 <= args.shard <= args.shards:
+        parser.error(f"--shard 须在 1 到 {args.shards} 之间")
+    if args.seed is None:
+        parser.error("分片生成需要指定 --seed，各节点才能生成同一份数据中互不重叠的部分")
+    if args.append or args.pages or args.max_bytes:
+        parser.error("分片生成的页区间由 --page-count 和 --of 决定，不能与 --append、--pages 或 --max-bytes 同时使用")
+    if args.page_count < args.shards:
+        parser.error("--page-count 不能小于分片总数")
+
+
+def create_hdfs_client(url: str = HDFS_URL, user: str = HDFS_USER):
+    """
+    创建 HDFS 客户端（每个上传线程各自持有一个）
+    :param url: WebHDFS 地址
+    :param user: HDFS 用户
+    :return: HDFS 客户端
+    """
+    from hdfs import InsecureClient  # 仅在实际连接 HDFS 时才导入 hdfs 库，加快启动
+    return InsecureClient(url, user=user)
+
+
+def report_failed_pages(failed_pages: Dict[int, Exception], page_path: Callable[[int], str], partition_date: date,
+                        page_size: int, seed: Optional[int] = None, append: bool = False):
+    """
+    汇总报告上传失败的页面
+    :param failed_pages: 失败页码及其最后一次异常
+    :param page_path: 由页码计算 HDFS 路径的函数
+    :param partition_date: 分区日期
+    :param page_size: 每页记录数
+    :param seed: 本次运行的随机种子，用于给出重建命令
+    :param append: 是否为增量追加模式（种子与职位ID区间由分区清单记录，重建命令无需指定）
+    """
+    if not failed_pages:
+        return
+    print(f"\n以下 {len(failed_pages)} 个页面重试后仍上传失败:")
+    for file_index in sorted(failed_pages):
+        print(f"\t{page_path(file_index)}: {str(failed_pages[file_index])}")
+    page_list = ",".join(str(file_index) for file_index in sorted(failed_pages))
+    if append:
+        print(f"可使用 --append --date {partition_date.strftime('%Y%m%d')} --pages {page_list} 重新生成并上传这些页面")
+    elif seed is not None:
+        print(f"可使用 --seed {seed} --date {partition_date.strftime('%Y%m%d')} --page-size {page_size} "
+              f"--pages {page_list} 重新生成并上传这些页面")
+
+
+def initialize_hdfs_directories(hdfs_client, root: str = HDFS_DIR):
     """
     初始化 HDFS 目录，包括清空和创建目录
+    :param root: HDFS 存储根目录
     """
-    clear_hdfs_directories(hdfs_client)
-    create_hdfs_directories(hdfs_client)
+    clear_hdfs_directories(hdfs_client, root)
+    create_hdfs_directories(hdfs_client, root)
 
 
-def clear_hdfs_directories(hdfs_client):
+def clear_hdfs_directories(hdfs_client, root: str = HDFS_DIR):
     """
     清空 HDFS 根目录和指定文件夹
+    :param root: HDFS 存储根目录
     """
-    directories = ["/JobData"]
+    directories = [root]
     for directory in directories:
         try:
             if hdfs_client.status(directory, strict=False):
@@ -52,11 +398,12 @@ def clear_hdfs_directories(hdfs_client):
             print(f"清空 HDFS 目录 {directory} 失败: {str(e)}")
 
 
-def create_hdfs_directories(hdfs_client):
+def create_hdfs_directories(hdfs_client, root: str = HDFS_DIR):
     """
     在 HDFS 上创建存储目录
+    :param root: HDFS 存储根目录
     """
-    dirs = ["/JobData"]
+    dirs = [root]
     for d in dirs:
         try:
             hdfs_client.makedirs(d)
@@ -71,63 +418,83 @@ def generate_batch_data(batch_size: int) -> List[dict]:
     :param batch_size: 批量数据的数量
     :return: 包含多个职位信息的列表
     """
-    return [generate_job_record() for _ in range(batch_size)]
+    return generate_batch_records(batch_size)
 
 
-def print_progress(current: int, total: int, batch_size: int):
+def print_progress(current: int, total: int, batch_size: int, eta: Optional[float] = None, root: str = HDFS_DIR):
     """
     带颜色的进度显示
     :param current: 当前进度
     :param total: 总进度
     :param batch_size: 每个文件包含的职位信息数量
+    :param eta: 按实时吞吐估算的剩余秒数
+    :param root: HDFS 存储根目录
     """
     progress = current / total * 100
     bar = f"[{'#' * int(progress // 3.33)}{' ' * (30 - int(progress // 3.33))}]"
-    print(f"\r生成进度: {bar} {progress:.1f}%", end="")
+    print(f"\r生成进度: {bar} {progress:.1f}%{format_eta(eta) if current < total else '':<12}", end="")
     if current == total:
         print(f"\n模拟数据生成完毕...\n"
               f"共生成{total}个文件，每个文件有{batch_size}个职位信息...\n"
-              f"请检查 HDFS 目录 /JobData")
+              f"请检查 HDFS 目录 {root}")
 
 
 def upload_data_to_hdfs(file_index: int, hdfs_client, dataset):
     """
-    将生成的数据文件上传到 HDFS
+    将生成的数据文件上传到 HDFS（单页串行上传，失败不重试）
     :param file_index: 文件索引
     :param hdfs_client: HDFS 客户端
     :param dataset: 数据集
     """
-    validated_data = validate_and_fix_data(dataset)
-
-    # 保存为JSON Lines格式
-    hdfs_path = f"/JobData/{datetime.now().strftime('%Y%m%d')}/page{file_index}.json"
+    hdfs_path = hdfs_page_path(file_index)
     try:
-        with hdfs_client.write(hdfs_path, encoding='utf-8') as writer:
-            for record in validated_data:
-                json_line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
-                writer.write(json_line + ',')  # 添加逗号分隔符
+        write_page_bytes(hdfs_client, hdfs_path, [encode_data(dataset, _FULL_VALIDATOR)])
     except Exception as e:
         print(f"\t上传 {hdfs_path} 到 HDFS 失败: {str(e)}")
 
 
-def validate_and_fix_data(dataset: List[dict]) -> List[dict]:
+def hdfs_page_path(file_index: int, partition_date: Optional[date] = None, extension: str = "json",
+                   root: str = HDFS_DIR, prefix: str = "page") -> str:
     """
-    验证并修复数据
-    :param dataset: 原始数据集
-    :return: 验证和修复后的数据集
+    计算某一页在 HDFS 上的路径（按日期分区）
+    :param file_index: 文件索引
+    :param partition_date: 分区日期，默认当天
+    :param extension: 文件扩展名，json、json.gz 或 parquet
+    :param root: HDFS 存储根目录
+    :param prefix: 文件名前缀（分片滚动输出时带上分片序号）
+    :return: HDFS 文件路径
     """
-    validated_data = []
-    for record in dataset:
-        # 强制字段校验
-        if not all(record.get(field) for field in ["positionId", "companyFullName", "positionName"]):
-            continue
+    return f"{root.rstrip('/')}/{(partition_date or date.today()).strftime('%Y%m%d')}/{prefix}{file_index}.{extension}"
 
-        # 自动修复薪资格式
-        if "-" not in record["salary"]:
-            record["salary"] = "10k-25k"  # 默认值
-        validated_data.append(record)
 
-    return validated_data
+def write_bgzf_page(hdfs_client, hdfs_path: str, chunks: List[bytes], compresslevel: int = 6, threads: int = 4):
+    """
+    以覆盖方式将一页数据按 BGZF 分块压缩后写入 HDFS（压缩由线程池并行完成；先上传临时文件，完成后改名）
+    :param hdfs_client: HDFS 客户端
+    :param hdfs_path: HDFS 文件路径
+    :param chunks: 该页已编码的字节块
+    :param compresslevel: 压缩级别
+    :param threads: 并行压缩线程数
+    """
+    with BlockGzipSink([HdfsSink(hdfs_client, hdfs_path, overwrite=True, atomic=True)], compresslevel=compresslevel,
+                       threads=threads) as sink:
+        for chunk in chunks:
+            sink.write(chunk)
+
+
+def write_parquet_page(hdfs_client, hdfs_path: str, batches: List, row_group_size: Optional[int] = None):
+    """
+    以覆盖方式将一页 Arrow 数据块写为 HDFS 上的 Parquet 文件（流式写入，不在本地落盘；先上传临时文件，完成后改名）
+    :param hdfs_client: HDFS 客户端
+    :param hdfs_path: HDFS 文件路径
+    :param batches: 该页的 Arrow 数据块
+    :param row_group_size: 行组大小（行数），默认使用 parquet_sink 的默认值
+    """
+    from parquet_sink import DEFAULT_ROW_GROUP_SIZE, ParquetSink
+    with ParquetSink(HdfsSink(hdfs_client, hdfs_path, overwrite=True, atomic=True),
+                     row_group_size=row_group_size or DEFAULT_ROW_GROUP_SIZE) as sink:
+        for batch in batches:
+            sink.write_encoded(batch)
 
 
 if __name__ == "__main__":
@@ -3,32 +3,134 @@
 模块功能：生成职位数据并保存到Windows系统
 作者：D.C.Y.
 创建时间：2025/03/14 15:32:12
-最后修改时间：2025/03/22 0:34:45
+最后修改时间：2026/10/19 05:31:16
 """
 import os
-import json
-from typing import List
-from data_generation import generate_job_record
-
-
-def main():
+import sys
+import argparse
+from functools import partial
+from itertools import count
+from typing import List, Optional
+from batch_generation import generate_batch_records
+from checkpoint import open_run_checkpoint
+from data_profile import PROFILE_FILE_NAME
+from parallel_generation import (
+    add_generation_arguments,
+    build_id_allocator,
+    build_record_validator,
+    build_run_metrics,
+    check_output_arguments,
+    is_rolling,
+)
+from pipeline import (
+    RollingWriter,
+    encode_data,
+    encode_data_with_offsets,
+    encode_parquet_data,
+    run_pipeline,
+    run_rolling_pipeline,
+)
+from run_metrics import format_eta
+from sinks import BlockGzipSink, FanOutWriter, LocalFileSink
+
+OUTPUT_ROOT = ".."  # 默认输出根目录（项目根目录）
+DEFAULT_SALARY = "15k-25k"  # 薪资格式不符时替换的默认值
+
+
+def main(argv: Optional[List[str]] = None):
     """
     主执行函数
+    :param argv: 命令行参数，默认读取 sys.argv
     """
-    initialize_directories()
-
-    total_files = 30
-    for file_index in range(1, total_files + 1):
-        dataset = generate_batch_data(1000)
-        save_data(file_index, dataset)
-        print_progress(file_index, total_files, dataset)  # 传递 dataset 参数
+    args = parse_args(argv)
+    checkpoint = open_run_checkpoint(args)  # 续跑时回填首次运行的种子、基准日期和职位ID密钥
+    if checkpoint is not None and checkpoint.completed:
+        print(f"断点 {args.checkpoint} 记录的运行已全部完成，无需重新生成")
+        return
+    root = args.output_dir
+    validator = build_record_validator(args, DEFAULT_SALARY)
+    distributions, knowledge_base = args.distributions, args.opened_knowledge_base
+    if args.format == "parquet":
+        output_dirs = [f"{root}/JobData-Parquet"]
+        transform = partial(encode_parquet_data, validator=validator)
+        open_page = partial(open_parquet_page_writer, row_group_size=args.row_group_size, output_root=root)
+    else:
+        output_dirs = [f"{root}/JobData", f"{root}/JobData-Json"]
+        transform = partial(encode_data, validator=validator)
+        open_page = partial(open_page_writer, compress=args.compress, compresslevel=args.compress_level,
+                            threads=args.compress_threads, output_root=root)
+    initialize_directories(output_dirs)
+
+    batch_size = args.page_size
+    with build_run_metrics(args) as metrics:
+        if is_rolling(args):
+            # 按大小滚动输出：文件边界由目标字节数/记录数决定，--max-bytes 时生成到字节预算为止
+            def on_file_done(writer: RollingWriter):
+                if checkpoint is not None:
+                    checkpoint.commit_file(writer)
+                print_rolling_progress(writer, eta=metrics.eta())
+
+            rolling = run_rolling_pipeline(
+                batch_size, open_page, partial(encode_data_with_offsets, validator=validator), max_file_bytes=args.roll_size,
+                max_file_records=args.roll_records, byte_budget=args.max_bytes,
+                total_records=None if args.max_bytes else args.page_count * batch_size, workers=args.workers,
+                seed=args.seed, reference_date=args.date, id_allocator=build_id_allocator(args),
+                on_file_done=on_file_done, metrics=metrics, resume=checkpoint.rolling if checkpoint is not None else None,
+                distributions=distributions, knowledge_base=knowledge_base)
+            print_rolling_progress(rolling, output_dirs)
+        else:
+            pages = args.pages or range(1, args.page_count + 1)
+            remaining = checkpoint.remaining(pages) if checkpoint is not None else pages
+            done = count(len(pages) - len(remaining) + 1)
+
+            def on_page_done(file_index: int):
+                if checkpoint is not None:
+                    checkpoint.commit_page(file_index)
+                print_progress(next(done), len(pages), batch_size, output_dirs, eta=metrics.eta())
+
+            def on_page_error(file_index: int, e: Exception):
+                if checkpoint is not None:
+                    checkpoint.record_failure(file_index, e)
+                print(f"文件保存失败: {str(e)}")
+
+            # 数据块的校验与编码在工作进程内完成，主进程只负责按页码顺序流式写文件
+            run_pipeline(remaining, batch_size, open_page, transform, workers=args.workers,
+                         seed=args.seed, reference_date=args.date, id_allocator=build_id_allocator(args),
+                         on_page_done=on_page_done, on_page_error=on_page_error, metrics=metrics,
+                         distributions=distributions, knowledge_base=knowledge_base)
+    if checkpoint is not None:
+        checkpoint.finish()
+    if metrics.profile is not None:
+        # 画像在生成过程中已统计完毕，无需再读一遍输出
+        profile_path = os.path.join(output_dirs[0], PROFILE_FILE_NAME)
+        metrics.profile.write_report(profile_path)
+        print(f"数据画像已写入 {profile_path}")
+    if args.metrics_file:
+        print(f"{metrics.format_summary()}\n运行指标已写入 {args.metrics_file}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    解析命令行参数
+    :param argv: 命令行参数列表
+    :return: 解析结果
+    """
+    parser = argparse.ArgumentParser(description="生成职位数据并保存到本地目录")
+    add_generation_arguments(parser)
+    parser.add_argument("--output-dir", default=OUTPUT_ROOT,
+                        help=f"输出根目录，其下创建 JobData、JobData-Json 或 JobData-Parquet（默认 {OUTPUT_ROOT}）")
+    args = parser.parse_args(argv)
+    # 知识库与字段权重分布在校验参数时已构建，随解析结果传给生成流程
+    args.opened_knowledge_base, args.distributions = check_output_arguments(parser, args)
+    return args
 
 
-def initialize_directories():
+def initialize_directories(dirs: Optional[List[str]] = None):
     """
     安全创建存储目录
+    :param dirs: 目录列表，默认为两个JSON输出目录
     """
-    dirs = ["../JobData", "../JobData-Json"]
+    dirs = dirs or ["../JobData", "../JobData-Json"]
     for d in dirs:
         try:
             os.makedirs(d, exist_ok=True)
@@ -43,7 +145,7 @@ def generate_batch_data(batch_size: int) -> List[dict]:
     :param batch_size: 批量数据的数量
     :return: 包含多个职位信息的列表
     """
-    return [generate_job_record() for _ in range(batch_size)]
+    return generate_batch_records(batch_size)
 
 
 def save_data(file_index: int, dataset: List[dict]):
@@ -52,60 +154,92 @@ def save_data(file_index: int, dataset: List[dict]):
     :param file_index: 文件索引
     :param dataset: 包含多个职位信息的列表
     """
-    validated_data = validate_and_fix_data(dataset)
+    write_data(file_index, encode_data(dataset))
 
-    try:
-        # 保存无扩展名版本
-        with open(f"../JobData/page{file_index}", "w", encoding="utf-8") as f:
-            for record in validated_data:
-                json_line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))  # 使用紧凑格式
-                f.write(json_line + ',')  # 每个记录用逗号分隔
 
-        # 保存为JSON Lines格式（.json）
-        with open(f"../JobData-Json/page{file_index}.json", "w", encoding="utf-8") as f:
-            for record in validated_data:
-                json_line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))  # 使用紧凑格式
-                f.write(json_line + ',')  # 每个记录用逗号分隔
+def write_data(file_index: int, payload: bytes):
+    """
+    将整页数据同时写入无扩展名版本和 .json 版本
+    :param file_index: 文件索引
+    :param payload: 整页UTF-8字节串
+    """
+    try:
+        with open_page_writer(file_index) as writer:
+            writer.write_encoded(payload)
 
     except IOError as e:
         print(f"文件保存失败: {str(e)}")
 
 
-def validate_and_fix_data(dataset: List[dict]) -> List[dict]:
+def open_page_writer(file_index: int, compress: str = "none", compresslevel: int = 6, threads: int = 4,
+                     output_root: str = OUTPUT_ROOT) -> FanOutWriter:
     """
-    验证并修复数据
-    :param dataset: 原始数据集
-    :return: 验证和修复后的数据集
+    打开一页的写入器，同时写入无扩展名版本和 .json 版本（先写临时文件，关闭时改名，中断不会留下不完整的页）
+    :param file_index: 文件索引
+    :param compress: 压缩方式，none 或 bgzf（两个文件加 .gz 后缀，只压缩一次）
+    :param compresslevel: 压缩级别
+    :param threads: 并行压缩线程数
+    :param output_root: 输出根目录
+    :return: 写入器
     """
-    validated_data = []
-    for record in dataset:
-        # 强制字段校验
-        if not all(record.get(field) for field in ["positionId", "companyFullName", "positionName"]):
-            continue
-
-        # 自动修复薪资格式
-        if "-" not in record["salary"]:
-            record["salary"] = "15k-25k"
+    suffix = ".gz" if compress == "bgzf" else ""
+    sinks = [LocalFileSink(f"{output_root}/JobData/page{file_index}{suffix}", atomic=True)]  # 保存无扩展名版本
+    try:
+        # 保存为JSON Lines格式（.json）
+        sinks.append(LocalFileSink(f"{output_root}/JobData-Json/page{file_index}.json{suffix}", atomic=True))
+    except IOError:
+        sinks[0].__exit__(*sys.exc_info())  # 丢弃已创建的临时文件
+        raise
+    if compress == "bgzf":
+        sinks = [BlockGzipSink(sinks, compresslevel=compresslevel, threads=threads)]
+    return FanOutWriter(sinks)
 
-        validated_data.append(record)
 
-    return validated_data
+def open_parquet_page_writer(file_index: int, row_group_size: Optional[int] = None, output_root: str = OUTPUT_ROOT):
+    """
+    打开一页的 Parquet 写入器（先写临时文件，关闭时改名）
+    :param file_index: 文件索引
+    :param row_group_size: 行组大小（行数），默认使用 parquet_sink 的默认值
+    :param output_root: 输出根目录
+    :return: 写入器
+    """
+    from parquet_sink import DEFAULT_ROW_GROUP_SIZE, ParquetSink
+    return ParquetSink(LocalFileSink(f"{output_root}/JobData-Parquet/page{file_index}.parquet", atomic=True),
+                       row_group_size=row_group_size or DEFAULT_ROW_GROUP_SIZE)
 
 
-def print_progress(current: int, total: int, dataset):
+def print_progress(current: int, total: int, batch_size: int, output_dirs: Optional[List[str]] = None,
+                   eta: Optional[float] = None):
     """
     带颜色的进度显示
     :param current: 当前进度
     :param total: 总进度
-    :param dataset: 数据集
+    :param batch_size: 每个文件包含的招聘信息数量
+    :param output_dirs: 输出目录列表，默认为两个JSON输出目录
+    :param eta: 按实时吞吐估算的剩余秒数
     """
     progress = current / total * 100
     bar = f"[{'#' * int(progress // 3.33)}{' ' * (30 - int(progress // 3.33))}]"
-    print(f"\r生成进度: {bar} {progress:.1f}%", end="")
+    print(f"\r生成进度: {bar} {progress:.1f}%{format_eta(eta) if current < total else '':<12}", end="")
     if current == total:
         print(f"\n模拟数据生成完毕...\n"
-              f"共生成{total}个文件，每个文件有{len(dataset)}个招聘信息...\n"
-              f"请检查目录../JobData和../JobData-Json")
+              f"共生成{total}个文件，每个文件有{batch_size}个招聘信息...\n"
+              f"请检查目录{'和'.join(output_dirs or ['../JobData', '../JobData-Json'])}")
+
+
+def print_rolling_progress(writer: RollingWriter, output_dirs: Optional[List[str]] = None,
+                           eta: Optional[float] = None):
+    """
+    滚动输出模式的进度显示
+    :param writer: 滚动写入器
+    :param output_dirs: 输出目录列表，指定时表示生成结束并输出汇总信息
+    :param eta: 按实时吞吐估算的剩余秒数
+    """
+    print(f"\r已写入 {writer.files_written} 个文件，{writer.records_written} 条招聘信息，"
+          f"{writer.bytes_written / (1 << 20):.1f} MB{format_eta(eta)}", end="")
+    if output_dirs is not None:
+        print(f"\n模拟数据生成完毕...\n"
+              f"请检查目录{'和'.join(output_dirs)}")
 
 
 if __name__ == "__main__":
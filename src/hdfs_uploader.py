@@ -0,0 +1,273 @@
+"""
+模块名称：hdfs_uploader.py
+模块职责：并发上传HDFS（生产者/消费者模型：有界队列反压、多路 WebHDFS 写入流、失败重试与退避）
+作者：D.C.Y.
+创建时间：2026/10/18 17:40:26
+最后修改时间：2026/10/19 02:48:31
+"""
+import pickle
+import queue
+import random
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from run_metrics import RunMetrics, payload_size
+from sinks import HdfsSink
+
+_STOP = object()  # 通知上传线程退出的哨兵
+DEFAULT_SPOOL_SIZE = 16 << 20  # 每个待上传页面在内存中保留的最大字节数，超出部分溢写到本地临时文件
+
+
+class ConcurrentUploader:
+    """
+    并发上传器：主线程（生产者）提交已编码的页面，多个上传线程（消费者）各自持有一个 HDFS 客户端并行写入。
+
+    - 任务队列有界，上传跟不上生成时 submit 会阻塞，内存占用不超过 (队列长度 + 并发数 + 1) 个页面；
+      经 open_page 缓冲的页面超过 spool_size 的部分溢写到本地临时文件，页面再大内存上限也不变；
+    - 单页上传失败时按指数退避（含随机抖动）重试，重试以覆盖方式重新写入整页；
+    - 重试耗尽的页面、创建客户端失败或上传成功回调出错的页面记入 failed_pages，上传线程继续处理后续页面，
+      由调用方在结束时汇总报告。
+    """
+
+    def __init__(self, client_factory: Callable[[], object], concurrency: int = 4,
+                 queue_size: Optional[int] = None, max_retries: int = 3, backoff: float = 1.0,
+                 on_uploaded: Optional[Callable[[int], None]] = None,
+                 on_retry: Optional[Callable[[int, int, Exception], None]] = None,
+                 page_writer: Optional[Callable[[object, str, List], None]] = None,
+                 metrics: Optional[RunMetrics] = None, spool_size: int = DEFAULT_SPOOL_SIZE):
+        """
+        :param client_factory: 创建 HDFS 客户端的函数，每个上传线程在首次上传时调用（客户端不在线程间共享，创建失败时下一页重新创建）
+        :param concurrency: 并发上传线程数（同时进行的 WebHDFS 写入流数量）
+        :param queue_size: 等待上传的页面队列长度，默认为并发数的2倍
+        :param max_retries: 单页最大重试次数
+        :param backoff: 首次重试前的等待秒数，之后每次翻倍
+        :param on_uploaded: 某页上传成功后的回调
+        :param on_retry: 某页即将重试时的回调，参数为 (页码, 第几次重试, 异常)
+        :param page_writer: 将一页数据块写入 HDFS 的函数，参数为 (客户端, 路径, 数据块列表)，默认按字节块写入
+        :param metrics: 运行指标，记录每次上传尝试的延迟、重试与失败页数
+        :param spool_size: open_page 缓冲的每个页面在内存中保留的最大字节数，超出部分溢写到本地临时文件
+        """
+        if concurrency < 1:
+            raise ValueError(f"并发上传数至少为1: {concurrency}")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.failed_pages: Dict[int, Exception] = {}
+        self.uploaded_pages = 0
+        self.spool_size = spool_size
+        self._client_factory = client_factory
+        self._on_uploaded = on_uploaded
+        self._on_retry = on_retry
+        self._page_writer = page_writer or write_page_bytes
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue(maxsize=queue_size if queue_size is not None else concurrency * 2)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"hdfs-upload-{i}", daemon=True)
+            for i in range(concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, page_index: int, path: str, chunks: Union[List, "SpooledChunks"]):
+        """
+        提交一页待上传数据，队列已满时阻塞（反压生产者）
+        :param page_index: 页码
+        :param path: HDFS 文件路径
+        :param chunks: 该页已编码的数据块（列表或溢写数据块序列，后者上传结束后删除临时文件）
+        """
+        self._jobs.put((page_index, path, chunks))
+
+    def open_page(self, page_index: int, path: str) -> "PageBuffer":
+        """
+        打开一个页面缓冲区，写入的数据块在关闭时整体提交上传（可作为流水线的写入器），超过 spool_size 的部分溢写到本地临时文件
+        :param page_index: 页码（或文件序号）
+        :param path: HDFS 文件路径
+        :return: 页面缓冲区
+        """
+        return PageBuffer(self, page_index, path, spool_size=self.spool_size)
+
+    def close(self) -> Dict[int, Exception]:
+        """
+        等待所有已提交页面上传完成并停止上传线程
+        :return: 上传失败的页码及其最后一次异常
+        """
+        for _ in self._threads:
+            self._jobs.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        return self.failed_pages
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run(self):
+        """
+        上传线程主循环：任何一页出错都只记入 failed_pages，线程始终继续取出队列中的页面，submit 与 close 不会因线程退出而阻塞
+        """
+        client = None
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+            page_index, path, chunks = job
+            try:
+                if client is None:
+                    client = self._client_factory()
+                error = self._upload_with_retry(client, page_index, path, chunks)
+            except Exception as e:
+                error = e
+            finally:
+                if isinstance(chunks, SpooledChunks):
+                    chunks.close()
+            with self._lock:
+                if error is None and self._on_uploaded is not None:
+                    try:
+                        self._on_uploaded(page_index)
+                    except Exception as e:
+                        error = e
+                if error is not None:
+                    self.failed_pages[page_index] = error
+                    if self._metrics is not None:
+                        self._metrics.observe_upload_failure()
+                    continue
+                self.uploaded_pages += 1
+
+    def _upload_with_retry(self, client, page_index: int, path: str, chunks: List) -> Optional[Exception]:
+        """
+        上传一页，失败时按指数退避重试
+        :param client: HDFS 客户端
+        :param page_index: 页码
+        :param path: HDFS 文件路径
+        :param chunks: 该页已编码的数据块
+        :return: 重试耗尽后的最后一次异常，成功返回 None
+        """
+        size = chunks.nbytes if isinstance(chunks, SpooledChunks) else sum(payload_size(chunk) for chunk in chunks)
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                self._page_writer(client, path, chunks)
+                self._observe_upload(start, size, True)
+                return None
+            except Exception as e:
+                self._observe_upload(start, size, False)
+                if attempt == self.max_retries:
+                    return e
+                if self._metrics is not None:
+                    self._metrics.observe_retry()
+                if self._on_retry is not None:
+                    with self._lock:
+                        self._on_retry(page_index, attempt + 1, e)
+                # 指数退避，叠加随机抖动避免多个线程同时重试
+                time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+        return None
+
+    def _observe_upload(self, start: float, size: int, succeeded: bool):
+        """
+        记录一次上传尝试的指标
+        :param start: 尝试开始时刻（perf_counter）
+        :param size: 该页数据块的总字节数
+        :param succeeded: 是否成功
+        """
+        if self._metrics is not None:
+            self._metrics.observe_upload(time.perf_counter() - start, size, succeeded)
+
+
+class SpooledChunks:
+    """
+    溢写数据块序列：按顺序保存一页的数据块，超过内存上限的部分写入本地临时文件；可重复迭代（重试时重新读出整页）。
+    字节块原样保存，其他数据块（如 Arrow 数据块）序列化后保存
+    """
+
+    def __init__(self, max_memory: int = DEFAULT_SPOOL_SIZE):
+        """
+        :param max_memory: 在内存中保留的最大字节数
+        """
+        self.nbytes = 0
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self._entries: List[Tuple[int, bool]] = []  # 每个数据块的 (保存长度, 是否为原始字节)
+
+    def append(self, chunk):
+        """
+        追加一个数据块
+        :param chunk: 字节串或可序列化的数据块
+        """
+        raw = isinstance(chunk, (bytes, bytearray, memoryview))
+        data = chunk if raw else pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.seek(0, 2)
+        self._file.write(data)
+        self._entries.append((len(data), raw))
+        self.nbytes += payload_size(chunk)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator:
+        self._file.seek(0)
+        for length, raw in self._entries:
+            data = self._file.read(length)
+            yield data if raw else pickle.loads(data)
+
+    def close(self):
+        """
+        释放内存缓冲并删除临时文件
+        """
+        self._file.close()
+
+
+class PageBuffer:
+    """
+    页面缓冲区：收集一页的数据块，关闭时提交给上传器（重试时需要重新发送整页数据）。
+    超过 spool_size 的部分溢写到本地临时文件，内存占用与页面（或滚动文件）大小无关
+    """
+
+    def __init__(self, uploader: ConcurrentUploader, page_index: int, path: str,
+                 spool_size: int = DEFAULT_SPOOL_SIZE):
+        """
+        :param uploader: 并发上传器
+        :param page_index: 页码（或文件序号）
+        :param path: HDFS 文件路径
+        :param spool_size: 在内存中保留的最大字节数
+        """
+        self.page_index = page_index
+        self.path = path
+        self.chunks = SpooledChunks(spool_size)
+        self._uploader = uploader
+
+    def write_encoded(self, chunk):
+        """
+        追加一个已编码的数据块
+        :param chunk: 数据块
+        """
+        self.chunks.append(chunk)
+
+    def close(self):
+        """
+        提交整页数据上传，上传队列已满时阻塞
+        """
+        self._uploader.submit(self.page_index, self.path, self.chunks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.chunks.close()
+
+
+def write_page_bytes(client, path: str, chunks: List[bytes]):
+    """
+    以覆盖方式将一页已编码的字节块写入 HDFS（先上传临时文件，完成后改名，中断不会留下不完整的页）
+    :param client: HDFS 客户端
+    :param path: HDFS 文件路径
+    :param chunks: 字节块列表
+    """
+    with HdfsSink(client, path, overwrite=True, atomic=True) as sink:
+        for chunk in chunks:
+            sink.write(chunk)
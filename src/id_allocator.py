@@ -0,0 +1,143 @@
+"""
+模块名称：id_allocator.py
+模块职责：职位ID分配器（基于带密钥的Feistel置换，常数内存、无冲突）
+作者：D.C.Y.
+创建时间：2026/10/18 14:02:10
+最后修改时间：2026/10/19 05:02:36
+"""
+from typing import List
+
+import numpy as np
+
+_ROUNDS = 6  # Feistel轮数
+_MASK64 = (1 << 64) - 1
+MIN_ID_WIDTH = 2
+MAX_ID_WIDTH = 19  # Feistel网络的左右两半合计不能超过64位（数组版本按 uint64 计算），20位ID需要68位
+DEFAULT_ID_WIDTH = 7  # 默认职位ID位数，约900万个ID；运行规模更大时自动加宽
+
+
+def id_capacity(width: int) -> int:
+    """
+    width 位职位ID空间的容量
+    :param width: ID的十进制位数
+    :return: 可分配的ID个数
+    """
+    return 10 ** width - 10 ** (width - 1)
+
+
+class PositionIdAllocator:
+    """
+    将全局记录序号一一映射为职位ID。
+
+    ID空间为 width 位十进制数 [10^(width-1), 10^width)。序号经带密钥的Feistel网络置换
+    （超出ID空间时循环置换，即cycle walking），因此：
+    - 不同序号必然得到不同ID，无需保存已生成ID，内存占用为常数；
+    - 任意序号区间可单独计算，多进程按序号分段即可保证全局唯一；
+    - 相同 run_key 下，后续运行从上次的序号继续分配（offset），追加数据也不会重复。
+    """
+
+    def __init__(self, run_key: int, width: int = DEFAULT_ID_WIDTH, offset: int = 0):
+        """
+        :param run_key: 运行密钥，决定置换方式
+        :param width: ID的十进制位数
+        :param offset: 序号起点，用于在同一密钥下接续之前的运行
+        """
+        if not MIN_ID_WIDTH <= width <= MAX_ID_WIDTH:
+            raise ValueError(f"职位ID位数须在 {MIN_ID_WIDTH}-{MAX_ID_WIDTH} 之间: {width}")
+        self.run_key = run_key
+        self.width = width
+        self.offset = offset
+        self.low = 10 ** (width - 1)
+        self.capacity = id_capacity(width)
+        # 平衡Feistel网络：左右两半各 half_bits 位，覆盖整个ID空间
+        self._half_bits = ((self.capacity - 1).bit_length() + 1) // 2
+        self._half_mask = (1 << self._half_bits) - 1
+        self._round_keys = [int(k) for k in np.random.SeedSequence(run_key).generate_state(_ROUNDS, np.uint64)]
+
+    def id_at(self, index: int) -> int:
+        """
+        计算单个序号对应的职位ID
+        :param index: 序号（相对 offset）
+        :return: 职位ID
+        """
+        sequence = self._check_range(index, 1)
+        value = self._permute(sequence)
+        while value >= self.capacity:
+            value = self._permute(value)
+        return self.low + value
+
+    def ids_for(self, start: int, n: int) -> List[int]:
+        """
+        批量计算连续序号区间 [start, start + n) 对应的职位ID
+        :param start: 起始序号（相对 offset）
+        :param n: 数量
+        :return: 职位ID列表
+        """
+        sequence = self._check_range(start, n)
+        values = self._permute_array(np.arange(sequence, sequence + n, dtype=np.uint64))
+        pending = values >= self.capacity
+        while pending.any():
+            values[pending] = self._permute_array(values[pending])
+            pending = values >= self.capacity
+        return (values + np.uint64(self.low)).tolist()
+
+    def _check_range(self, start: int, n: int) -> int:
+        """
+        检查序号区间是否在ID空间内
+        :param start: 起始序号（相对 offset）
+        :param n: 数量
+        :return: 绝对起始序号
+        """
+        sequence = self.offset + start
+        if sequence < 0 or sequence + n > self.capacity:
+            raise ValueError(f"职位ID空间已耗尽: 序号 [{sequence}, {sequence + n}) 超出 {self.width} 位ID容量 {self.capacity}")
+        return sequence
+
+    def _permute(self, value: int) -> int:
+        """
+        对单个值执行一次Feistel置换
+        :param value: 输入值
+        :return: 置换结果
+        """
+        left, right = value >> self._half_bits, value & self._half_mask
+        for key in self._round_keys:
+            left, right = right, left ^ (_mix(right ^ key) & self._half_mask)
+        return (left << self._half_bits) | right
+
+    def _permute_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        对数组执行一次Feistel置换（与 _permute 逐元素等价）
+        :param values: uint64数组
+        :return: 置换结果
+        """
+        bits, mask = np.uint64(self._half_bits), np.uint64(self._half_mask)
+        left, right = values >> bits, values & mask
+        for key in self._round_keys:
+            round_value = _mix_array(right ^ np.uint64(key))
+            round_value &= mask
+            round_value ^= left
+            left, right = right, round_value
+        left <<= bits
+        left |= right
+        return left
+
+
+def _mix(value: int) -> int:
+    """
+    Feistel轮函数（乘法哈希 + 异或移位）
+    :param value: 64位输入
+    :return: 64位输出
+    """
+    value = value * 0x9E3779B97F4A7C15 & _MASK64
+    return value ^ (value >> 29)
+
+
+def _mix_array(values: np.ndarray) -> np.ndarray:
+    """
+    轮函数的数组版本（原地计算），uint64乘法自然按2^64取模
+    :param values: uint64数组，会被修改
+    :return: uint64数组
+    """
+    values *= np.uint64(0x9E3779B97F4A7C15)
+    values ^= values >> np.uint64(29)
+    return values
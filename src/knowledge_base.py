@@ -0,0 +1,364 @@
+"""
+模块名称：knowledge_base.py
+模块职责：外部知识库：从外部文件读取公司、行业、地址、福利和岗位要求目录，编译为紧凑的带索引二进制文件；
+         生成时各工作进程以只读方式内存映射同一文件，按下标直接取值，不再各自持有一份目录的 Python 列表
+作者：D.C.Y.
+创建时间：2026/10/19 01:43:26
+最后修改时间：2026/10/19 05:44:21
+"""
+import argparse
+import io
+import json
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core_logic import enumerate_address_template, register_companies, salary_bounds
+from data_definitions import (
+    ADDRESS_TEMPLATES,
+    BIGDATA_COMPANIES,
+    INDUSTRY_FIELDS,
+    POSITION_REQUIREMENTS,
+    WELFARE_OPTIONS,
+)
+from data_generation import generate_short_name
+from record_schema import JOB_TYPE_PIECES, JOB_TYPES
+
+MAGIC = b"JOBKB\x00\x00\x00"  # 知识库文件标识
+VERSION = 1
+_HEADER = struct.Struct("<8sIIQQ")  # 标识、版本、保留、目录偏移、目录长度
+_ALIGNMENT = 8  # 各数据段按8字节对齐，内存映射后可直接作为 NumPy 数组使用
+MATERIALIZE_LIMIT = 1 << 12  # 条目数不超过该值的字符串表首次使用时解码为数组（取值更快），更大的表按需解码
+UNRESOLVED_SAMPLE = 10  # 编译时列出的未解析地区公司数量上限
+
+# 源目录中的目录文件：文件名 -> (知识库中的名称, 内置默认值)；文本文件每行一项（忽略空行），缺少的文件使用内置目录
+SOURCE_FILES = {
+    "companies.txt": ("companies", BIGDATA_COMPANIES),
+    "industries.txt": ("industries", INDUSTRY_FIELDS),
+    "addresses.txt": ("address_templates", ADDRESS_TEMPLATES),
+    "welfare.txt": ("welfare", WELFARE_OPTIONS),
+    "requirements.json": ("requirements", POSITION_REQUIREMENTS),
+}
+
+
+class StringTable(Sequence):
+    """
+    字符串表：偏移数组 + 连续的 UTF-8 字节段（每个条目以换行符结尾），按下标 O(1) 定位，只解码被抽中的条目
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        """
+        :param data: 字节段（uint8 数组视图）
+        :param offsets: 各条目在字节段中的偏移，长度为条目数 + 1
+        """
+        self.data = data
+        self.offsets = offsets
+        self._values: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if self._values is not None:
+            return self._values[index]
+        index = range(len(self))[index]
+        start, end = self.offsets[index:index + 2].tolist()
+        return self.data[start:end - 1].tobytes().decode("utf-8")
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        全部条目组成的 object 数组（首次访问时解码并缓存，只应用于小表）
+        """
+        if self._values is None:
+            self._values = np.array([self[i] for i in range(len(self))], dtype=object)
+        return self._values
+
+    def take(self, indices: np.ndarray) -> List[str]:
+        """
+        按下标数组批量取值
+        :param indices: 下标数组
+        :return: 字符串列表
+        """
+        if self._values is not None or len(self) <= MATERIALIZE_LIMIT:
+            return self.values[indices].tolist()
+        if not len(indices):
+            return []
+        # 把抽中的条目（含结尾的换行符）一次性收集为连续字节串，整体解码后按换行符切分
+        starts = self.offsets[indices].astype(np.int64)
+        lengths = self.offsets[indices + 1].astype(np.int64) - starts
+        ends = np.cumsum(lengths)
+        positions = np.arange(ends[-1]) + np.repeat(starts - ends + lengths, lengths)
+        return self.data[positions].tobytes().decode("utf-8").split("\n")[:-1]
+
+
+class KnowledgeBase:
+    """
+    已编译的知识库。
+
+    - 公司（含简称与各职位类型的薪资上下界）、行业、福利、地址均为按下标取值的只读表，条目数与生成速度无关；
+    - 从文件打开时使用只读内存映射，多个工作进程共享操作系统的同一份页缓存，打开只需解析文件末尾的目录；
+    - 随任务传给工作进程时只序列化文件路径，各进程首次使用时打开一次。
+    """
+
+    def __init__(self, buffer, path: Optional[str] = None):
+        """
+        :param buffer: 知识库文件内容（内存映射或字节串）
+        :param path: 知识库文件路径，内置知识库为 None
+        """
+        if len(buffer) < _HEADER.size:
+            raise ValueError(f"不是知识库文件: {path}")
+        magic, version, _, directory_offset, directory_length = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是知识库文件: {path}")
+        if version != VERSION:
+            raise ValueError(f"不支持的知识库版本: {version}")
+        directory = json.loads(bytes(buffer[directory_offset:directory_offset + directory_length]).decode("utf-8"))
+        if directory["job_types"] != list(JOB_TYPES):
+            raise ValueError(f"知识库的职位类型与当前版本不一致，请重新编译: {path}")
+        self.path = path
+        self.counts: Dict[str, int] = directory["counts"]
+        self._buffer = buffer
+        self._sections = directory["sections"]
+
+        self.companies = self._strings("companies")
+        self.short_names = self._strings("short_names")
+        self.industries = self._strings("industries")
+        self.welfare = self._strings("welfare")
+        self.addresses = self._strings("addresses")  # 全部地址模板展开后按城市分组排列的地址池
+        self.cities = self._strings("cities")  # 地址池中的城市（按城市偏斜时的候选值）
+        self.address_offsets = self._array("address_offsets")  # 各城市在地址池中的起点
+        self.address_sizes = self._array("address_sizes")  # 各城市的地址数
+        self.salary_bounds = self._array("salary_bounds")  # 形如 (公司数, 职位类型数, 2) 的薪资上下界
+        requirements = json.loads(bytes(self._array("requirements")).decode("utf-8"))
+        # 与内置岗位要求相同时引用内置对象，编码器对这些常量结构的缓存仍然生效
+        self.requirements = np.empty(len(JOB_TYPES), dtype=object)
+        for j, job_type in enumerate(JOB_TYPES):
+            builtin = JOB_TYPE_PIECES[job_type].requirements
+            self.requirements[j] = builtin if requirements[job_type] == builtin else requirements[job_type]
+
+    def __reduce__(self):
+        # 传给工作进程时只传路径，由工作进程自行内存映射（每个进程只打开一次）
+        if self.path is None:
+            return builtin_knowledge_base, ()
+        return open_knowledge_base, (self.path,)
+
+    def _array(self, name: str) -> np.ndarray:
+        """
+        数据段的只读数组视图（不复制）
+        :param name: 数据段名称
+        :return: 数组
+        """
+        offset, dtype, shape = self._sections[name]
+        array = np.frombuffer(self._buffer, dtype=dtype, count=int(np.prod(shape)), offset=offset)
+        return array.reshape(shape)
+
+    def _strings(self, name: str) -> StringTable:
+        """
+        字符串表视图
+        :param name: 字符串表名称
+        :return: 字符串表
+        """
+        return StringTable(self._array(f"{name}.data"), self._array(f"{name}.offsets"))
+
+
+def compile_catalogs(companies: List[str], industries: List[str], address_templates: List[str],
+                     welfare: List[str], requirements: Dict[str, List[Dict]],
+                     out: io.RawIOBase) -> Tuple[Dict[str, int], List[str]]:
+    """
+    将各目录编译为知识库二进制格式：文件头 + 按8字节对齐的数据段 + 文件末尾的JSON目录
+    :param companies: 公司全称
+    :param industries: 行业领域
+    :param address_templates: 地址模板（含 {} 占位符的按原规则展开，不含占位符的即为一个地址），按前两个字归入城市
+    :param welfare: 福利选项
+    :param requirements: 职位类型 -> 岗位要求层级
+    :param out: 可写、可定位的二进制输出流
+    :return: 各目录的条目数，以及未能解析出地区的公司（按"其他"地区计算薪资）
+    """
+    # 每条记录的 businessArea 抽取1-3个行业、welfare 抽取2-5项福利，目录不能少于抽取数
+    for name, values, minimum in (("公司", companies, 1), ("行业", industries, 3), ("地址", address_templates, 1),
+                                  ("福利", welfare, 5)):
+        if len(values) < minimum:
+            raise ValueError(f"{name}目录至少需要{minimum}项")
+    missing = [job_type for job_type in JOB_TYPES if job_type not in requirements]
+    if missing:
+        raise ValueError(f"岗位要求缺少职位类型: {', '.join(missing)}")
+
+    # 先按城市（模板的前两个字，与 weighted_sampling 一致）均匀选择，再在该城市的地址中均匀选择
+    groups: Dict[str, List[str]] = {}
+    for template in address_templates:
+        groups.setdefault(template[:2], []).extend(enumerate_address_template(template) if "{}" in template
+                                                   else [template])
+    sizes = np.array([len(group) for group in groups.values()], dtype=np.int64)
+    unresolved = register_companies(companies)
+    bounds = np.array([[salary_bounds(job_type, company) for job_type in JOB_TYPES] for company in companies],
+                      dtype=np.int16).reshape(len(companies), len(JOB_TYPES), 2)
+    if bounds.min() < 0 or bounds.max() > 100 or (bounds[..., 1] - bounds[..., 0] < 5).any():
+        raise ValueError("薪资上下界超出 0k-100k 或区间不足5k")
+
+    sections: Dict[str, list] = {}
+    out.write(b"\x00" * _HEADER.size)
+
+    def write_array(name: str, array: np.ndarray):
+        position = out.tell()
+        out.write(b"\x00" * (-position % _ALIGNMENT))
+        sections[name] = [out.tell(), array.dtype.str, list(array.shape)]
+        out.write(np.ascontiguousarray(array).tobytes())
+
+    def write_strings(name: str, values: List[str]):
+        if any("\n" in value for value in values):
+            raise ValueError(f"{name} 的条目不能包含换行符")
+        encoded = [f"{value}\n".encode("utf-8") for value in values]
+        offsets = np.concatenate(([0], np.cumsum([len(e) for e in encoded], dtype=np.int64)))
+        write_array(f"{name}.offsets", offsets.astype(_index_dtype(offsets[-1])))
+        write_array(f"{name}.data", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    write_strings("companies", companies)
+    write_strings("short_names", [generate_short_name(company) for company in companies])
+    write_strings("industries", industries)
+    write_strings("welfare", welfare)
+    write_strings("addresses", [address for group in groups.values() for address in group])
+    write_strings("cities", list(groups))
+    address_dtype = _index_dtype(sizes.sum())
+    write_array("address_offsets", np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(address_dtype))
+    write_array("address_sizes", sizes.astype(address_dtype))
+    write_array("salary_bounds", bounds)
+    write_array("requirements", np.frombuffer(
+        json.dumps({job_type: requirements[job_type] for job_type in JOB_TYPES}, ensure_ascii=False).encode("utf-8"),
+        dtype=np.uint8))
+
+    counts = {"companies": len(companies), "industries": len(industries), "address_templates": len(address_templates),
+              "cities": len(groups), "addresses": int(sizes.sum()), "welfare": len(welfare)}
+    directory = json.dumps({"job_types": list(JOB_TYPES), "counts": counts, "sections": sections},
+                           ensure_ascii=False).encode("utf-8")
+    directory_offset = out.tell()
+    out.write(directory)
+    out.seek(0)
+    out.write(_HEADER.pack(MAGIC, VERSION, 0, directory_offset, len(directory)))
+    return counts, unresolved
+
+
+def _index_dtype(max_value: int) -> np.dtype:
+    """
+    偏移量数组的类型：不超过 4GiB 时用 uint32，否则用 int64
+    :param max_value: 最大偏移量
+    :return: 数组类型
+    """
+    return np.dtype(np.uint32) if max_value < 1 << 32 else np.dtype(np.int64)
+
+
+def load_source_catalogs(source: str) -> Dict[str, object]:
+    """
+    读取源目录中的目录文件，缺少的文件使用内置目录
+    :param source: 源目录
+    :return: compile_catalogs 的关键字参数
+    """
+    if not os.path.isdir(source):
+        raise FileNotFoundError(f"源目录不存在: {source}")
+    catalogs = {}
+    for file_name, (name, default) in SOURCE_FILES.items():
+        path = os.path.join(source, file_name)
+        if not os.path.exists(path):
+            catalogs[name] = default
+        elif file_name.endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                catalogs[name] = json.load(f)
+        else:
+            with open(path, encoding="utf-8-sig") as f:
+                # 只去掉行尾换行，保留条目本身的空白（与内置目录中的取值一致）
+                catalogs[name] = [line.rstrip("\r\n") for line in f if line.strip()]
+    return catalogs
+
+
+def compile_knowledge_base(source: str, path: str) -> Tuple[Dict[str, int], List[str]]:
+    """
+    编译源目录为知识库文件（先写临时文件再改名，编译失败时删除临时文件，不影响已有的知识库文件）
+    :param source: 源目录
+    :param path: 知识库文件路径
+    :return: 各目录的条目数，以及未能解析出地区的公司
+    """
+    catalogs = load_source_catalogs(source)
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            result = compile_catalogs(out=f, **catalogs)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    return result
+
+
+def export_builtin_catalogs(directory: str):
+    """
+    将内置目录导出为源文件，作为编辑外部知识库的起点
+    :param directory: 输出目录
+    """
+    os.makedirs(directory, exist_ok=True)
+    for file_name, (_, default) in SOURCE_FILES.items():
+        with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+            if file_name.endswith(".json"):
+                json.dump(default, f, ensure_ascii=False, indent=2)
+            else:
+                f.writelines(f"{value}\n" for value in default)
+
+
+@lru_cache(maxsize=None)
+def open_knowledge_base(path: str) -> KnowledgeBase:
+    """
+    以只读内存映射打开知识库文件（每个进程对同一路径只打开一次）
+    :param path: 知识库文件路径
+    :return: 知识库
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return KnowledgeBase(buffer, path)
+
+
+@lru_cache(maxsize=1)
+def builtin_knowledge_base() -> KnowledgeBase:
+    """
+    由 data_definitions 中的内置目录编译的知识库（在内存中编译，不写文件）
+    :return: 知识库
+    """
+    out = io.BytesIO()
+    compile_catalogs(BIGDATA_COMPANIES, INDUSTRY_FIELDS, ADDRESS_TEMPLATES, WELFARE_OPTIONS, POSITION_REQUIREMENTS, out)
+    return KnowledgeBase(out.getvalue())
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    命令行入口：编译知识库或导出内置目录
+    :param argv: 命令行参数，默认读取 sys.argv
+    """
+    parser = argparse.ArgumentParser(description="编译外部知识库（公司、行业、地址、福利、岗位要求目录）")
+    parser.add_argument("source", help="源目录：companies.txt、industries.txt、addresses.txt、welfare.txt（每行一项）"
+                                       "和 requirements.json，缺少的文件使用内置目录")
+    parser.add_argument("output", nargs="?", help="知识库文件路径，如 catalog.kb")
+    parser.add_argument("--export-builtin", action="store_true", help="将内置目录导出到源目录，而不是编译")
+    args = parser.parse_args(argv)
+    if args.export_builtin:
+        export_builtin_catalogs(args.source)
+        print(f"内置目录已导出到 {args.source}")
+        return
+    if not args.output:
+        parser.error("编译时需要指定知识库文件路径")
+    try:
+        counts, unresolved = compile_knowledge_base(args.source, args.output)
+    except (OSError, ValueError, KeyError) as e:
+        raise SystemExit(f"知识库编译失败: {e}")
+    summary = "、".join(f"{name} {count}" for name, count in counts.items())
+    print(f"知识库已写入 {args.output}（{summary}，{os.path.getsize(args.output)} 字节）")
+    if unresolved:
+        sample = "、".join(unresolved[:UNRESOLVED_SAMPLE])
+        more = f" 等{len(unresolved)}家" if len(unresolved) > UNRESOLVED_SAMPLE else ""
+        print(f"以下公司未能解析出地区，按\"其他\"地区计算薪资: {sample}{more}")
+
+
+if __name__ == "__main__":
+    main()
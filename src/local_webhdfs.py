@@ -0,0 +1,349 @@
+"""
+模块名称：local_webhdfs.py
+模块职责：进程内 WebHDFS 兼容服务（本地替身），用于在没有 Hadoop 集群时测试与压测上传流程，支持注入延迟和错误
+作者：D.C.Y.
+创建时间：2026/10/18 18:10:37
+最后修改时间：2026/10/18 22:14:37
+"""
+import json
+import posixpath
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+_PREFIX = "/webhdfs/v1"
+
+
+class LocalWebHdfsServer:
+    """
+    本地 WebHDFS 替身服务，实现 hdfs.InsecureClient 在本项目中用到的接口：
+    GETFILESTATUS（status）、DELETE（delete）、MKDIRS（makedirs）、CREATE（write，含307重定向两步写入）、
+    RENAME（rename），以及便于核对结果的 LISTSTATUS 和 OPEN（read）。文件内容保存在内存中。
+
+    用法::
+
+        with LocalWebHdfsServer(latency=0.01, error_rate=0.05) as server:
+            client = InsecureClient(server.url, user='root')
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, error_seed: Optional[int] = None, keep_data: bool = True):
+        """
+        :param host: 监听地址
+        :param port: 监听端口，0 表示自动分配
+        :param latency: 每个请求注入的延迟（秒）
+        :param error_rate: 数据写入请求返回服务端错误的概率
+        :param error_seed: 错误注入的随机种子，便于复现
+        :param keep_data: 是否保存写入的文件内容（压测时可关闭，只记录文件大小）
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.keep_data = keep_data
+        self.files: Dict[str, bytes] = {}
+        self.file_sizes: Dict[str, int] = {}
+        self.directories = {"/"}
+        self.bytes_received = 0
+        self.requests = 0
+        self.injected_errors = 0
+        self._random = random.Random(error_seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        服务地址，可直接传给 InsecureClient
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalWebHdfsServer":
+        """
+        在后台线程中启动服务
+        :return: 服务自身
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-webhdfs", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        停止服务
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def reset_counters(self):
+        """
+        清零请求与流量统计
+        """
+        with self._lock:
+            self.bytes_received = 0
+            self.requests = 0
+            self.injected_errors = 0
+
+    def _should_fail(self) -> bool:
+        """
+        按错误概率决定本次写入是否注入错误
+        :return: 是否注入错误
+        """
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.injected_errors += 1
+                return True
+            return False
+
+    def _status(self, path: str) -> Optional[dict]:
+        """
+        构造 FileStatus
+        :param path: 路径
+        :return: FileStatus，路径不存在返回 None
+        """
+        if path in self.directories:
+            return _file_status(posixpath.basename(path), "DIRECTORY", 0)
+        if path in self.file_sizes:
+            return _file_status(posixpath.basename(path), "FILE", self.file_sizes[path])
+        return None
+
+    def _makedirs(self, path: str):
+        """
+        创建目录及其所有上级目录
+        :param path: 目录路径
+        """
+        while path not in self.directories:
+            self.directories.add(path)
+            path = posixpath.dirname(path)
+
+    def _delete(self, path: str, recursive: bool) -> bool:
+        """
+        删除文件或目录
+        :param path: 路径
+        :param recursive: 是否递归删除目录
+        :return: 是否删除了内容
+        """
+        if path in self.file_sizes:
+            self.file_sizes.pop(path)
+            self.files.pop(path, None)
+            return True
+        if path not in self.directories or path == "/":
+            return False
+        prefix = path.rstrip("/") + "/"
+        children = [p for p in list(self.file_sizes) + list(self.directories) if p.startswith(prefix)]
+        if children and not recursive:
+            raise OSError(f"{path} is non empty': Directory is not empty")
+        for child in children:
+            self.file_sizes.pop(child, None)
+            self.files.pop(child, None)
+            self.directories.discard(child)
+        self.directories.discard(path)
+        return True
+
+    def _rename(self, source: str, destination: str) -> bool:
+        """
+        移动文件或目录（语义同 HDFS：目标为已存在的目录时移入其中，目标为已存在的文件或上级目录不存在时失败）
+        :param source: 源路径
+        :param destination: 目标路径
+        :return: 是否移动成功
+        """
+        if source not in self.file_sizes and (source not in self.directories or source == "/"):
+            return False
+        if destination in self.directories:
+            destination = posixpath.join(destination, posixpath.basename(source))
+        if destination in self.file_sizes or destination in self.directories \
+                or posixpath.dirname(destination) not in self.directories:
+            return False
+        prefix = source.rstrip("/") + "/"
+        for old in [p for p in list(self.file_sizes) if p == source or p.startswith(prefix)]:
+            new = destination + old[len(source):]
+            self.file_sizes[new] = self.file_sizes.pop(old)
+            if old in self.files:
+                self.files[new] = self.files.pop(old)
+        for old in [p for p in self.directories if p == source or p.startswith(prefix)]:
+            self.directories.discard(old)
+            self.directories.add(destination + old[len(source):])
+        return True
+
+
+def _file_status(name: str, file_type: str, length: int) -> dict:
+    """
+    构造 WebHDFS FileStatus 字典
+    :param name: 文件名
+    :param file_type: FILE 或 DIRECTORY
+    :param length: 文件长度
+    :return: FileStatus
+    """
+    return {
+        "pathSuffix": name, "type": file_type, "length": length, "owner": "root", "group": "supergroup",
+        "permission": "755" if file_type == "DIRECTORY" else "644", "replication": 0 if file_type == "DIRECTORY" else 1,
+        "blockSize": 0 if file_type == "DIRECTORY" else 134217728,
+        "modificationTime": int(time.time() * 1000), "accessTime": 0,
+    }
+
+
+def _make_handler(server: LocalWebHdfsServer):
+    """
+    创建绑定到指定服务状态的请求处理类
+    :param server: 替身服务
+    :return: 请求处理类
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # 保持连接，与真实 NameNode/DataNode 行为一致
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_PUT(self):
+            self._dispatch("PUT")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+        def log_message(self, format, *args):
+            # 不输出访问日志
+            pass
+
+        def _dispatch(self, method: str):
+            parts = urlsplit(self.path)
+            params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+            body = self._read_body()
+            with server._lock:
+                server.requests += 1
+                server.bytes_received += len(body)
+            if server.latency:
+                time.sleep(server.latency)
+            if not parts.path.startswith(_PREFIX):
+                return self._error(404, "FileNotFoundException", f"Unknown path: {parts.path}")
+            path = posixpath.normpath("/" + unquote(parts.path[len(_PREFIX):]).lstrip("/"))
+            operation = (method, params.get("op", "").upper())
+            try:
+                if operation == ("GET", "GETFILESTATUS"):
+                    self._get_file_status(path)
+                elif operation == ("GET", "LISTSTATUS"):
+                    self._list_status(path)
+                elif operation == ("GET", "OPEN"):
+                    self._open(path)
+                elif operation == ("PUT", "MKDIRS"):
+                    with server._lock:
+                        server._makedirs(path)
+                    self._json(200, {"boolean": True})
+                elif operation == ("DELETE", "DELETE"):
+                    with server._lock:
+                        deleted = server._delete(path, params.get("recursive", "false").lower() == "true")
+                    self._json(200, {"boolean": deleted})
+                elif operation == ("PUT", "RENAME"):
+                    destination = posixpath.normpath("/" + params.get("destination", "").lstrip("/"))
+                    with server._lock:
+                        renamed = server._rename(path, destination)
+                    self._json(200, {"boolean": renamed})
+                elif operation == ("PUT", "CREATE"):
+                    self._create(path, params, body)
+                else:
+                    self._error(400, "IllegalArgumentException", f"Unsupported operation: {method} {params.get('op')}")
+            except OSError as e:
+                self._error(403, "IOException", str(e))
+
+        def _create(self, path: str, params: Dict[str, str], body: bytes):
+            overwrite = params.get("overwrite", "false").lower() == "true"
+            with server._lock:
+                if path in server.directories or (path in server.file_sizes and not overwrite):
+                    return self._error(403, "FileAlreadyExistsException", f"{path} already exists")
+            if params.get("data") != "true":
+                # 第一步：NameNode 返回 307，指向 DataNode 的写入地址
+                location = f"{server.url}{_PREFIX}{path}?op=CREATE&data=true&overwrite={str(overwrite).lower()}"
+                self.send_response(307)
+                self.send_header("Location", location)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            # 第二步：DataNode 接收文件内容
+            if server._should_fail():
+                return self._error(500, "IOException", f"Injected failure while writing {path}")
+            with server._lock:
+                server._makedirs(posixpath.dirname(path))
+                server.file_sizes[path] = len(body)
+                if server.keep_data:
+                    server.files[path] = body
+            self.send_response(201)
+            self.send_header("Location", f"hdfs://{path}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def _get_file_status(self, path: str):
+            with server._lock:
+                status = server._status(path)
+            if status is None:
+                return self._error(404, "FileNotFoundException", f"File does not exist: {path}")
+            status["pathSuffix"] = ""
+            self._json(200, {"FileStatus": status})
+
+        def _list_status(self, path: str):
+            with server._lock:
+                if path in server.file_sizes:
+                    statuses = [server._status(path)]
+                elif path in server.directories:
+                    children = {p for p in list(server.file_sizes) + list(server.directories)
+                                if p != path and posixpath.dirname(p) == path}
+                    statuses = [server._status(child) for child in sorted(children)]
+                else:
+                    statuses = None
+            if statuses is None:
+                return self._error(404, "FileNotFoundException", f"File {path} does not exist.")
+            self._json(200, {"FileStatuses": {"FileStatus": statuses}})
+
+        def _open(self, path: str):
+            with server._lock:
+                data = server.files.get(path)
+            if data is None:
+                return self._error(404, "FileNotFoundException", f"File does not exist: {path}")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_body(self) -> bytes:
+            # requests 以生成器流式上传时使用分块传输编码
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                    if size == 0:
+                        while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                            pass
+                        return b"".join(chunks)
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def _json(self, status: int, payload: dict):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _error(self, status: int, exception: str, message: str):
+            self._json(status, {"RemoteException": {
+                "exception": exception, "javaClassName": f"java.io.{exception}", "message": message,
+            }})
+
+    return Handler
@@ -1,19 +1,80 @@
+import argparse
 import importlib
+import sys
+from typing import List, Optional
 
 """
 模块名称：main.py
-模块职责：主程序入口和流程控制
+模块职责：主程序入口和流程控制（命令行参数非交互运行，无参数且在终端中运行时保留交互菜单）
 作者：D.C.Y.
 创建时间：2025/03/14 15:32:12
-最后修改时间：2025/03/22 1:34:45
-版本：1.0.2
+最后修改时间：2026/10/18 21:48:03
+版本：1.1.0
 版权所有 © 2025 D.C.Y. 保留所有权利
 """
 
+# 输出目标对应的生成器模块（按需导入：--help 和参数解析不加载 numpy、Faker、hdfs 等重量级依赖）
+SINK_MODULES = {
+    "local": "generate_data_to_windows",
+    "hdfs": "generate_data_to_upload_to_hdfs",
+}
+DEFAULT_PAGE_SIZE = 1000  # 与生成器的默认每页记录数一致
 
-def main():
+
+def main(argv: Optional[List[str]] = None):
     """
     主执行函数
+    :param argv: 命令行参数，默认读取 sys.argv
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv and sys.stdin.isatty():
+        interactive_main()
+        return
+    args, generator_argv = parse_args(argv)
+    # 非交互模式下异常与退出码原样传出，便于调度系统判断运行结果
+    importlib.import_module(SINK_MODULES[args.sink]).main(generator_argv)
+
+
+def parse_args(argv: List[str]):
+    """
+    解析命令行参数，并转换为所选生成器的参数
+    :param argv: 命令行参数列表
+    :return: (解析结果, 传给生成器的参数列表)
+    """
+    parser = argparse.ArgumentParser(
+        description="生成模拟招聘数据（非交互模式）",
+        epilog="其余参数原样传给所选生成器，如 --format parquet、--compress bgzf、--hdfs-url；"
+               "完整列表见 python generate_data_to_windows.py --help 或 python generate_data_to_upload_to_hdfs.py --help")
+    parser.add_argument("--sink", choices=sorted(SINK_MODULES), default="local",
+                        help="输出目标：local（本地目录，默认）或 hdfs")
+    parser.add_argument("--records", type=int, help="生成的记录总数（需为每页记录数的整数倍，或不超过一页）")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"每个文件（页）的记录数（默认{DEFAULT_PAGE_SIZE}）")
+    parser.add_argument("--workers", type=int, default=1, help="并行生成的工作进程数（默认1）")
+    parser.add_argument("--seed", type=int, help="随机种子，指定后相同参数的运行结果逐字节一致")
+    parser.add_argument("--output", help="输出位置：local 为本地输出根目录（默认 ..），hdfs 为 HDFS 存储根目录（默认 /JobData）")
+    args, generator_argv = parser.parse_known_args(argv)
+
+    page_size = args.page_size
+    if args.records is not None:
+        if args.records < 1:
+            parser.error("--records 必须大于0")
+        if args.records <= page_size:
+            page_size = args.records
+        elif args.records % page_size:
+            parser.error(f"--records {args.records} 不是 --page-size {page_size} 的整数倍")
+        generator_argv += ["--page-count", str(args.records // page_size)]
+    generator_argv += ["--page-size", str(page_size), "--workers", str(args.workers)]
+    if args.seed is not None:
+        generator_argv += ["--seed", str(args.seed)]
+    if args.output is not None:
+        generator_argv += ["--output-dir" if args.sink == "local" else "--hdfs-dir", args.output]
+    return args, generator_argv
+
+
+def interactive_main():
+    """
+    交互式菜单（兼容原有用法）
     """
     print("请选择数据生成方式：")
     print("1. 数据生成器 --> HDFS")
@@ -36,7 +97,7 @@ def run_module(module_name: str):
     """
     try:
         module = importlib.import_module(module_name)
-        module.main()
+        module.main([])
     except ImportError:
         print(f"无法导入 {module_name} 模块，请检查文件是否存在。")
     except Exception as e:
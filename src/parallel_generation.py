@@ -0,0 +1,491 @@
+"""
+模块名称：parallel_generation.py
+模块职责：按页、按数据块切分数据生成任务，使用进程池多核并行生成；支持按种子确定性、随机访问地重建任意页
+作者：D.C.Y.
+创建时间：2026/10/18 11:05:40
+最后修改时间：2026/10/19 06:07:45
+"""
+import argparse
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import run_metrics
+from batch_generation import generate_batch_records
+from data_profile import DataProfile
+from id_allocator import DEFAULT_ID_WIDTH, MAX_ID_WIDTH, MIN_ID_WIDTH, PositionIdAllocator, id_capacity
+from knowledge_base import KnowledgeBase, open_knowledge_base
+from record_encoder import warm_catalogs
+from record_validator import DEFAULT_SAMPLE_EVERY, VALIDATION_LEVELS, RecordValidator
+from run_metrics import RunMetrics
+from weighted_sampling import AliasTable, build_field_distributions, load_field_weights, skewable_fields
+
+DEFAULT_CHUNK_RECORDS = 1000  # 每个生成任务的记录数（流水线中单个数据块的大小）
+MIN_RECORD_BYTES = 512  # 单条记录编码后的最小字节数（实际约700字节以上），用于估算按总字节数生成时的记录数上限
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+class _ChunkContext(NamedTuple):
+    """
+    一次运行中所有数据块共用的生成参数：进程池启动时随初始化函数传给每个工作进程一次，各任务只传页码和块序号
+    """
+    page_size: int
+    chunk_size: int
+    seed: int
+    reference_date: date
+    id_allocator: PositionIdAllocator
+    transform: Optional[Callable[[List[dict]], object]]
+    profile: bool
+    distributions: Optional[Dict[str, AliasTable]]
+    knowledge_base: Optional[KnowledgeBase]
+
+
+_worker_context: Optional[_ChunkContext] = None  # 工作进程内本次运行的生成参数
+
+
+def generate_chunks(page_indices: Iterable[int], page_size: int, workers: int = 1,
+                    transform: Optional[Callable[[List[dict]], object]] = None,
+                    seed: Optional[int] = None,
+                    reference_date: Optional[date] = None,
+                    id_allocator: Optional[PositionIdAllocator] = None,
+                    chunk_size: int = DEFAULT_CHUNK_RECORDS,
+                    metrics: Optional[RunMetrics] = None,
+                    first_chunk: int = 0,
+                    distributions: Optional[Dict[str, AliasTable]] = None,
+                    knowledge_base: Optional[KnowledgeBase] = None) -> Iterator[Tuple[int, object]]:
+    """
+    按数据块流式生成各页数据，workers大于1时将数据块分发到进程池并行生成。
+    每页切分为不超过 chunk_size 条记录的数据块，内存占用只与在途数据块数量有关，与页大小和总量无关
+    :param page_indices: 页码序列
+    :param page_size: 每页记录数
+    :param workers: 工作进程数
+    :param transform: 在工作进程内对数据块执行的处理函数（需为模块级函数），如校验和编码
+    :param seed: 随机种子；指定后每一页的内容只由 (种子, 页码, 基准日期) 决定
+    :param reference_date: 发布时间的基准日期，默认当天
+    :param id_allocator: 职位ID分配器，默认以种子为运行密钥
+    :param chunk_size: 每个数据块的记录数
+    :param metrics: 运行指标，工作进程内各数据块的阶段耗时与校验计数汇总到此处；其 profile 不为 None 时同时统计数据画像
+    :param first_chunk: 第一页从第几个数据块开始生成（断点续跑时跳过已写出的数据块）
+    :param distributions: 字段名 -> 别名表（每个工作进程启动时传入一次），未配置的字段均匀抽取
+    :param knowledge_base: 知识库（随任务只传文件路径，工作进程各自内存映射），默认为内置知识库
+    :return: 按页码、块顺序产出 (页码, 数据块处理结果) 的迭代器
+    """
+    # 未指定种子时使用系统熵作为本次运行的种子，生成流程与指定种子时完全相同
+    seed = seed if seed is not None else np.random.SeedSequence().entropy
+    reference_date = reference_date if reference_date is not None else date.today()
+    id_allocator = id_allocator if id_allocator is not None else PositionIdAllocator(seed)
+    profile = metrics is not None and metrics.profile is not None
+    context = _ChunkContext(page_size, chunk_size, seed, reference_date, id_allocator, transform, profile,
+                            distributions, knowledge_base)
+    tasks = (
+        (page_index, chunk_index)
+        for position, page_index in enumerate(page_indices)
+        for chunk_index in range(first_chunk if position == 0 else 0, -(-page_size // chunk_size))
+    )
+
+    def collect(result: Tuple[object, dict]) -> object:
+        payload, stats = result
+        if metrics is not None:
+            metrics.add_chunk(stats)
+        return payload
+
+    if workers <= 1:
+        warm_catalogs(knowledge_base)
+        for task in tasks:
+            yield task[0], collect(_generate_chunk(*task, *context))
+        return
+
+    # 别名表、职位ID分配器和处理函数在每个工作进程启动时传入一次，而不是随每个任务重复序列化
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context,)) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append((task[0], executor.submit(_generate_worker_chunk, *task)))
+            # 限制在途任务数量，避免结果堆积占用内存
+            if len(pending) >= workers * 2:
+                done_index, future = pending.popleft()
+                yield done_index, collect(future.result())
+        while pending:
+            done_index, future = pending.popleft()
+            yield done_index, collect(future.result())
+
+
+def generate_page(page_index: int, page_size: int, seed: int,
+                  reference_date: Optional[date] = None,
+                  id_allocator: Optional[PositionIdAllocator] = None,
+                  chunk_size: int = DEFAULT_CHUNK_RECORDS,
+                  distributions: Optional[Dict[str, AliasTable]] = None,
+                  knowledge_base: Optional[KnowledgeBase] = None) -> List[dict]:
+    """
+    单独重建某一页数据，结果与整批运行时该页的内容完全一致，代价只与该页大小有关
+    :param page_index: 页码（从1开始）
+    :param page_size: 每页记录数（需与原运行一致）
+    :param seed: 原运行的随机种子
+    :param reference_date: 原运行的基准日期，默认当天
+    :param id_allocator: 原运行的职位ID分配器，默认以种子为运行密钥
+    :param chunk_size: 原运行的数据块大小
+    :param distributions: 原运行的字段权重分布
+    :param knowledge_base: 原运行的知识库
+    :return: 该页的职位记录列表
+    """
+    records = []
+    for _, chunk in generate_chunks([page_index], page_size, seed=seed, reference_date=reference_date,
+                                    id_allocator=id_allocator, chunk_size=chunk_size, distributions=distributions,
+                                    knowledge_base=knowledge_base):
+        records.extend(chunk)
+    return records
+
+
+def add_generation_arguments(parser: argparse.ArgumentParser):
+    """
+    注册各生成器共用的命令行参数
+    :param parser: 命令行解析器
+    """
+    parser.add_argument("--page-count", type=int, default=30, help="生成的文件（页）数量（默认30）")
+    parser.add_argument("--page-size", type=int, default=1000, help="每个文件（页）的记录数（默认1000）")
+    parser.add_argument("--roll-size", type=parse_size,
+                        help="按字节数滚动输出文件，如 128MB（对齐 HDFS 块大小），文件在记录边界处切分且不超过该大小")
+    parser.add_argument("--roll-records", type=int, help="按记录数滚动输出文件（可与 --roll-size 同时使用）")
+    parser.add_argument("--max-bytes", type=parse_size,
+                        help="按总字节数生成，如 10GB：持续生成直到达到该数据量（忽略 --page-count）")
+    parser.add_argument("--workers", type=int, default=1, help="并行生成的工作进程数（默认1）")
+    parser.add_argument("--format", choices=["json", "parquet"], default="json",
+                        help="输出格式：json（逗号分隔的紧凑JSON，默认）或 parquet（列式存储，需要 pyarrow）")
+    parser.add_argument("--row-group-size", type=int, default=64 * 1024, help="Parquet 行组大小（行数，默认65536）")
+    parser.add_argument("--compress", choices=["none", "bgzf"], default="none",
+                        help="JSON 输出压缩方式：none（默认）或 bgzf（分块gzip，文件以 .gz 结尾，可按块切分读取）")
+    parser.add_argument("--compress-level", type=int, default=6, help="压缩级别（1-9，默认6）")
+    parser.add_argument("--compress-threads", type=int, default=4, help="并行压缩线程数（默认4）")
+    parser.add_argument("--seed", type=int, help="随机种子，指定后相同参数的运行结果逐字节一致")
+    parser.add_argument("--date", type=parse_date, help="数据基准日期（YYYYMMDD），默认当天")
+    parser.add_argument("--pages", type=parse_page_ranges, help="只生成指定页，如 17 或 1-5,17（配合 --seed 重建丢失的页）")
+    parser.add_argument("--run-key", type=int, help="职位ID分配密钥，默认等于随机种子；多次运行共用同一密钥以保证ID不重复")
+    parser.add_argument("--id-offset", type=int, default=0, help="职位ID序号起点，追加数据时设为之前已生成的记录总数")
+    parser.add_argument("--id-width", type=parse_id_width,
+                        help=f"职位ID的十进制位数（{MIN_ID_WIDTH}-{MAX_ID_WIDTH}），默认{DEFAULT_ID_WIDTH}位，"
+                             f"运行规模（--page-count × --page-size 等）超出其容量时自动加宽；按页重建时须使用与原运行相同的参数")
+    parser.add_argument("--metrics-file", help="定期导出运行指标（分阶段耗时、吞吐、剩余时间、上传延迟等）的文件路径")
+    parser.add_argument("--metrics-format", choices=["jsonl", "prometheus"], default="jsonl",
+                        help="指标格式：jsonl（每次追加一行，默认）或 prometheus（node_exporter textfile 格式，整体替换）")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="指标导出间隔秒数（默认10）")
+    parser.add_argument("--validation", choices=VALIDATION_LEVELS, default="sampled",
+                        help="记录校验级别：full（逐条校验）、sampled（按 --validation-sample 抽样，默认）或 off")
+    parser.add_argument("--validation-sample", type=int, default=DEFAULT_SAMPLE_EVERY,
+                        help=f"抽样校验时每多少条记录检查一条（默认{DEFAULT_SAMPLE_EVERY}）")
+    parser.add_argument("--knowledge-base",
+                        help="外部知识库文件（由 knowledge_base.py 编译），替换内置的公司、行业、地址、福利和岗位要求目录")
+    parser.add_argument("--skew", help="字段权重配置文件（JSON），如 {\"education\": {\"本科\": 6, \"硕士\": 3}, \"company\": {\"zipf\": 1.1}}")
+    parser.add_argument("--zipf", type=parse_zipf, action="append", default=[], metavar="FIELD=S",
+                        help="按 Zipf 偏斜抽取某字段（候选值按目录顺序排名），如 company=1.1、city=0.8，可重复指定")
+    parser.add_argument("--profile", action="store_true",
+                        help="生成时统计数据画像（各地区薪资分位数、空值率、职位类型占比、近似去重数），结束时在输出目录写出 _profile.json")
+    parser.add_argument("--checkpoint", help="断点文件路径：记录已完成的页（或文件），中断后以相同参数重新运行时从断点继续")
+
+
+def build_id_allocator(args: argparse.Namespace) -> PositionIdAllocator:
+    """
+    按命令行参数创建职位ID分配器
+    :param args: 命令行解析结果
+    :return: 职位ID分配器
+    """
+    run_key = args.run_key if args.run_key is not None else args.seed
+    if run_key is None:
+        run_key = np.random.SeedSequence().entropy
+    return PositionIdAllocator(run_key, width=args.id_width, offset=args.id_offset)
+
+
+def partition_id_count(args: argparse.Namespace) -> int:
+    """
+    一次运行（追加模式下为一个分区）最多占用的职位ID序号数：按页生成时为最大页码 × 每页记录数，
+    按总字节数生成时记录数未知，按最小记录大小估算上限
+    :param args: 命令行解析结果
+    :return: 序号数
+    """
+    if args.max_bytes is not None:
+        records = -(-args.max_bytes // MIN_RECORD_BYTES)
+        pages = -(-records // args.page_size)
+    else:
+        pages = max(args.page_count, max(args.pages) if args.pages else 0)
+    return pages * args.page_size
+
+
+def required_id_count(args: argparse.Namespace) -> int:
+    """
+    本次运行最多占用的职位ID序号上限（含 --id-offset 之前的序号），追加多天时按天数累计
+    :param args: 命令行解析结果
+    :return: 序号上限
+    """
+    days = args.days if getattr(args, "append", False) else 1
+    return args.id_offset + partition_id_count(args) * days
+
+
+def resolve_id_width(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """
+    在写出任何数据之前确认职位ID空间足够本次运行使用：未指定 --id-width 时取容量足够的最小位数（不小于默认位数），
+    指定时容量不足直接报错，避免生成到中途才在工作进程中报“ID空间已耗尽”
+    :param parser: 命令行解析器
+    :param args: 命令行解析结果，args.id_width 更新为实际使用的位数
+    """
+    needed = required_id_count(args)
+    if args.id_width is None:
+        widths = [width for width in range(DEFAULT_ID_WIDTH, MAX_ID_WIDTH + 1) if id_capacity(width) >= needed]
+        if not widths:
+            parser.error(f"本次运行需要 {needed} 个职位ID，超出 {MAX_ID_WIDTH} 位ID空间")
+        args.id_width = widths[0]
+    elif id_capacity(args.id_width) < needed:
+        parser.error(f"本次运行需要 {needed} 个职位ID（含 --id-offset），超出 {args.id_width} 位ID空间的容量 "
+                     f"{id_capacity(args.id_width)}，请加大 --id-width")
+
+
+def build_record_validator(args: argparse.Namespace, default_salary: str) -> RecordValidator:
+    """
+    按命令行参数创建记录校验器（随数据块的编码函数一起传给工作进程）
+    :param args: 命令行解析结果
+    :param default_salary: 薪资格式不符时替换的默认值
+    :return: 记录校验器
+    """
+    return RecordValidator(args.validation, sample_every=args.validation_sample, default_salary=default_salary)
+
+
+def build_knowledge_base(args: argparse.Namespace) -> Optional[KnowledgeBase]:
+    """
+    按 --knowledge-base 参数打开外部知识库
+    :param args: 命令行解析结果
+    :return: 知识库，未指定时为 None（使用内置知识库）
+    """
+    return open_knowledge_base(args.knowledge_base) if args.knowledge_base else None
+
+
+def build_field_distributions_from_args(args: argparse.Namespace,
+                                        knowledge_base: Optional[KnowledgeBase] = None) -> Dict[str, AliasTable]:
+    """
+    按 --skew 与 --zipf 参数构建各字段的别名表（--zipf 覆盖配置文件中的同一字段；指定知识库时公司、行业和城市按知识库的目录）
+    :param args: 命令行解析结果
+    :param knowledge_base: 已打开的 --knowledge-base 知识库，默认为内置目录
+    :return: 字段名 -> 别名表，未配置任何权重时为空
+    """
+    spec = load_field_weights(args.skew) if args.skew else {}
+    spec.update((field, {"zipf": exponent}) for field, exponent in args.zipf)
+    return build_field_distributions(spec, skewable_fields(knowledge_base)) if spec else {}
+
+
+def parse_id_width(text: str) -> int:
+    """
+    解析职位ID位数，超出分配器支持的范围时在解析参数阶段报错
+    :param text: 位数
+    :return: 位数
+    """
+    try:
+        width = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的职位ID位数: {text}")
+    if not MIN_ID_WIDTH <= width <= MAX_ID_WIDTH:
+        raise argparse.ArgumentTypeError(f"职位ID位数须在 {MIN_ID_WIDTH}-{MAX_ID_WIDTH} 之间: {width}")
+    return width
+
+
+def parse_zipf(text: str) -> Tuple[str, float]:
+    """
+    解析 FIELD=S 格式的 Zipf 偏斜参数
+    :param text: 如 company=1.1
+    :return: (字段名, 偏斜指数)
+    """
+    field, _, exponent = text.partition("=")
+    try:
+        value = float(exponent)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的 Zipf 参数: {text}（应为 字段=指数）")
+    if not field or value < 0:
+        raise argparse.ArgumentTypeError(f"无效的 Zipf 参数: {text}（应为 字段=指数，指数不小于0）")
+    return field, value
+
+
+def build_run_metrics(args: argparse.Namespace) -> RunMetrics:
+    """
+    按命令行参数创建运行指标，指定 --metrics-file 时启动定期导出，指定 --profile 时附带数据画像
+    :param args: 命令行解析结果
+    :return: 运行指标
+    """
+    profile = DataProfile() if args.profile else None
+    if args.max_bytes:
+        metrics = RunMetrics(byte_budget=args.max_bytes, profile=profile)
+    else:
+        metrics = RunMetrics(total_records=(len(args.pages) if args.pages else args.page_count) * args.page_size,
+                             profile=profile)
+    if args.metrics_file:
+        metrics.start_export(args.metrics_file, args.metrics_format, args.metrics_interval)
+    return metrics
+
+
+def parse_page_ranges(text: str) -> List[int]:
+    """
+    解析页码选择表达式，如 "17" 或 "1-5,17"
+    :param text: 页码表达式
+    :return: 升序去重后的页码列表
+    """
+    pages = set()
+    for part in text.split(","):
+        start, _, end = part.strip().partition("-")
+        if not start.isdigit() or (end and not end.isdigit()):
+            raise ValueError(f"无效的页码表达式: {part}")
+        pages.update(range(int(start), int(end or start) + 1))
+    if not pages or min(pages) < 1:
+        raise ValueError(f"页码必须从1开始: {text}")
+    return sorted(pages)
+
+
+def format_page_ranges(pages: Iterable[int]) -> str:
+    """
+    将页码压缩为页码选择表达式（parse_page_ranges 的逆运算），如 [1, 2, 3, 5] -> "1-3,5"
+    :param pages: 页码
+    :return: 页码表达式，无页码时为空字符串
+    """
+    parts, pages = [], sorted(set(pages))
+    start = 0
+    for index in range(1, len(pages) + 1):
+        if index == len(pages) or pages[index] != pages[index - 1] + 1:
+            first, last = pages[start], pages[index - 1]
+            parts.append(str(first) if first == last else f"{first}-{last}")
+            start = index
+    return ",".join(parts)
+
+
+def parse_size(text: str) -> int:
+    """
+    解析字节数，支持 K/M/G/T 单位（1024进制），如 "128MB"、"1.5G"、"4096"
+    :param text: 字节数字符串
+    :return: 字节数
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*", text.upper())
+    if not match:
+        raise ValueError(f"无效的字节数: {text}")
+    size = int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+    if size <= 0:
+        raise ValueError(f"字节数必须大于0: {text}")
+    return size
+
+
+def is_rolling(args: argparse.Namespace) -> bool:
+    """
+    判断是否启用按大小滚动输出模式
+    :param args: 命令行解析结果
+    :return: 是否滚动输出
+    """
+    return any(value is not None for value in (args.roll_size, args.roll_records, args.max_bytes))
+
+
+def check_output_arguments(parser: argparse.ArgumentParser,
+                           args: argparse.Namespace) -> Tuple[Optional[KnowledgeBase], Dict[str, AliasTable]]:
+    """
+    检查输出相关参数（滚动输出、压缩、格式）是否冲突，并打开知识库、构建字段权重分布（校验通过的结果直接交给调用方，不再重复构建）
+    :param parser: 命令行解析器
+    :param args: 命令行解析结果
+    :return: 知识库（未指定时为 None）和字段名 -> 别名表
+    """
+    if args.checkpoint and getattr(args, "append", False):
+        parser.error("追加模式由分区清单记录进度，不能与 --checkpoint 同时使用")
+    if args.validation_sample < 1:
+        parser.error("--validation-sample 至少为1")
+    if args.compress != "none" and args.format != "json":
+        parser.error("--compress 仅适用于 --format json（Parquet 使用其内置的列压缩）")
+    if is_rolling(args) and args.pages:
+        parser.error("滚动输出模式下文件边界与页无关，不能与 --pages 同时使用")
+    if is_rolling(args) and args.format != "json":
+        parser.error("滚动输出模式目前仅支持 --format json")
+    resolve_id_width(parser, args)
+    try:
+        knowledge_base = build_knowledge_base(args)
+    except (OSError, ValueError) as e:
+        parser.error(f"知识库无法打开: {e}")
+    try:
+        distributions = build_field_distributions_from_args(args, knowledge_base)
+    except (OSError, ValueError) as e:
+        parser.error(f"字段权重配置无效: {e}")
+    return knowledge_base, distributions
+
+
+def parse_date(text: str) -> date:
+    """
+    解析YYYYMMDD格式的日期
+    :param text: 日期字符串
+    :return: 日期
+    """
+    return datetime.strptime(text, "%Y%m%d").date()
+
+
+def chunk_rng(seed: int, page_index: int, chunk_index: int = 0) -> np.random.Generator:
+    """
+    获取某一数据块专属的随机数流：以种子派生Philox密钥，计数器的高位为页码、次高位为块序号，
+    各块的流互不重叠，且可在O(1)时间内定位到任意页的任意块
+    :param seed: 随机种子
+    :param page_index: 页码
+    :param chunk_index: 页内数据块序号
+    :return: 该数据块的随机数生成器
+    """
+    key = np.random.SeedSequence(seed).generate_state(2, np.uint64)
+    return np.random.Generator(np.random.Philox(key=key, counter=[0, chunk_index, page_index, 0]))
+
+
+def _init_worker(context: _ChunkContext):
+    """
+    工作进程初始化：保存本次运行的生成参数，并按本次运行的知识库预热编码器
+    :param context: 生成参数
+    """
+    global _worker_context
+    _worker_context = context
+    warm_catalogs(context.knowledge_base)
+
+
+def _generate_worker_chunk(page_index: int, chunk_index: int) -> Tuple[object, dict]:
+    """
+    使用工作进程初始化时保存的生成参数生成单个数据块（在工作进程中执行）
+    :param page_index: 页码
+    :param chunk_index: 页内数据块序号
+    :return: 同 _generate_chunk
+    """
+    return _generate_chunk(page_index, chunk_index, *_worker_context)
+
+
+def _generate_chunk(page_index: int, chunk_index: int, page_size: int, chunk_size: int, seed: int,
+                    reference_date: date, id_allocator: PositionIdAllocator,
+                    transform: Optional[Callable[[List[dict]], object]], profile: bool = False,
+                    distributions: Optional[Dict[str, AliasTable]] = None,
+                    knowledge_base: Optional[KnowledgeBase] = None) -> Tuple[object, dict]:
+    """
+    生成单个数据块（在工作进程中执行）
+    :param page_index: 页码
+    :param chunk_index: 页内数据块序号
+    :param page_size: 每页记录数
+    :param chunk_size: 每个数据块的记录数
+    :param seed: 随机种子
+    :param reference_date: 发布时间的基准日期
+    :param id_allocator: 职位ID分配器
+    :param transform: 数据块处理函数
+    :param profile: 是否统计该数据块的数据画像（在处理之后统计，包含校验时就地修复的取值）
+    :param distributions: 字段名 -> 别名表
+    :param knowledge_base: 知识库
+    :return: 数据块记录或处理结果，以及该数据块的统计（记录数、各阶段耗时、校验计数、数据画像）
+    """
+    offset = chunk_index * chunk_size
+    count = min(chunk_size, page_size - offset)
+    run_metrics.take_chunk_stats()
+    with run_metrics.timed_stage("generate"):
+        # positionId 由全局记录序号经置换得到，跨进程唯一且与其他页的生成无关
+        position_ids = id_allocator.ids_for((page_index - 1) * page_size + offset, count)
+        records = generate_batch_records(count, rng=chunk_rng(seed, page_index, chunk_index),
+                                         position_ids=position_ids, reference_date=reference_date,
+                                         distributions=distributions, knowledge_base=knowledge_base)
+    result = transform(records) if transform is not None else records
+    chunk_profile = None
+    if profile:
+        with run_metrics.timed_stage("profile"):
+            chunk_profile = DataProfile()
+            chunk_profile.add_records(records)
+    stats = run_metrics.take_chunk_stats()
+    stats["records"] = count
+    if chunk_profile is not None:
+        stats["profile"] = chunk_profile
+    return result, stats
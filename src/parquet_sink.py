@@ -0,0 +1,169 @@
+"""
+模块名称：parquet_sink.py
+模块职责：Parquet列式输出（按 BASE_TEMPLATE 字段布局，嵌套字段使用列表列，低基数字段字典编码），支持本地文件与HDFS
+作者：D.C.Y.
+创建时间：2026/10/18 19:02:44
+最后修改时间：2026/10/19 02:31:47
+"""
+import sys
+from typing import Dict, List, Optional, Sequence, Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from record_schema import RECORD_FIELDS
+from sinks import Sink
+
+DEFAULT_ROW_GROUP_SIZE = 64 * 1024  # 默认行组大小（行数）
+DICTIONARY_COLUMNS = ("companyType", "financeStage", "education", "firstType")  # 默认字典编码的低基数字段
+
+_STRING_LIST = pa.list_(pa.string())
+_REQUIREMENT = pa.struct([("一级要求", pa.string()), ("二级要求", _STRING_LIST)])
+
+# 非字符串字段的列类型，其余 BASE_TEMPLATE 字段均为字符串
+_COLUMN_TYPES = {
+    "businessArea": _STRING_LIST,
+    "welfare": _STRING_LIST,
+    "requirements": pa.list_(_REQUIREMENT),
+    "applicationRequirements": _STRING_LIST,
+    "positionId": pa.int64(),
+    "positionLables": _STRING_LIST,
+}
+
+# 职位记录的列式布局：BASE_TEMPLATE 字段 + 动态添加的技术标签
+JOB_RECORD_SCHEMA = pa.schema([
+    pa.field(name, _COLUMN_TYPES.get(name, pa.string()))
+    for name in RECORD_FIELDS
+])
+
+
+def to_record_batch(records: Sequence[Dict]) -> pa.RecordBatch:
+    """
+    将职位记录按列转换为 Arrow 数据块（可在工作进程中执行，结果可跨进程传递）
+    :param records: 职位记录序列
+    :return: Arrow RecordBatch
+    """
+    columns = [
+        pa.array([record.get(field.name) for record in records], type=field.type)
+        for field in JOB_RECORD_SCHEMA
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=JOB_RECORD_SCHEMA)
+
+
+class ParquetSink:
+    """
+    Parquet文件输出：接收 Arrow 数据块，累积到行组大小后写出一个行组
+    """
+
+    def __init__(self, target: Union[str, Sink], row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                 compression: str = "snappy",
+                 dictionary_columns: Optional[Sequence[str]] = DICTIONARY_COLUMNS):
+        """
+        :param target: 本地文件路径，或字节输出目标（如 HdfsSink）
+        :param row_group_size: 每个行组的行数
+        :param compression: 压缩算法
+        :param dictionary_columns: 使用字典编码的字段
+        """
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self._target = target
+        self._stream = target if isinstance(target, str) else _SinkStream(target)
+        self._writer = pq.ParquetWriter(
+            self._stream, JOB_RECORD_SCHEMA, compression=compression,
+            use_dictionary=list(dictionary_columns) if dictionary_columns else False,
+        )
+        self._pending: List[pa.RecordBatch] = []
+        self._pending_rows = 0
+
+    def write_records(self, records: Sequence[Dict]):
+        """
+        写入职位记录
+        :param records: 职位记录序列
+        """
+        self.write_encoded(to_record_batch(records))
+
+    def write_encoded(self, batch: pa.RecordBatch):
+        """
+        写入已转换好的 Arrow 数据块（如工作进程转换的数据块）
+        :param batch: Arrow RecordBatch
+        """
+        self._pending.append(batch)
+        self._pending_rows += batch.num_rows
+        if self._pending_rows >= self.row_group_size:
+            self._write_row_groups(final=False)
+
+    def flush(self):
+        """
+        将累积的数据全部写出（不足一个行组的部分也写出）
+        """
+        self._write_row_groups(final=True)
+
+    def _write_row_groups(self, final: bool):
+        """
+        按行组大小写出累积的数据
+        :param final: 是否连同不足一个行组的剩余数据一起写出
+        """
+        if not self._pending_rows:
+            return
+        table = pa.Table.from_batches(self._pending, schema=JOB_RECORD_SCHEMA)
+        full_rows = self._pending_rows if final else self._pending_rows // self.row_group_size * self.row_group_size
+        self._writer.write_table(table.slice(0, full_rows), row_group_size=self.row_group_size)
+        self.rows_written += full_rows
+        remainder = table.slice(full_rows)
+        self._pending = remainder.to_batches() if remainder.num_rows else []
+        self._pending_rows = remainder.num_rows
+
+    def close(self):
+        """
+        写出剩余数据和文件尾并关闭输出目标
+        """
+        try:
+            self.flush()
+            self._writer.close()
+        except BaseException:
+            # 文件尾未能写出时中止输出目标，不提交缺少文件尾的 Parquet 文件
+            if not isinstance(self._target, str):
+                self._target.__exit__(*sys.exc_info())
+            raise
+        if not isinstance(self._target, str):
+            self._target.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            return
+        # 出错时本地文件保留已写出的行组；其他输出目标由其自行处理异常（如中止 HDFS 上传）
+        if isinstance(self._target, str):
+            self._writer.close()
+        else:
+            self._target.__exit__(exc_type, exc_value, traceback)
+
+
+class _SinkStream:
+    """
+    将字节输出目标包装为 pyarrow 可写入的只追加文件对象
+    """
+
+    def __init__(self, sink: Sink):
+        self._sink = sink
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._sink.write(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        # 由 ParquetSink 负责关闭底层输出目标
+        self.closed = True
@@ -0,0 +1,178 @@
+"""
+模块名称：partition_manifest.py
+模块职责：HDFS 日期分区清单：记录已生成的分区及其页面、种子和职位ID区间（分片生成时含各分片的明细），支持按天增量追加历史数据
+作者：D.C.Y.
+创建时间：2026/10/18 22:14:37
+最后修改时间：2026/10/19 06:16:52
+"""
+import json
+import posixpath
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from sinks import read_hdfs_json, write_hdfs_file
+
+MANIFEST_NAME = "_manifest.json"  # 以下划线开头，Hive/Spark 扫描分区数据时会忽略该文件
+MANIFEST_VERSION = 1
+
+
+class PartitionManifest:
+    """
+    分区清单，保存在 HDFS 存储根目录下。
+
+    - 所有分区共用同一个职位ID分配密钥，各分区占用互不重叠的ID序号区间，追加多少天职位ID都不会重复；
+    - 每个分区记录自己的种子、页大小和ID区间，之后可单独重建该分区的任意页；
+    - 清单先写入临时文件再替换，写入中途失败不会留下损坏的清单。
+    """
+
+    def __init__(self, root: str, run_key: int, id_width: int = 7, next_id_offset: int = 0,
+                 partitions: Optional[Dict[str, dict]] = None):
+        """
+        :param root: HDFS 存储根目录
+        :param run_key: 职位ID分配密钥（所有分区共用）
+        :param id_width: 职位ID的十进制位数
+        :param next_id_offset: 下一个分区的职位ID序号起点
+        :param partitions: 分区名（YYYYMMDD）到分区信息的映射
+        """
+        self.root = root
+        self.run_key = run_key
+        self.id_width = id_width
+        self.next_id_offset = next_id_offset
+        self.partitions: Dict[str, dict] = partitions or {}
+
+    @property
+    def path(self) -> str:
+        """
+        清单文件的 HDFS 路径
+        """
+        return posixpath.join(self.root, MANIFEST_NAME)
+
+    @classmethod
+    def load(cls, client, root: str, run_key: Optional[int] = None, id_width: int = 7) -> "PartitionManifest":
+        """
+        读取 HDFS 上的分区清单，不存在时创建新清单（尚未保存）
+        :param client: HDFS 客户端
+        :param root: HDFS 存储根目录
+        :param run_key: 新清单的职位ID分配密钥，默认随机生成
+        :param id_width: 新清单的职位ID位数
+        :return: 分区清单
+        """
+        data = read_hdfs_json(client, posixpath.join(root, MANIFEST_NAME))
+        if data is not None:
+            if data.get("version") != MANIFEST_VERSION:
+                raise ValueError(f"不支持的分区清单版本: {data.get('version')}")
+            return cls(root, data["run_key"], data["id_width"], data["next_id_offset"], data["partitions"])
+        if run_key is None:
+            run_key = np.random.SeedSequence().entropy
+        return cls(root, run_key, id_width)
+
+    def save(self, client):
+        """
+        保存清单：先写临时文件，再替换正式文件
+        :param client: HDFS 客户端
+        """
+        data = json.dumps({
+            "version": MANIFEST_VERSION,
+            "run_key": self.run_key,
+            "id_width": self.id_width,
+            "next_id_offset": self.next_id_offset,
+            "partitions": dict(sorted(self.partitions.items())),
+        }, ensure_ascii=False, indent=2)
+        write_hdfs_file(client, self.path, data.encode("utf-8"))
+
+    def get(self, partition_date: date) -> Optional[dict]:
+        """
+        获取某一分区的信息
+        :param partition_date: 分区日期
+        :return: 分区信息，分区不存在时返回 None
+        """
+        return self.partitions.get(partition_name(partition_date))
+
+    def page_count(self, partition_date: date) -> int:
+        """
+        某一分区计划生成的总页数（含上传失败、尚未记入 pages 的页），重建页面时页码不能超出该范围
+        :param partition_date: 分区日期
+        :return: 总页数
+        """
+        entry = self.partitions[partition_name(partition_date)]
+        if "page_count" in entry:
+            return entry["page_count"]
+        # 早期清单未记录总页数：由该分区占用的职位ID区间（到下一个分区的起点为止）推算
+        end = min((other["id_offset"] for other in self.partitions.values() if other["id_offset"] > entry["id_offset"]),
+                  default=self.next_id_offset)
+        return (end - entry["id_offset"]) // entry["page_size"]
+
+    def reserve_ids(self, count: int) -> int:
+        """
+        为新分区预留一段职位ID序号
+        :param count: 预留的序号数量
+        :return: 该段的起点
+        """
+        offset = self.next_id_offset
+        self.next_id_offset += count
+        return offset
+
+    def record_partition(self, partition_date: date, seed: int, id_offset: int, page_size: int,
+                         pages: Iterable[int], extension: str, records: Optional[int] = None, rolling: bool = False,
+                         shards: Optional[Dict[str, dict]] = None, page_count: Optional[int] = None):
+        """
+        记录（或更新）一个分区
+        :param partition_date: 分区日期
+        :param seed: 该分区的随机种子
+        :param id_offset: 该分区的职位ID序号起点
+        :param page_size: 每页记录数
+        :param pages: 本次成功写入的页码（或文件序号），与已记录的页合并
+        :param extension: 文件扩展名
+        :param records: 分区的记录数，默认按页数 × 每页记录数计算（滚动输出的文件需显式指定）
+        :param rolling: 是否为按大小滚动输出的分区（文件与页不对应，不能按页重建）
+        :param shards: 分片生成时各分片的页区间、职位ID区间和文件明细
+        :param page_count: 计划生成的总页数，默认沿用已记录的值（首次记录时为最大页码）
+        """
+        previous = self.get(partition_date) or {}
+        pages = sorted(set(previous.get("pages", [])) | set(pages))
+        if page_count is None:
+            page_count = previous.get("page_count", max(pages, default=0))
+        entry = self.partitions[partition_name(partition_date)] = {
+            "seed": seed,
+            "id_offset": id_offset,
+            "page_size": page_size,
+            "layout": "rolling" if rolling else "pages",
+            "pages": pages,
+            "page_count": page_count,
+            "records": records if records is not None else len(pages) * page_size,
+            "extension": extension,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }
+        if shards is not None:
+            entry["shards"] = shards
+
+
+def partition_name(partition_date: date) -> str:
+    """
+    分区目录名
+    :param partition_date: 分区日期
+    :return: YYYYMMDD
+    """
+    return partition_date.strftime("%Y%m%d")
+
+
+def partition_seed(seed: int, partition_date: date) -> int:
+    """
+    由运行种子派生某一天分区的种子：不同日期的数据互不相同，相同种子和日期的结果可复现
+    :param seed: 运行种子
+    :param partition_date: 分区日期
+    :return: 分区种子
+    """
+    return int(np.random.SeedSequence([seed, partition_date.toordinal()]).generate_state(1, np.uint64)[0])
+
+
+def partition_dates(end_date: date, days: int) -> List[date]:
+    """
+    以某天为终点的连续若干天
+    :param end_date: 最后一天
+    :param days: 天数
+    :return: 按时间升序的日期列表
+    """
+    return [date.fromordinal(end_date.toordinal() - offset) for offset in range(days - 1, -1, -1)]
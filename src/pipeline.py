@@ -0,0 +1,380 @@
+"""
+模块名称：pipeline.py
+模块职责：流式数据流水线（生成 → 校验 → 编码 → 写入），按数据块处理，内存占用与数据总量无关；支持按字节数/记录数滚动输出文件
+作者：D.C.Y.
+创建时间：2026/10/18 17:05:12
+最后修改时间：2026/10/19 05:58:34
+"""
+import time
+from bisect import bisect_right
+from datetime import date
+from itertools import count
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import run_metrics
+from id_allocator import PositionIdAllocator
+from knowledge_base import KnowledgeBase
+from parallel_generation import DEFAULT_CHUNK_RECORDS, generate_chunks
+from record_validator import RecordValidator
+from run_metrics import RunMetrics, payload_size
+from sinks import FanOutWriter, encode_records, encode_records_with_offsets
+from weighted_sampling import AliasTable
+
+_FULL_VALIDATOR = RecordValidator("full")  # 未指定校验器时逐条校验
+
+
+def run_pipeline(pages: Iterable[int], page_size: int,
+                 open_page: Callable[[int], FanOutWriter],
+                 transform: Callable[[List[dict]], bytes],
+                 workers: int = 1,
+                 seed: Optional[int] = None,
+                 reference_date: Optional[date] = None,
+                 id_allocator: Optional[PositionIdAllocator] = None,
+                 chunk_size: int = DEFAULT_CHUNK_RECORDS,
+                 on_page_done: Optional[Callable[[int], None]] = None,
+                 on_page_error: Optional[Callable[[int, Exception], None]] = None,
+                 metrics: Optional[RunMetrics] = None,
+                 distributions: Optional[Dict[str, AliasTable]] = None,
+                 knowledge_base: Optional[KnowledgeBase] = None) -> List[int]:
+    """
+    流式执行整条流水线：数据块在工作进程中生成、校验并编码，主进程按页顺序将编码结果写入该页的输出目标。
+    任一时刻只持有在途的若干数据块和每个输出目标一个写入块，运行规模再大内存上限也固定不变
+    :param pages: 页码序列
+    :param page_size: 每页记录数
+    :param open_page: 为某一页打开写入器的函数
+    :param transform: 数据块的校验与编码函数（需为模块级函数），返回UTF-8字节串
+    :param workers: 工作进程数
+    :param seed: 随机种子
+    :param reference_date: 发布时间的基准日期，默认当天
+    :param id_allocator: 职位ID分配器
+    :param chunk_size: 每个数据块的记录数
+    :param on_page_done: 每页写入成功后的回调（如显示进度、提交断点），失败的页不会触发
+    :param on_page_error: 某页写入失败时的回调，未指定时直接抛出异常
+    :param metrics: 运行指标（各阶段耗时、写入字节数等）
+    :param distributions: 字段名 -> 别名表，未配置的字段均匀抽取
+    :param knowledge_base: 知识库，默认为内置知识库
+    :return: 写入失败的页码列表
+    """
+    failed_pages = []
+    current_page, writer = None, None
+    chunks = generate_chunks(pages, page_size, workers=workers, transform=transform, seed=seed,
+                             reference_date=reference_date, id_allocator=id_allocator, chunk_size=chunk_size,
+                             metrics=metrics, distributions=distributions, knowledge_base=knowledge_base)
+    for page_index, payload in chunks:
+        if page_index != current_page:
+            _finish_page(current_page, writer, failed_pages, on_page_done, on_page_error, metrics)
+            current_page, writer = page_index, None
+            try:
+                writer = open_page(page_index)
+            except Exception as e:
+                _fail_page(page_index, e, failed_pages, on_page_error)
+                continue
+        if writer is None:
+            # 该页已失败，丢弃其余数据块
+            continue
+        try:
+            start = time.perf_counter()
+            writer.write_encoded(payload)
+            if metrics is not None:
+                metrics.observe_write(payload_size(payload), time.perf_counter() - start)
+        except Exception as e:
+            writer.__exit__(type(e), e, e.__traceback__)
+            writer = None
+            _fail_page(page_index, e, failed_pages, on_page_error)
+    _finish_page(current_page, writer, failed_pages, on_page_done, on_page_error, metrics)
+    return failed_pages
+
+
+def _finish_page(page_index: Optional[int], writer: Optional[FanOutWriter], failed_pages: List[int],
+                 on_page_done: Optional[Callable[[int], None]],
+                 on_page_error: Optional[Callable[[int, Exception], None]],
+                 metrics: Optional[RunMetrics] = None):
+    """
+    关闭一页的写入器，写入成功时触发完成回调
+    :param page_index: 页码，None 表示尚无页面
+    :param writer: 该页的写入器，None 表示该页已失败（失败回调已触发）
+    :param failed_pages: 失败页码列表
+    :param on_page_done: 完成回调
+    :param on_page_error: 失败回调
+    :param metrics: 运行指标
+    """
+    if page_index is None or writer is None:
+        return
+    try:
+        start = time.perf_counter()
+        writer.close()
+        if metrics is not None:
+            metrics.observe_close(time.perf_counter() - start)
+    except Exception as e:
+        _fail_page(page_index, e, failed_pages, on_page_error)
+        return
+    if on_page_done is not None:
+        on_page_done(page_index)
+
+
+def _fail_page(page_index: int, error: Exception, failed_pages: List[int],
+               on_page_error: Optional[Callable[[int, Exception], None]]):
+    """
+    记录失败页
+    :param page_index: 页码
+    :param error: 异常
+    :param failed_pages: 失败页码列表
+    :param on_page_error: 失败回调，未指定时重新抛出异常
+    """
+    if on_page_error is None:
+        raise error
+    failed_pages.append(page_index)
+    on_page_error(page_index, error)
+
+
+def encode_data(dataset: List[dict], validator: Optional[RecordValidator] = None) -> bytes:
+    """
+    校验数据并编码为逗号分隔的紧凑JSON（每条记录只编码一次）
+    :param dataset: 包含多个职位信息的列表
+    :param validator: 记录校验器，默认逐条校验
+    :return: 整页UTF-8字节串
+    """
+    with run_metrics.timed_stage("validate"):
+        records = validate_and_fix_data(dataset, validator)
+    with run_metrics.timed_stage("encode"):
+        return encode_records(records)
+
+
+def encode_data_with_offsets(dataset: List[dict], validator: Optional[RecordValidator] = None) -> Tuple[bytes, List[int]]:
+    """
+    校验数据并编码，同时返回各记录的结束偏移（滚动输出时按记录边界切分文件）
+    :param dataset: 包含多个职位信息的列表
+    :param validator: 记录校验器，默认逐条校验
+    :return: UTF-8字节串和各记录结束偏移的列表
+    """
+    with run_metrics.timed_stage("validate"):
+        records = validate_and_fix_data(dataset, validator)
+    with run_metrics.timed_stage("encode"):
+        return encode_records_with_offsets(records)
+
+
+def encode_parquet_data(dataset: List[dict], validator: Optional[RecordValidator] = None):
+    """
+    校验数据并按列转换为 Arrow 数据块（在工作进程内执行）
+    :param dataset: 包含多个职位信息的列表
+    :param validator: 记录校验器，默认逐条校验
+    :return: Arrow RecordBatch
+    """
+    from parquet_sink import to_record_batch  # 仅在输出 Parquet 时才需要 pyarrow
+    with run_metrics.timed_stage("validate"):
+        records = validate_and_fix_data(dataset, validator)
+    with run_metrics.timed_stage("encode"):
+        return to_record_batch(records)
+
+
+def validate_and_fix_data(dataset: List[dict], validator: Optional[RecordValidator] = None) -> List[dict]:
+    """
+    验证并修复数据（就地修复，没有丢弃记录时不构造新列表）
+    :param dataset: 原始数据集
+    :param validator: 记录校验器，默认逐条校验
+    :return: 验证和修复后的数据集
+    """
+    return (validator or _FULL_VALIDATOR).validate(dataset)
+
+
+class RollingState(NamedTuple):
+    """
+    滚动输出在某个文件边界处的状态：已完成文件的统计，以及下一个文件第一条记录在生成流中的位置（用于断点续跑）
+    """
+    files_written: int
+    bytes_written: int
+    records_written: int
+    page: int  # 下一条记录所在的页
+    chunk: int  # 下一条记录所在的页内数据块序号
+    record: int  # 下一条记录在该数据块内的序号
+
+
+def run_rolling_pipeline(page_size: int, open_file: Callable[[int], FanOutWriter],
+                         transform: Callable[[List[dict]], Tuple[bytes, Sequence[int]]],
+                         max_file_bytes: Optional[int] = None,
+                         max_file_records: Optional[int] = None,
+                         byte_budget: Optional[int] = None,
+                         total_records: Optional[int] = None,
+                         workers: int = 1,
+                         seed: Optional[int] = None,
+                         reference_date: Optional[date] = None,
+                         id_allocator: Optional[PositionIdAllocator] = None,
+                         chunk_size: int = DEFAULT_CHUNK_RECORDS,
+                         on_file_done: Optional[Callable[["RollingWriter"], None]] = None,
+                         metrics: Optional[RunMetrics] = None,
+                         resume: Optional[RollingState] = None,
+                         first_page: int = 1,
+                         distributions: Optional[Dict[str, AliasTable]] = None,
+                         knowledge_base: Optional[KnowledgeBase] = None) -> "RollingWriter":
+    """
+    流式生成数据并按目标大小滚动写入文件：文件边界由字节数/记录数决定，与生成时的页无关。
+    指定字节预算时持续生成，直到再写一条记录就会超出预算为止
+    :param page_size: 生成单位（页）的记录数，仅决定随机数流与职位ID的划分
+    :param open_file: 为第N个文件（从1开始）打开写入器的函数
+    :param transform: 数据块的校验与编码函数（需为模块级函数），返回UTF-8字节串和各记录结束偏移
+    :param max_file_bytes: 单个文件的目标字节数（如HDFS块大小），文件不会超过该大小
+    :param max_file_records: 单个文件的最大记录数
+    :param byte_budget: 总字节预算，None 表示不限
+    :param total_records: 总记录数上限，None 表示不限（此时必须指定字节预算）
+    :param workers: 工作进程数
+    :param seed: 随机种子
+    :param reference_date: 发布时间的基准日期，默认当天
+    :param id_allocator: 职位ID分配器
+    :param chunk_size: 每个数据块的记录数
+    :param on_file_done: 每个文件写完后的回调，参数为滚动写入器（可读取统计信息）
+    :param metrics: 运行指标（各阶段耗时、写入字节数等）
+    :param resume: 从某个文件边界继续（断点续跑），生成流从该位置重新开始，输出与不中断时完全一致
+    :param first_page: 生成流的第一页（分片生成时为该分片页区间的起点），总记录数从该页起计算
+    :param distributions: 字段名 -> 别名表，未配置的字段均匀抽取
+    :param knowledge_base: 知识库，默认为内置知识库
+    :return: 滚动写入器（含文件数、字节数、记录数统计）
+    """
+    if byte_budget is None and total_records is None:
+        raise ValueError("未指定字节预算时必须指定总记录数")
+    start_page, first_chunk, skip = (resume.page, resume.chunk, resume.record) if resume else (first_page, 0, 0)
+    pages = (count(start_page) if total_records is None
+             else range(start_page, first_page + -(-total_records // page_size)))
+    writer = RollingWriter(open_file, max_file_bytes=max_file_bytes, max_file_records=max_file_records,
+                           byte_budget=byte_budget, on_file_done=on_file_done, metrics=metrics, resume=resume)
+    chunks = generate_chunks(pages, page_size, workers=workers, transform=transform, seed=seed,
+                             reference_date=reference_date, id_allocator=id_allocator, chunk_size=chunk_size,
+                             metrics=metrics, first_chunk=first_chunk, distributions=distributions,
+                             knowledge_base=knowledge_base)
+    try:
+        page_index, chunk_index = None, first_chunk - 1
+        for current_page, (payload, record_ends) in chunks:
+            chunk_index = chunk_index + 1 if current_page == page_index or page_index is None else 0
+            page_index = current_page
+            if skip:
+                # 续跑的第一个数据块中，已写入之前文件的记录直接跳过
+                cut = record_ends[skip - 1]
+                payload, record_ends = payload[cut:], [end - cut for end in record_ends[skip:]]
+            if not writer.write_chunk(payload, record_ends, position=(page_index, chunk_index, skip)):
+                break
+            skip = 0
+    finally:
+        chunks.close()
+        writer.close()
+    return writer
+
+
+class RollingWriter:
+    """
+    滚动写入器：按记录边界将编码后的数据切分到多个文件，每个文件不超过目标字节数/记录数，总量不超过字节预算
+    """
+
+    def __init__(self, open_file: Callable[[int], FanOutWriter], max_file_bytes: Optional[int] = None,
+                 max_file_records: Optional[int] = None, byte_budget: Optional[int] = None,
+                 on_file_done: Optional[Callable[["RollingWriter"], None]] = None,
+                 metrics: Optional[RunMetrics] = None, resume: Optional[RollingState] = None):
+        """
+        :param open_file: 为第N个文件（从1开始）打开写入器的函数
+        :param max_file_bytes: 单个文件的目标字节数
+        :param max_file_records: 单个文件的最大记录数
+        :param byte_budget: 总字节预算
+        :param on_file_done: 每个文件写完后的回调
+        :param metrics: 运行指标
+        :param resume: 续跑时之前已完成文件的状态
+        """
+        self.max_file_bytes = max_file_bytes
+        self.max_file_records = max_file_records
+        self.byte_budget = byte_budget
+        self.files_written = resume.files_written if resume else 0
+        self.bytes_written = resume.bytes_written if resume else 0
+        self.records_written = resume.records_written if resume else 0
+        self.file_bytes = 0
+        self.file_records = 0
+        self.exhausted = False
+        self.next_position: Optional[Tuple[int, int, int]] = None  # 最近一次切换文件时下一条记录的位置
+        self._open_file = open_file
+        self._on_file_done = on_file_done
+        self._metrics = metrics
+        self._writer: Optional[FanOutWriter] = None
+
+    def write_chunk(self, payload: bytes, record_ends: Sequence[int],
+                    position: Optional[Tuple[int, int, int]] = None) -> bool:
+        """
+        写入一个已编码的数据块，必要时在记录边界处切换到下一个文件
+        :param payload: 数据块的UTF-8字节串
+        :param record_ends: 各记录在 payload 中的结束偏移（递增）
+        :param position: 数据块在生成流中的位置 (页码, 页内块序号, 第一条记录在块内的序号)，用于记录续跑位置
+        :return: 是否还能继续写入（字节预算用尽时返回 False）
+        """
+        if self.exhausted:
+            return False
+        view = memoryview(payload)
+        start, index = 0, 0
+        while index < len(record_ends):
+            room = self._room()
+            end_index = bisect_right(record_ends, start + room, lo=index)
+            if self.max_file_records is not None:
+                end_index = min(end_index, index + self.max_file_records - self.file_records)
+            if end_index == index:
+                if self.byte_budget is not None and record_ends[index] - start > self.byte_budget - self.bytes_written:
+                    # 剩余预算放不下下一条记录，生成结束
+                    self.exhausted = True
+                    return False
+                if self.file_records:
+                    self._roll(None if position is None else (position[0], position[1], position[2] + index))
+                    continue
+                # 单条记录就超过文件目标大小时单独成为一个文件
+                end_index = index + 1
+            end = record_ends[end_index - 1]
+            if self._writer is None:
+                self._writer = self._open_file(self.files_written + 1)
+            piece = payload if end - start == len(payload) else bytes(view[start:end])
+            write_start = time.perf_counter()
+            self._writer.write_encoded(piece)
+            if self._metrics is not None:
+                self._metrics.observe_write(len(piece), time.perf_counter() - write_start)
+            self.file_bytes += end - start
+            self.file_records += end_index - index
+            self.bytes_written += end - start
+            self.records_written += end_index - index
+            start, index = end, end_index
+        return True
+
+    def close(self):
+        """
+        关闭当前文件
+        """
+        if self._writer is not None:
+            self._roll()
+
+    def _room(self) -> float:
+        """
+        计算当前文件还能写入的字节数（同时受文件目标大小和总预算限制）
+        :return: 可写入字节数
+        """
+        room = float("inf")
+        if self.max_file_bytes is not None:
+            room = self.max_file_bytes - self.file_bytes
+        if self.byte_budget is not None:
+            room = min(room, self.byte_budget - self.bytes_written)
+        return room
+
+    def state(self) -> Optional[RollingState]:
+        """
+        最近一次切换文件时的状态（续跑位置），生成流结束时关闭的最后一个文件没有续跑位置
+        :return: 滚动状态，无续跑位置时返回 None
+        """
+        if self.next_position is None:
+            return None
+        return RollingState(self.files_written, self.bytes_written, self.records_written, *self.next_position)
+
+    def _roll(self, next_position: Optional[Tuple[int, int, int]] = None):
+        """
+        关闭当前文件，后续写入将打开新文件
+        :param next_position: 下一条记录在生成流中的位置
+        """
+        self.next_position = next_position
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            start = time.perf_counter()
+            writer.close()
+            if self._metrics is not None:
+                self._metrics.observe_close(time.perf_counter() - start)
+            self.files_written += 1
+        self.file_bytes = self.file_records = 0
+        if writer is not None and self._on_file_done is not None:
+            self._on_file_done(self)
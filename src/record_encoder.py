@@ -0,0 +1,213 @@
+"""
+模块名称：record_encoder.py
+模块职责：按记录结构特化的JSON编码器：职位要求、枚举字段等常量片段只编码一次并缓存为字符串，每条记录由缓存片段和少量可变字段拼接而成，
+         输出与 json.dumps(..., ensure_ascii=False, separators=(',', ':')) 逐字节一致
+作者：D.C.Y.
+创建时间：2026/10/18 23:31:20
+最后修改时间：2026/10/19 06:07:45
+"""
+import json
+from itertools import islice, permutations
+from json.encoder import encode_basestring
+from typing import Callable, Dict, Iterable, List, Optional
+
+from data_definitions import (
+    COMPANY_SIZES,
+    COMPANY_TYPES,
+    EDUCATION_LEVELS,
+    FINANCE_STAGES,
+    GENERAL_TAGS,
+    POSITION_ADVANTAGES,
+)
+from knowledge_base import KnowledgeBase, builtin_knowledge_base
+from record_schema import JOB_TYPE_PIECES, RECORD_FIELDS
+
+MAX_CACHED_VALUES = 1 << 16  # 每个字段最多缓存的取值数，缓存满后不再加入新取值（已缓存的取值保留，取值不受限的字段不会无限占用内存）
+
+# 通用编码器：记录结构不符时整体回退到它，保证结果始终与 json.dumps 一致
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+LIST_FIELDS = ("businessArea", "welfare", "applicationRequirements", "positionLables")  # 字符串列表字段
+
+
+class _FragmentCache(dict):
+    """
+    字段片段缓存：取值 -> 已编码的 "键":值 片段，未命中时编码，缓存未满时加入缓存（只接受字符串和 None，其余类型抛出 TypeError）
+    """
+
+    def __init__(self, prefix: str):
+        """
+        :param prefix: 已编码的 "键": 前缀，为空时只缓存值本身
+        """
+        super().__init__()
+        self.prefix = prefix
+
+    def __missing__(self, value) -> str:
+        if value is None:
+            fragment = self.prefix + "null"
+        elif type(value) is str:
+            fragment = self.prefix + encode_basestring(value)
+        else:
+            raise TypeError(f"不可缓存的取值类型: {type(value).__name__}")
+        if len(self) < MAX_CACHED_VALUES:
+            self[value] = fragment
+        return fragment
+
+    def warm(self, values: Iterable):
+        """
+        预先编码一组取值（最多预热到缓存上限）
+        :param values: 取值序列
+        """
+        for value in islice(values, MAX_CACHED_VALUES - len(self)):
+            self.__getitem__(value)
+
+
+class RecordEncoder:
+    """
+    职位记录编码器。
+
+    - 字段顺序与 RECORD_FIELDS 一致的记录走快速路径：逐字段取缓存片段，各职位类型的技术要求只在构造时编码一次；
+    - 字段顺序不同、含意外类型（如浮点数、嵌套字典）的记录整体交给通用编码器，结果仍与 json.dumps 一致；
+    - 目录字段（公司、行业、地址、福利）按实际使用的知识库预热，每个知识库只预热一次；
+    - 缓存只会增加条目，多个线程同时编码时最多重复计算同一片段，不影响结果。
+    """
+
+    def __init__(self, constant_structures: Iterable[object] = (), enum_values: Optional[Dict[str, Iterable]] = None):
+        """
+        :param constant_structures: 在所有记录间共享的常量结构（如各职位类型的技术要求），按对象身份缓存其编码结果
+        :param enum_values: 字段名 -> 取值集合，预先编码这些取值的片段
+        """
+        self._strings = _FragmentCache("")  # 列表元素的编码缓存，所有列表字段共用
+        self._structures = {id(value): (value, _ENCODER.encode(value)) for value in constant_structures}
+        self._shapes = {RECORD_FIELDS, RECORD_FIELDS[:-1]}  # 有或没有技术标签两种字段布局
+        self._fields: List[Callable[[object], str]] = []
+        self._caches: Dict[str, _FragmentCache] = {}  # 非列表字段名 -> 片段缓存
+        self._warmed_catalogs = set()  # 已预热的知识库路径（内置知识库为 None）
+        for field in RECORD_FIELDS:
+            prefix = encode_basestring(field) + ":"
+            if field in LIST_FIELDS:
+                self._fields.append(self._list_field(prefix))
+            elif field == "requirements":
+                self._fields.append(self._structure_field(prefix))
+            elif field == "positionId":
+                self._fields.append(self._int_field(prefix))
+            else:
+                cache = self._caches[field] = _FragmentCache(prefix)
+                self._fields.append(cache.__getitem__)
+        self.warm(enum_values or {})
+
+    def encode(self, record: Dict) -> str:
+        """
+        将一条记录编码为紧凑JSON字符串
+        :param record: 职位记录
+        :return: JSON字符串
+        """
+        if tuple(record) in self._shapes:
+            try:
+                return "{" + ",".join([field(value) for field, value in zip(self._fields, record.values())]) + "}"
+            except TypeError:
+                pass
+        return _ENCODER.encode(record)
+
+    def warm(self, enum_values: Dict[str, Iterable]):
+        """
+        预先编码各字段的取值片段
+        :param enum_values: 字段名 -> 取值集合；列表字段为其候选元素
+        """
+        for field, values in enum_values.items():
+            self._caches.get(field, self._strings).warm(values)
+
+    def warm_catalogs(self, knowledge_base: Optional[KnowledgeBase] = None):
+        """
+        按知识库预热公司、简称、行业、地址和福利目录（同一知识库只预热一次）
+        :param knowledge_base: 知识库，默认为内置知识库
+        """
+        knowledge_base = knowledge_base or builtin_knowledge_base()
+        if knowledge_base.path in self._warmed_catalogs:
+            return
+        self._warmed_catalogs.add(knowledge_base.path)
+        self.warm({
+            "companyFullName": knowledge_base.companies,
+            "companyShortName": knowledge_base.short_names,
+            "industryField": knowledge_base.industries,
+            "workAddress": knowledge_base.addresses,
+            "businessArea": knowledge_base.industries,
+            "welfare": knowledge_base.welfare,
+        })
+
+    def _list_field(self, prefix: str) -> Callable[[object], str]:
+        """
+        创建字符串列表字段的编码函数（元素逐个取缓存）
+        :param prefix: 已编码的 "键": 前缀
+        :return: 编码函数
+        """
+        null, opening, element = prefix + "null", prefix + "[", self._strings.__getitem__
+
+        def encode_list(value) -> str:
+            if value is None:
+                return null
+            if type(value) is not list:
+                raise TypeError(f"不是列表: {type(value).__name__}")
+            return opening + ",".join(map(element, value)) + "]"
+
+        return encode_list
+
+    def _structure_field(self, prefix: str) -> Callable[[object], str]:
+        """
+        创建常量结构字段的编码函数（已知的共享对象直接取预编码结果）
+        :param prefix: 已编码的 "键": 前缀
+        :return: 编码函数
+        """
+        null, structures = prefix + "null", self._structures
+
+        def encode_structure(value) -> str:
+            if value is None:
+                return null
+            cached = structures.get(id(value))
+            return prefix + (cached[1] if cached is not None and cached[0] is value else _ENCODER.encode(value))
+
+        return encode_structure
+
+    @staticmethod
+    def _int_field(prefix: str) -> Callable[[object], str]:
+        """
+        创建整数字段的编码函数
+        :param prefix: 已编码的 "键": 前缀
+        :return: 编码函数
+        """
+
+        def encode_int(value) -> str:
+            if type(value) is not int:
+                raise TypeError(f"不是整数: {type(value).__name__}")
+            return prefix + int.__repr__(value)
+
+        return encode_int
+
+
+def _default_encoder() -> RecordEncoder:
+    """
+    按数据定义构造默认编码器：预先编码各职位类型的技术要求和全部枚举取值（目录字段由 warm_catalogs 按知识库预热）
+    :return: 编码器
+    """
+    pieces = JOB_TYPE_PIECES.values()
+    return RecordEncoder(
+        constant_structures=[p.requirements for p in pieces],
+        enum_values={
+            "companyType": COMPANY_TYPES,
+            "financeStage": FINANCE_STAGES,
+            "companySize": COMPANY_SIZES,
+            "positionName": [p.position_name for p in pieces],
+            "firstType": list(JOB_TYPE_PIECES),
+            "education": EDUCATION_LEVELS + [None],
+            "positionAdvantage": POSITION_ADVANTAGES + [None],
+            "jobDescription": [p.description_prefix + "、".join(points)
+                               for p in pieces for points in permutations(p.description_points, 3)],
+            "positionLables": [tag for p in pieces for tag in (*p.label_prefix, *p.extra_tags)] + GENERAL_TAGS,
+            "applicationRequirements": [item for p in pieces for item in p.application_requirements],
+        },
+    )
+
+
+_DEFAULT = _default_encoder()
+encode_json = _DEFAULT.encode  # 默认编码函数：记录 -> 紧凑JSON字符串
+warm_catalogs = _DEFAULT.warm_catalogs  # 按生成时使用的知识库预热默认编码器
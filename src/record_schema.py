@@ -0,0 +1,98 @@
+"""
+模块名称：record_schema.py
+模块职责：职位记录结构：由 BASE_TEMPLATE 预先确定的字段顺序、紧凑的元组行形式，以及按职位类型预先计算的常量片段
+作者：D.C.Y.
+创建时间：2026/10/18 23:02:45
+最后修改时间：2026/10/18 23:02:45
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from data_definitions import (
+    APPLICATION_REQUIREMENTS,
+    BASE_TEMPLATE,
+    EXTRA_TAGS,
+    JOB_DESCRIPTIONS,
+    POSITION_REQUIREMENTS,
+    TECH_REQUIREMENTS,
+)
+
+RECORD_FIELDS: Tuple[str, ...] = tuple(BASE_TEMPLATE) + ("positionLables",)  # 输出记录的字段顺序
+JOB_TYPES: Tuple[str, ...] = tuple(TECH_REQUIREMENTS)  # 职位类型（抽样时按此顺序取下标）
+
+
+class JobRow(NamedTuple):
+    """
+    职位记录的紧凑行形式：字段顺序与输出记录一致，按位置存取，不为每条记录保存键。
+    适合在内存中批量处理（如排序、去重、统计），需要输出时再用 to_record 转换为字典
+    """
+    companyFullName: str
+    companyShortName: str
+    companyType: str
+    financeStage: str
+    companySize: str
+    industryField: str
+    businessArea: Optional[List[str]]
+    workAddress: str
+    positionName: str
+    firstType: str
+    education: Optional[str]
+    workYear: Optional[str]
+    salary: str
+    welfare: Optional[List[str]]
+    positionAdvantage: Optional[str]
+    jobDescription: str
+    requirements: Optional[Dict]
+    applicationRequirements: Optional[List[str]]
+    positionId: int
+    formatCreateTime: str
+    positionLables: Optional[List[str]] = None
+
+    def to_record(self) -> Dict:
+        """
+        转换为输出用的记录字典（没有技术标签的记录不含 positionLables 字段，与逐条生成一致）
+        :return: 职位记录
+        """
+        record = dict(zip(RECORD_FIELDS, self))
+        if self.positionLables is None:
+            del record["positionLables"]
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "JobRow":
+        """
+        由记录字典构造行
+        :param record: 职位记录
+        :return: 职位记录行
+        """
+        return cls._make(record.get(field) for field in RECORD_FIELDS)
+
+
+assert JobRow._fields == RECORD_FIELDS, "JobRow 的字段须与 BASE_TEMPLATE 的字段顺序一致"
+
+
+class JobTypePieces(NamedTuple):
+    """
+    某一职位类型的常量片段：每条记录直接引用，不再重复拼接或复制
+    """
+    position_name: str  # 职位名称
+    description_prefix: str  # 职位描述的固定开头
+    description_points: List[str]  # 职位描述要点候选
+    requirements: Dict  # 技术要求（所有记录共享同一对象，只读）
+    application_requirements: List[str]  # 申请要求候选
+    extra_tags: List[str]  # 额外标签候选
+    label_prefix: Tuple[str, ...]  # 技术标签的固定前缀：技术栈前三项 + 平台标签 + 认证标签
+
+
+JOB_TYPE_PIECES: Dict[str, JobTypePieces] = {
+    job_type: JobTypePieces(
+        position_name=f"{job_type}工程师",
+        description_prefix=f"负责{job_type}相关工作，包括：",
+        description_points=JOB_DESCRIPTIONS[job_type],
+        requirements=POSITION_REQUIREMENTS[job_type],
+        application_requirements=APPLICATION_REQUIREMENTS[job_type],
+        extra_tags=EXTRA_TAGS.get(job_type, []),
+        label_prefix=tuple(TECH_REQUIREMENTS[job_type][:3])
+        + ("大数据平台" if "数据" in job_type else "业务分析", f"{job_type}认证优先"),
+    )
+    for job_type in JOB_TYPES
+}
@@ -0,0 +1,90 @@
+"""
+模块名称：region_resolver.py
+模块职责：多模式关键词匹配（Aho-Corasick自动机），用于大规模公司库的地区解析
+作者：D.C.Y.
+创建时间：2026/10/18 15:40:05
+最后修改时间：2026/10/18 15:40:05
+"""
+from collections import deque
+from typing import Dict, List, Sequence
+
+_NO_MATCH = -1
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 多模式匹配自动机。
+
+    关键词按传入顺序确定优先级，first_match 返回文本中出现的优先级最高（下标最小）的关键词，
+    与"按顺序逐个 keyword in text"的结果一致，但每个文本只需扫描一遍，与关键词数量无关。
+    """
+
+    def __init__(self, keywords: Sequence[str]):
+        """
+        :param keywords: 关键词列表（顺序即优先级）
+        """
+        self.keywords = list(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[int] = [_NO_MATCH]  # 以该状态结尾的所有关键词中优先级最高者
+        for index, keyword in enumerate(self.keywords):
+            self._insert(keyword, index)
+        self._build_fail_links()
+
+    def first_match(self, text: str) -> int:
+        """
+        查找文本中出现的优先级最高的关键词
+        :param text: 待匹配文本
+        :return: 关键词下标，未匹配返回 -1
+        """
+        goto, fail, best = self._goto, self._fail, self._best
+        state, found = 0, _NO_MATCH
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            candidate = best[state]
+            if candidate != _NO_MATCH and (found == _NO_MATCH or candidate < found):
+                found = candidate
+                if found == 0:
+                    break
+        return found
+
+    def _insert(self, keyword: str, index: int):
+        """
+        将关键词插入字典树
+        :param keyword: 关键词
+        :param index: 关键词下标
+        """
+        if not keyword:
+            raise ValueError("关键词不能为空")
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(_NO_MATCH)
+            state = next_state
+        if self._best[state] == _NO_MATCH or index < self._best[state]:
+            self._best[state] = index
+
+    def _build_fail_links(self):
+        """
+        按层次遍历构建失败指针，并沿失败链合并各状态的最高优先级
+        """
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                inherited = self._best[self._fail[next_state]]
+                if inherited != _NO_MATCH and (self._best[next_state] == _NO_MATCH
+                                               or inherited < self._best[next_state]):
+                    self._best[next_state] = inherited
+                queue.append(next_state)
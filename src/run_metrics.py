@@ -0,0 +1,347 @@
+"""
+模块名称：run_metrics.py
+模块职责：生成运行的分阶段指标（生成/校验/编码/画像/写入耗时、吞吐、写入字节数、上传延迟直方图、重试与丢弃记录数），
+         基于实时吞吐估算剩余时间，并定期导出为 Prometheus 文本文件或 JSON Lines；可选地汇总各数据块的数据画像
+作者：D.C.Y.
+创建时间：2026/10/18 21:05:26
+最后修改时间：2026/10/19 00:18:36
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+STAGES = ("generate", "validate", "encode", "profile", "write")  # 按数据流顺序排列的处理阶段
+UPLOAD_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # 上传延迟直方图上界（秒）
+_RATE_SMOOTHING = 0.3  # 实时吞吐的指数平滑系数
+_RATE_MIN_INTERVAL = 1.0  # 两次吞吐采样的最小间隔（秒）
+
+# 当前进程内正在处理的数据块的统计（工作进程中由生成与校验、编码函数写入，随处理结果一起返回主进程）
+_chunk_stats: Dict[str, float] = {}
+
+
+@contextmanager
+def timed_stage(stage: str):
+    """
+    累计当前数据块在某一阶段的耗时（每个数据块调用一次，开销可忽略）
+    :param stage: 阶段名，见 STAGES
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        key = f"{stage}_seconds"
+        _chunk_stats[key] = _chunk_stats.get(key, 0.0) + time.perf_counter() - start
+
+
+def count_event(name: str, amount: int = 1):
+    """
+    累计当前数据块的事件计数（如校验丢弃、修复的记录数）
+    :param name: 事件名
+    :param amount: 增量
+    """
+    _chunk_stats[name] = _chunk_stats.get(name, 0) + amount
+
+
+def take_chunk_stats() -> Dict[str, float]:
+    """
+    取出并清空当前数据块的统计
+    :return: 统计字典
+    """
+    stats = dict(_chunk_stats)
+    _chunk_stats.clear()
+    return stats
+
+
+class RunMetrics:
+    """
+    一次生成运行的指标汇总（线程安全）。
+
+    - 生成、校验、编码阶段在工作进程中计时，经 add_chunk 汇总，多进程时为各进程耗时之和，可能超过墙钟时间；
+    - 写入阶段为主进程写入输出目标（或提交上传队列）的耗时，上传阶段按每次尝试记录延迟；
+    - 剩余时间按平滑后的实时吞吐估算：指定字节预算时按字节数，否则按记录数。
+    """
+
+    def __init__(self, total_records: Optional[int] = None, byte_budget: Optional[int] = None, profile=None):
+        """
+        :param total_records: 计划生成的记录总数，None 表示未知
+        :param byte_budget: 计划写入的总字节数，指定后按字节估算剩余时间
+        :param profile: 数据画像（data_profile.DataProfile），指定后工作进程为每个数据块统计画像并合并到此处
+        """
+        self.total_records = total_records
+        self.byte_budget = byte_budget
+        self.profile = profile
+        self.started = time.time()
+        self.records_generated = 0
+        self.records_validated = 0
+        self.records_dropped = 0
+        self.records_fixed = 0
+        self.bytes_written = 0
+        self.stage_seconds = {stage: 0.0 for stage in STAGES}
+        self.uploads = 0
+        self.upload_bytes = 0
+        self.upload_retries = 0
+        self.upload_failures = 0
+        self.upload_latency_buckets = [0] * (len(UPLOAD_LATENCY_BUCKETS) + 1)
+        self.upload_latency_sum = 0.0
+        self._lock = threading.Lock()
+        self._rate: Optional[float] = None
+        self._last_sample = (time.perf_counter(), 0)
+        self._export_path: Optional[str] = None
+        self._export_format = "jsonl"
+        self._stop = threading.Event()
+        self._exporter: Optional[threading.Thread] = None
+
+    def add_chunk(self, stats: Dict[str, float]):
+        """
+        汇总一个数据块在工作进程中的统计
+        :param stats: 数据块统计，含 records 及各阶段耗时、validated、dropped、fixed 计数，启用画像时含 profile
+        """
+        with self._lock:
+            if self.profile is not None and stats.get("profile") is not None:
+                self.profile.merge(stats["profile"])
+            self.records_generated += stats.get("records", 0)
+            self.records_validated += stats.get("validated", 0)
+            self.records_dropped += stats.get("dropped", 0)
+            self.records_fixed += stats.get("fixed", 0)
+            for stage in STAGES:
+                self.stage_seconds[stage] += stats.get(f"{stage}_seconds", 0.0)
+
+    def observe_write(self, nbytes: int, seconds: float):
+        """
+        记录一次写入
+        :param nbytes: 写入的字节数
+        :param seconds: 写入耗时
+        """
+        with self._lock:
+            self.bytes_written += nbytes
+            self.stage_seconds["write"] += seconds
+
+    def observe_close(self, seconds: float):
+        """
+        记录关闭输出目标（刷新缓冲、写文件尾）的耗时
+        :param seconds: 耗时
+        """
+        with self._lock:
+            self.stage_seconds["write"] += seconds
+
+    def observe_upload(self, seconds: float, nbytes: int, succeeded: bool):
+        """
+        记录一次上传尝试
+        :param seconds: 本次尝试的延迟
+        :param nbytes: 上传的字节数
+        :param succeeded: 是否成功
+        """
+        with self._lock:
+            self.upload_latency_buckets[bisect_left(UPLOAD_LATENCY_BUCKETS, seconds)] += 1
+            self.upload_latency_sum += seconds
+            if succeeded:
+                self.uploads += 1
+                self.upload_bytes += nbytes
+
+    def observe_retry(self):
+        """
+        记录一次上传重试
+        """
+        with self._lock:
+            self.upload_retries += 1
+
+    def observe_upload_failure(self):
+        """
+        记录一个重试耗尽仍上传失败的页面
+        """
+        with self._lock:
+            self.upload_failures += 1
+
+    def throughput(self) -> float:
+        """
+        平滑后的实时吞吐（条/秒），两次采样间隔不足1秒时沿用上次结果
+        :return: 条/秒
+        """
+        with self._lock:
+            now, records = time.perf_counter(), self.records_generated
+            last_time, last_records = self._last_sample
+            if now - last_time >= _RATE_MIN_INTERVAL or self._rate is None:
+                rate = (records - last_records) / max(now - last_time, 1e-9)
+                self._rate = rate if self._rate is None else _RATE_SMOOTHING * rate + (1 - _RATE_SMOOTHING) * self._rate
+                self._last_sample = (now, records)
+            return self._rate
+
+    def eta(self) -> Optional[float]:
+        """
+        按实时吞吐估算剩余时间
+        :return: 剩余秒数，计划总量未知或尚无吞吐时返回 None
+        """
+        rate = self.throughput()
+        if not rate or (self.total_records is None and self.byte_budget is None):
+            return None
+        if self.byte_budget is not None:
+            if not self.records_generated:
+                return None
+            # 以平均记录大小把记录吞吐换算为字节吞吐
+            byte_rate = rate * self.bytes_written / self.records_generated
+            return max(self.byte_budget - self.bytes_written, 0) / byte_rate if byte_rate else None
+        return max(self.total_records - self.records_generated, 0) / rate
+
+    def snapshot(self) -> Dict:
+        """
+        生成当前指标快照
+        :return: 指标字典
+        """
+        records_per_sec, eta = self.throughput(), self.eta()
+        with self._lock:
+            return {
+                "timestamp": round(time.time(), 3),
+                "elapsed_seconds": round(time.time() - self.started, 3),
+                "records_generated": self.records_generated,
+                "records_validated": self.records_validated,
+                "records_dropped": self.records_dropped,
+                "records_fixed": self.records_fixed,
+                "bytes_written": self.bytes_written,
+                "records_per_sec": round(records_per_sec or 0.0, 1),
+                "eta_seconds": round(eta, 1) if eta is not None else None,
+                "stage_seconds": {stage: round(seconds, 6) for stage, seconds in self.stage_seconds.items()},
+                "uploads": self.uploads,
+                "upload_bytes": self.upload_bytes,
+                "upload_retries": self.upload_retries,
+                "upload_failures": self.upload_failures,
+                "upload_latency": {
+                    "buckets": dict(zip([str(bound) for bound in UPLOAD_LATENCY_BUCKETS] + ["+Inf"],
+                                        self.upload_latency_buckets)),
+                    "sum": round(self.upload_latency_sum, 6),
+                    "count": sum(self.upload_latency_buckets),
+                },
+            }
+
+    def start_export(self, path: str, export_format: str = "jsonl", interval: float = 10.0):
+        """
+        启动后台线程定期导出指标
+        :param path: 导出文件路径
+        :param export_format: prometheus（整体替换的文本文件，供 node_exporter textfile 采集）或 jsonl（每次追加一行）
+        :param interval: 导出间隔（秒）
+        """
+        self._export_path, self._export_format = path, export_format
+        self._exporter = threading.Thread(target=self._export_loop, args=(interval,), name="metrics-export", daemon=True)
+        self._exporter.start()
+
+    def close(self):
+        """
+        停止定期导出并写出最终指标
+        """
+        if self._exporter is None:
+            return
+        self._stop.set()
+        self._exporter.join()
+        self._exporter = None
+        self.export()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def export(self):
+        """
+        立即导出一次指标
+        """
+        snapshot = self.snapshot()
+        if self._export_format == "prometheus":
+            # 先写临时文件再原子替换，采集方不会读到写了一半的文件
+            temp_path = f"{self._export_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(format_prometheus(snapshot))
+            os.replace(temp_path, self._export_path)
+        else:
+            with open(self._export_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+
+    def format_summary(self) -> str:
+        """
+        生成各阶段耗时的单行摘要
+        :return: 摘要文本
+        """
+        snapshot = self.snapshot()
+        stages = "，".join(f"{stage} {seconds:.2f}s" for stage, seconds in snapshot["stage_seconds"].items())
+        return (f"分阶段耗时: {stages}；校验 {snapshot['records_validated']} 条，"
+                f"丢弃 {snapshot['records_dropped']} 条，修复 {snapshot['records_fixed']} 条，"
+                f"上传重试 {snapshot['upload_retries']} 次")
+
+    def _export_loop(self, interval: float):
+        """
+        定期导出线程主循环
+        :param interval: 导出间隔（秒）
+        """
+        while not self._stop.wait(interval):
+            try:
+                self.export()
+            except OSError as e:
+                print(f"\n指标导出失败: {str(e)}")
+
+
+def format_prometheus(snapshot: Dict) -> str:
+    """
+    将指标快照格式化为 Prometheus 文本格式
+    :param snapshot: 指标快照
+    :return: 文本
+    """
+    lines: List[str] = []
+
+    def metric(name: str, metric_type: str, help_text: str, samples: Dict[str, float]):
+        lines.append(f"# HELP jobgen_{name} {help_text}")
+        lines.append(f"# TYPE jobgen_{name} {metric_type}")
+        for labels, value in samples.items():
+            lines.append(f"jobgen_{name}{labels} {value}")
+
+    metric("records_generated_total", "counter", "Records generated.", {"": snapshot["records_generated"]})
+    metric("records_validated_total", "counter", "Records checked by validation (sampled or full).",
+           {"": snapshot["records_validated"]})
+    metric("records_dropped_total", "counter", "Records dropped by validation.", {"": snapshot["records_dropped"]})
+    metric("records_fixed_total", "counter", "Records repaired by validation.", {"": snapshot["records_fixed"]})
+    metric("bytes_written_total", "counter", "Encoded bytes handed to the output.", {"": snapshot["bytes_written"]})
+    metric("stage_seconds_total", "counter", "Time spent per pipeline stage.",
+           {f'{{stage="{stage}"}}': seconds for stage, seconds in snapshot["stage_seconds"].items()})
+    metric("records_per_second", "gauge", "Smoothed live generation throughput.", {"": snapshot["records_per_sec"]})
+    if snapshot["eta_seconds"] is not None:
+        metric("eta_seconds", "gauge", "Estimated time to completion.", {"": snapshot["eta_seconds"]})
+    metric("elapsed_seconds", "gauge", "Time since the run started.", {"": snapshot["elapsed_seconds"]})
+    metric("uploads_total", "counter", "Files uploaded successfully.", {"": snapshot["uploads"]})
+    metric("upload_bytes_total", "counter", "Bytes uploaded successfully.", {"": snapshot["upload_bytes"]})
+    metric("upload_retries_total", "counter", "Upload retries.", {"": snapshot["upload_retries"]})
+    metric("upload_failures_total", "counter", "Files that failed after all retries.", {"": snapshot["upload_failures"]})
+
+    latency = snapshot["upload_latency"]
+    cumulative, buckets = 0, {}
+    for bound, bucket_count in latency["buckets"].items():
+        cumulative += bucket_count
+        buckets[f'_bucket{{le="{bound}"}}'] = cumulative
+    buckets["_sum"], buckets["_count"] = latency["sum"], latency["count"]
+    metric("upload_latency_seconds", "histogram", "Latency of each upload attempt.", buckets)
+    return "\n".join(lines) + "\n"
+
+
+def payload_size(payload) -> int:
+    """
+    计算数据块的字节数（Arrow 数据块按其内存占用计算）
+    :param payload: 字节串或 Arrow 数据块
+    :return: 字节数
+    """
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return len(payload)
+    return getattr(payload, "nbytes", 0)
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    """
+    将剩余秒数格式化为进度显示用的文本
+    :param seconds: 剩余秒数
+    :return: 如 "剩余约 1h02m"，未知时返回空串
+    """
+    if seconds is None:
+        return ""
+    minutes, secs = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f" 剩余约 {hours}h{minutes:02d}m" if hours else f" 剩余约 {minutes}m{secs:02d}s"
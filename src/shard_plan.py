@@ -0,0 +1,228 @@
+"""
+模块名称：shard_plan.py
+模块职责：多节点分片生成：按 (分片序号, 分片总数) 确定性地划分互不重叠的页区间与职位ID区间，各节点独立生成并直接写入 HDFS，
+         每个分片完成后写出分片清单（及分片画像），最后由任一节点合并为一份分区清单（及分区画像），全程无需中心协调
+作者：D.C.Y.
+创建时间：2026/10/19 00:46:51
+最后修改时间：2026/10/19 06:16:52
+"""
+import json
+import posixpath
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from data_profile import PROFILE_FILE_NAME, DataProfile
+from parallel_generation import format_page_ranges, parse_date
+from partition_manifest import PartitionManifest, partition_name
+from sinks import read_hdfs_json, write_hdfs_file
+
+SHARD_MANIFEST_VERSION = 1
+# 各分片清单中必须一致的字段，不一致说明各节点的运行参数不同，不能合并
+SHARED_FIELDS = ("shards", "date", "seed", "run_key", "id_width", "id_offset", "page_count", "page_size", "layout",
+                 "extension")
+
+
+class ShardPlan(NamedTuple):
+    """
+    分片计划：第 shard 个分片（从1开始）负责总页数中连续的一段页。
+    各页的内容与职位ID只由 (种子, 页码) 决定，因此页区间不重叠即职位ID区间不重叠，分片之间无需通信
+    """
+    shard: int  # 分片序号（从1开始）
+    shards: int  # 分片总数
+
+    def pages(self, page_count: int) -> range:
+        """
+        该分片负责的页码（各分片的页数最多相差1）
+        :param page_count: 总页数
+        :return: 页码区间
+        """
+        return range((self.shard - 1) * page_count // self.shards + 1, self.shard * page_count // self.shards + 1)
+
+    def id_range(self, page_count: int, page_size: int, id_offset: int = 0) -> Tuple[int, int]:
+        """
+        该分片占用的职位ID序号区间
+        :param page_count: 总页数
+        :param page_size: 每页记录数
+        :param id_offset: 职位ID序号起点
+        :return: [起点, 终点) 序号区间
+        """
+        pages = self.pages(page_count)
+        return id_offset + (pages.start - 1) * page_size, id_offset + (pages.stop - 1) * page_size
+
+    @property
+    def file_prefix(self) -> str:
+        """
+        滚动输出时该分片的文件名前缀（滚动文件按分片各自编号，加上分片序号后路径不会冲突）
+        """
+        return f"shard{self.shard}-page"
+
+    @property
+    def manifest_name(self) -> str:
+        """
+        分片清单的文件名（下划线开头，Hive/Spark 扫描分区数据时会忽略）
+        """
+        return shard_manifest_name(self.shard, self.shards)
+
+    @property
+    def profile_name(self) -> str:
+        """
+        分片画像的文件名（各分片分别写出，合并时汇总为一份分区画像）
+        """
+        return shard_profile_name(self.shard, self.shards)
+
+
+def shard_manifest_name(shard: int, shards: int) -> str:
+    """
+    分片清单的文件名
+    :param shard: 分片序号（从1开始）
+    :param shards: 分片总数
+    :return: 文件名
+    """
+    return f"_shard{shard}-of-{shards}.json"
+
+
+def shard_profile_name(shard: int, shards: int) -> str:
+    """
+    分片画像的文件名
+    :param shard: 分片序号（从1开始）
+    :param shards: 分片总数
+    :return: 文件名
+    """
+    return f"_profile-shard{shard}-of-{shards}.json"
+
+
+def write_shard_manifest(client, directory: str, plan: ShardPlan, reference_date: date, seed: int, run_key: int,
+                         id_width: int, id_offset: int, page_count: int, page_size: int, extension: str,
+                         files: List[int], failed: List[int], records: Optional[int] = None, rolling: bool = False):
+    """
+    写出一个分片的清单：先写临时文件再改名，合并时读到的清单一定是完整的
+    :param client: HDFS 客户端
+    :param directory: 分区目录
+    :param plan: 分片计划
+    :param reference_date: 分区日期
+    :param seed: 随机种子
+    :param run_key: 职位ID分配密钥
+    :param id_width: 职位ID的十进制位数
+    :param id_offset: 职位ID序号起点
+    :param page_count: 总页数（所有分片合计）
+    :param page_size: 每页记录数
+    :param extension: 文件扩展名
+    :param files: 上传成功的页码（滚动输出时为该分片的文件序号）
+    :param failed: 上传失败的页码（或文件序号）
+    :param records: 该分片写入的记录数，默认按上传成功的页数计算
+    :param rolling: 是否为按大小滚动输出
+    """
+    pages = plan.pages(page_count)
+    data = json.dumps({
+        "version": SHARD_MANIFEST_VERSION,
+        "shard": plan.shard,
+        "shards": plan.shards,
+        "date": partition_name(reference_date),
+        "seed": seed,
+        "run_key": run_key,
+        "id_width": id_width,
+        "id_offset": id_offset,
+        "id_range": list(plan.id_range(page_count, page_size, id_offset)),
+        "page_count": page_count,
+        "page_size": page_size,
+        "pages": format_page_ranges(pages),
+        "layout": "rolling" if rolling else "pages",
+        "file_prefix": plan.file_prefix if rolling else "page",
+        "extension": extension,
+        "files": sorted(files),
+        "failed": sorted(failed),
+        "records": records if records is not None else len(files) * page_size,
+        "updated": datetime.now().isoformat(timespec="seconds"),
+    }, ensure_ascii=False, indent=2)
+    write_hdfs_file(client, posixpath.join(directory, plan.manifest_name), data.encode("utf-8"))
+
+
+def load_shard_manifests(client, directory: str, shards: int) -> Tuple[Dict[int, dict], List[int]]:
+    """
+    读取一个分区目录下全部分片的清单
+    :param client: HDFS 客户端
+    :param directory: 分区目录
+    :param shards: 分片总数
+    :return: 分片序号到清单内容的映射，以及尚未写出清单的分片序号
+    """
+    found, missing = {}, []
+    for shard in range(1, shards + 1):
+        path = posixpath.join(directory, shard_manifest_name(shard, shards))
+        data = read_hdfs_json(client, path)
+        if data is None:
+            missing.append(shard)
+            continue
+        if data.get("version") != SHARD_MANIFEST_VERSION:
+            raise ValueError(f"不支持的分片清单版本: {path}")
+        found[shard] = data
+    return found, missing
+
+
+def merge_shard_profiles(client, directory: str, shards: int) -> Optional[DataProfile]:
+    """
+    合并一个分区全部分片的画像，写出分区画像
+    :param client: HDFS 客户端
+    :param directory: 分区目录
+    :param shards: 分片总数
+    :return: 合并后的画像，各分片均未生成画像时返回 None
+    """
+    states = [read_hdfs_json(client, posixpath.join(directory, shard_profile_name(shard, shards)))
+              for shard in range(1, shards + 1)]
+    missing = [shard for shard, state in enumerate(states, 1) if state is None]
+    if len(missing) == shards:
+        return None
+    if missing:
+        raise ValueError(f"分片 {format_page_ranges(missing)} 缺少数据画像（各分片须同时使用或同时不使用 --profile）")
+    profile = DataProfile()
+    for state in states:
+        profile.merge(DataProfile.from_state(state["state"]))
+    write_hdfs_file(client, posixpath.join(directory, PROFILE_FILE_NAME), profile.to_json().encode("utf-8"))
+    return profile
+
+
+def merge_shard_manifests(client, root: str, reference_date: date, shards: int) -> PartitionManifest:
+    """
+    合并一个分区全部分片的清单，校验各分片参数一致、均已完成且页区间恰好覆盖全部页，然后将该分区记入分区清单；
+    各分片生成了画像时一并合并为分区画像
+    :param client: HDFS 客户端
+    :param root: HDFS 存储根目录
+    :param reference_date: 分区日期
+    :param shards: 分片总数
+    :return: 已保存的分区清单
+    """
+    directory = posixpath.join(root, partition_name(reference_date))
+    found, missing = load_shard_manifests(client, directory, shards)
+    if missing:
+        raise ValueError(f"分片 {format_page_ranges(missing)} 尚未完成（缺少分片清单）")
+    first = found[1]
+    for shard, data in found.items():
+        changed = [name for name in SHARED_FIELDS if data[name] != first[name]]
+        if changed:
+            raise ValueError(f"分片 {shard} 的运行参数与分片 1 不一致: {', '.join(changed)}")
+        if data["failed"]:
+            raise ValueError(f"分片 {shard} 有上传失败的文件: {format_page_ranges(data['failed'])}")
+        if data["pages"] != format_page_ranges(ShardPlan(shard, shards).pages(data["page_count"])):
+            raise ValueError(f"分片 {shard} 的页区间 {data['pages']} 与分片计划不符")
+    if parse_date(first["date"]) != reference_date:
+        raise ValueError(f"分片清单的日期 {first['date']} 与分区 {partition_name(reference_date)} 不一致")
+
+    manifest = PartitionManifest.load(client, root, run_key=first["run_key"], id_width=first["id_width"])
+    if (manifest.run_key, manifest.id_width) != (first["run_key"], first["id_width"]):
+        raise ValueError(f"分片的职位ID密钥或位数与分区清单 {manifest.path} 不一致")
+    if manifest.get(reference_date) is not None:
+        raise ValueError(f"分区 {partition_name(reference_date)} 已在分区清单中")
+    if first["id_offset"] < manifest.next_id_offset:
+        raise ValueError(f"分片的职位ID区间与已有分区重叠，请以 --id-offset {manifest.next_id_offset} 重新生成")
+
+    merge_shard_profiles(client, directory, shards)
+    rolling = first["layout"] == "rolling"
+    pages = [] if rolling else [page for data in found.values() for page in data["files"]]
+    manifest.record_partition(
+        reference_date, first["seed"], first["id_offset"], first["page_size"], pages, first["extension"],
+        records=sum(data["records"] for data in found.values()), rolling=rolling, page_count=first["page_count"],
+        shards={str(shard): {field: data[field] for field in ("pages", "id_range", "file_prefix", "files", "records")}
+                for shard, data in sorted(found.items())},
+    )
+    manifest.next_id_offset = max(manifest.next_id_offset, first["id_offset"] + first["page_count"] * first["page_size"])
+    manifest.save(client)
+    return manifest
@@ -0,0 +1,408 @@
+"""
+模块名称：sinks.py
+模块职责：记录编码与输出目标抽象（每条记录只编码一次，按大块写入任意多个输出目标；可选多线程分块压缩）
+作者：D.C.Y.
+创建时间：2026/10/18 16:20:33
+最后修改时间：2026/10/19 06:16:52
+"""
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from record_encoder import encode_json
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # 默认写入块大小：1MB
+RECORD_SEPARATOR = ","  # 记录之间以逗号分隔（与历史输出格式一致）
+BGZF_BLOCK_SIZE = 0xFF00  # BGZF 每块未压缩数据上限（保证压缩后整块不超过64KB）
+DEFAULT_COMPRESS_THREADS = 4  # 默认压缩线程数
+TEMP_SUFFIX = ".tmp"  # 原子提交时临时文件的后缀
+
+# BGZF 结束标记：一个不含数据的空块
+BGZF_EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+_BGZF_HEADER = struct.Struct("<4BI2BH2BHH")  # gzip 头 + 扩展字段 BC（记录整块长度）
+_BGZF_TRAILER = struct.Struct("<2I")  # CRC32 + 未压缩长度
+_COMPRESS_POOLS: Dict[int, ThreadPoolExecutor] = {}
+_COMPRESS_POOLS_LOCK = threading.Lock()
+
+
+def encode_record(record: Dict) -> bytes:
+    """
+    将单条记录编码为紧凑JSON字节串（含结尾分隔符）
+    :param record: 职位记录
+    :return: UTF-8字节串
+    """
+    return (encode_json(record) + RECORD_SEPARATOR).encode("utf-8")
+
+
+def encode_records(records: Iterable[Dict]) -> bytes:
+    """
+    将多条记录一次性编码为字节串，每条记录后跟分隔符
+    :param records: 职位记录序列
+    :return: UTF-8字节串
+    """
+    encode = encode_json  # 常量片段已预先编码，每条记录只拼接缓存片段和可变字段
+    return "".join([encode(record) + RECORD_SEPARATOR for record in records]).encode("utf-8")
+
+
+def encode_records_with_offsets(records: Iterable[Dict]) -> Tuple[bytes, List[int]]:
+    """
+    将多条记录编码为字节串，同时返回每条记录（含分隔符）的结束偏移，便于按记录边界切分文件
+    :param records: 职位记录序列
+    :return: UTF-8字节串和各记录结束偏移的列表
+    """
+    encode = encode_json
+    parts = [(encode(record) + RECORD_SEPARATOR).encode("utf-8") for record in records]
+    return b"".join(parts), list(accumulate(len(part) for part in parts))
+
+
+class Sink(ABC):
+    """
+    输出目标基类：接收已编码的字节块
+    """
+
+    @abstractmethod
+    def write(self, chunk: bytes):
+        """
+        写入一个字节块
+        :param chunk: 字节块
+        """
+
+    def close(self):
+        """
+        关闭输出目标
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class LocalFileSink(Sink):
+    """
+    本地文件输出
+    """
+
+    def __init__(self, path: str, buffer_size: int = DEFAULT_CHUNK_SIZE, atomic: bool = False):
+        """
+        :param path: 文件路径
+        :param buffer_size: 文件缓冲区大小
+        :param atomic: 是否原子提交：先写入临时文件（.tmp），关闭时再改名为正式文件，中途失败不会留下不完整的文件
+        """
+        self.path = path
+        self._temp_path = path + TEMP_SUFFIX if atomic else None
+        self._file = open(self._temp_path or path, "wb", buffering=buffer_size)
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+
+    def close(self):
+        if self._temp_path is None:
+            self._file.close()
+            return
+        try:
+            self._file.close()  # 刷新缓冲区失败（如磁盘已满）时不能提交
+        except BaseException:
+            os.remove(self._temp_path)
+            raise
+        os.replace(self._temp_path, self.path)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None or self._temp_path is None:
+            self.close()
+            return
+        # 原子提交的文件出错时丢弃临时文件，保留原有的正式文件
+        self._file.close()
+        os.remove(self._temp_path)
+
+
+class HdfsSink(Sink):
+    """
+    HDFS文件输出（通过 WebHDFS 流式写入）
+    """
+
+    def __init__(self, hdfs_client, path: str, overwrite: bool = True, atomic: bool = False):
+        """
+        :param hdfs_client: HDFS 客户端
+        :param path: HDFS 文件路径
+        :param overwrite: 文件已存在时是否覆盖
+        :param atomic: 是否原子提交：先上传到临时文件（.tmp），完成后再改名为正式文件（需允许覆盖）
+        """
+        self.path = path
+        self._client = hdfs_client
+        self._temp_path = path + TEMP_SUFFIX if atomic else None
+        self._context = hdfs_client.write(self._temp_path or path, overwrite=overwrite or atomic)
+        self._writer = self._context.__enter__()
+
+    def write(self, chunk: bytes):
+        self._writer.write(chunk)
+
+    def close(self):
+        self._context.__exit__(None, None, None)
+        if self._temp_path is not None:
+            replace_hdfs_file(self._client, self._temp_path, self.path)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            return
+        # 出错时将异常交给客户端处理，中止本次上传（原子提交时正式文件保持不变）
+        self._context.__exit__(exc_type, exc_value, traceback)
+
+
+def replace_hdfs_file(client, temp_path: str, path: str):
+    """
+    用已完整上传的临时文件替换 HDFS 上的正式文件（HDFS 改名不覆盖已存在的文件，需先删除旧文件）。
+    删除后、改名前中断时正式文件暂时缺失，读取端应通过 read_hdfs_json 回退到临时文件
+    :param client: HDFS 客户端
+    :param temp_path: 临时文件路径
+    :param path: 正式文件路径
+    """
+    client.delete(path)
+    client.rename(temp_path, path)
+
+
+def write_hdfs_file(client, path: str, data: bytes):
+    """
+    原子写入 HDFS 上的小文件（清单、画像等）：先写临时文件，再替换正式文件
+    :param client: HDFS 客户端
+    :param path: 文件路径
+    :param data: 文件内容
+    """
+    temp_path = path + TEMP_SUFFIX
+    client.write(temp_path, data=data, overwrite=True)
+    replace_hdfs_file(client, temp_path, path)
+
+
+def read_hdfs_json(client, path: str) -> Optional[Dict]:
+    """
+    读取由 write_hdfs_file 写出的 JSON 文件；正式文件缺失（上次替换在删除旧文件后、改名前中断）时读取临时文件
+    :param client: HDFS 客户端
+    :param path: 文件路径
+    :return: 文件内容，正式文件和临时文件都不存在时返回 None
+    """
+    for candidate in (path, path + TEMP_SUFFIX):
+        if client.status(candidate, strict=False) is None:
+            continue
+        with client.read(candidate, encoding="utf-8") as reader:
+            return json.load(reader)
+    return None
+
+
+class BlockGzipSink(Sink):
+    """
+    BGZF（分块gzip）压缩输出：数据按不超过64KB切块，每块是一个独立的gzip成员，由线程池并行压缩、按顺序写出。
+
+    - 文件整体仍是合法的 .gz，gzip/zcat/Spark 均可直接读取；
+    - 每块头部记录了整块长度，读取端（如 Hadoop-BAM 的 BGZF 编解码器）可从任意块边界开始解压，便于切分并行处理；
+    - 同一份压缩结果可同时写入多个输出目标（如本地两份副本），只压缩一次。
+    """
+
+    def __init__(self, sinks: List[Sink], compresslevel: int = 6, threads: int = DEFAULT_COMPRESS_THREADS):
+        """
+        :param sinks: 接收压缩数据的输出目标
+        :param compresslevel: 压缩级别
+        :param threads: 压缩线程数（同一线程数的所有输出共用一个线程池）
+        """
+        self.sinks = sinks
+        self.compresslevel = compresslevel
+        self._executor = _compress_pool(threads)
+        self._max_pending = threads * 2
+        self._pending = deque()
+        self._buffer = bytearray()
+
+    def write(self, chunk: bytes):
+        self._buffer += chunk
+        if len(self._buffer) < BGZF_BLOCK_SIZE:
+            return
+        view = memoryview(self._buffer)
+        full = len(view) // BGZF_BLOCK_SIZE * BGZF_BLOCK_SIZE
+        for start in range(0, full, BGZF_BLOCK_SIZE):
+            self._submit(bytes(view[start:start + BGZF_BLOCK_SIZE]))
+        view.release()
+        del self._buffer[:full]
+
+    def close(self):
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._write_block(self._pending.popleft().result())
+            self._write_block(BGZF_EOF)
+        except BaseException:
+            # 剩余数据未能全部写出时中止各输出目标，不提交不完整的文件
+            self.__exit__(*sys.exc_info())
+            raise
+        close_sinks(self.sinks)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            return
+        # 出错时丢弃未写出的块，将异常传递给各输出目标
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        abort_sinks(self.sinks, exc_type, exc_value, traceback)
+
+    def _submit(self, block: bytes):
+        """
+        提交一个数据块压缩，在途块过多时先按顺序写出最早的块
+        :param block: 未压缩数据块
+        """
+        if len(self._pending) >= self._max_pending:
+            self._write_block(self._pending.popleft().result())
+        self._pending.append(self._executor.submit(compress_bgzf_block, block, self.compresslevel))
+
+    def _write_block(self, block: bytes):
+        """
+        将压缩块写入所有输出目标
+        :param block: 压缩块
+        """
+        for sink in self.sinks:
+            sink.write(block)
+
+
+def close_sinks(sinks: List[Sink]):
+    """
+    依次关闭（提交）各输出目标；某一目标关闭失败时中止其余尚未关闭的目标
+    :param sinks: 输出目标列表
+    """
+    for index, sink in enumerate(sinks):
+        try:
+            sink.close()
+        except BaseException:
+            abort_sinks(sinks[index + 1:], *sys.exc_info())
+            raise
+
+
+def abort_sinks(sinks: List[Sink], exc_type, exc_value, traceback):
+    """
+    中止各输出目标（原子提交的目标丢弃临时文件），中止时的次生异常不掩盖原始异常
+    :param sinks: 输出目标列表
+    :param exc_type: 异常类型
+    :param exc_value: 异常
+    :param traceback: 异常堆栈
+    """
+    for sink in sinks:
+        try:
+            sink.__exit__(exc_type, exc_value, traceback)
+        except Exception:
+            pass
+
+
+def compress_bgzf_block(data: bytes, compresslevel: int = 6) -> bytes:
+    """
+    将一段数据压缩为一个 BGZF 块（zlib 压缩时释放GIL，可在线程中并行执行）
+    :param data: 未压缩数据（不超过 BGZF_BLOCK_SIZE 字节）
+    :param compresslevel: 压缩级别
+    :return: 完整的 BGZF 块
+    """
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush()
+    block_size = _BGZF_HEADER.size + len(deflated) + _BGZF_TRAILER.size
+    header = _BGZF_HEADER.pack(31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, block_size - 1)
+    return header + deflated + _BGZF_TRAILER.pack(zlib.crc32(data), len(data))
+
+
+def _compress_pool(threads: int) -> ThreadPoolExecutor:
+    """
+    获取指定线程数的共享压缩线程池
+    :param threads: 线程数
+    :return: 线程池
+    """
+    with _COMPRESS_POOLS_LOCK:
+        executor = _COMPRESS_POOLS.get(threads)
+        if executor is None:
+            executor = _COMPRESS_POOLS[threads] = ThreadPoolExecutor(max_workers=threads,
+                                                                    thread_name_prefix="bgzf")
+        return executor
+
+
+class FanOutWriter:
+    """
+    扇出写入器：记录只编码一次，累积到块大小后同时写入所有输出目标
+    """
+
+    def __init__(self, sinks: List[Sink], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        :param sinks: 输出目标列表
+        :param chunk_size: 写入块大小（字节）
+        """
+        self.sinks = sinks
+        self.chunk_size = chunk_size
+        self.bytes_written = 0
+        self._buffer = bytearray()
+
+    def write_record(self, record: Dict):
+        """
+        编码并写入单条记录
+        :param record: 职位记录
+        """
+        self._buffer += encode_record(record)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_encoded(self, payload: bytes):
+        """
+        写入已编码的字节串（如工作进程编码好的整页数据）
+        :param payload: 字节串
+        """
+        if len(self._buffer) + len(payload) < self.chunk_size:
+            self._buffer += payload
+            return
+        self.flush()
+        if len(payload) >= self.chunk_size:
+            # 大块数据直接写出，避免再复制一次
+            self._write_chunk(payload)
+        else:
+            self._buffer += payload
+
+    def flush(self):
+        """
+        将缓冲区内容写入所有输出目标
+        """
+        if not self._buffer:
+            return
+        self._write_chunk(bytes(self._buffer))
+        self._buffer.clear()
+
+    def _write_chunk(self, chunk: bytes):
+        """
+        将一个字节块写入所有输出目标
+        :param chunk: 字节块
+        """
+        for sink in self.sinks:
+            sink.write(chunk)
+        self.bytes_written += len(chunk)
+
+    def close(self):
+        """
+        刷新缓冲区并关闭所有输出目标；刷新失败时中止各输出目标，不会提交不完整的文件
+        """
+        try:
+            self.flush()
+        except BaseException:
+            abort_sinks(self.sinks, *sys.exc_info())
+            raise
+        close_sinks(self.sinks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            return
+        # 出错时不再刷新缓冲区，直接将异常传递给各输出目标
+        abort_sinks(self.sinks, exc_type, exc_value, traceback)
@@ -0,0 +1,152 @@
+"""
+模块名称：weighted_sampling.py
+模块职责：按字段配置的加权抽样：由权重或 Zipf 偏斜预先构建别名表（Alias Method），每次加权抽取为 O(1)，
+         用于模拟招聘数据中热门公司、热门城市等热点键的偏斜分布
+作者：D.C.Y.
+创建时间：2026/10/19 01:12:05
+最后修改时间：2026/10/19 03:38:02
+"""
+import json
+import random
+from typing import Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from data_definitions import (
+    ADDRESS_TEMPLATES,
+    BIGDATA_COMPANIES,
+    COMPANY_SIZES,
+    COMPANY_TYPES,
+    EDUCATION_LEVELS,
+    FINANCE_STAGES,
+    INDUSTRY_FIELDS,
+)
+from record_schema import JOB_TYPES
+
+# 可配置权重的字段及其候选值（顺序即 Zipf 偏斜的热度排名，排在前面的最热）
+# workAddress 按城市（地址模板）加权，城市名取模板的前两个字
+SKEWABLE_FIELDS: Dict[str, List[str]] = {
+    "companyFullName": list(BIGDATA_COMPANIES),
+    "companyType": list(COMPANY_TYPES),
+    "financeStage": list(FINANCE_STAGES),
+    "companySize": list(COMPANY_SIZES),
+    "industryField": list(INDUSTRY_FIELDS),
+    "workAddress": [template[:2] for template in ADDRESS_TEMPLATES],
+    "firstType": list(JOB_TYPES),
+    "education": list(EDUCATION_LEVELS),
+}
+FIELD_ALIASES = {"company": "companyFullName", "city": "workAddress", "industry": "industryField",
+                 "jobType": "firstType"}  # 命令行中可用的字段简称
+
+
+class AliasTable:
+    """
+    别名表（Vose 算法）：构建一次 O(k)，之后每次抽取只需一个均匀下标和一次比较，与候选数 k 无关。
+    只保存 prob 与 alias 两个数组，传给工作进程时不携带归一化后的概率
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        """
+        :param weights: 各候选的非负权重（无需归一化）
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or not len(weights) or (weights < 0).any() or not weights.sum() > 0:
+            raise ValueError("权重须为非负数且不全为0")
+        k = len(weights)
+        scaled = (weights / weights.sum() * k).tolist()
+        prob, alias = [1.0] * k, list(range(k))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, g = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], g
+            scaled[g] -= 1.0 - scaled[s]
+            (small if scaled[g] < 1.0 else large).append(g)
+        # 剩余的候选因浮点误差未配对，概率即为1
+        self.prob = np.array(prob, dtype=np.float64)
+        self.alias = np.array(alias, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def draw(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """
+        向量化抽取 n 个下标
+        :param rng: NumPy随机数生成器
+        :param n: 数量
+        :return: 下标数组
+        """
+        index = rng.integers(0, len(self.prob), n)
+        return np.where(rng.random(n) < self.prob[index], index, self.alias[index])
+
+    def sample(self, uniform: Callable[[], float] = random.random) -> int:
+        """
+        抽取一个下标（逐条生成时使用）
+        :param uniform: [0, 1) 均匀随机数函数，默认使用 random 模块
+        :return: 下标
+        """
+        index = int(uniform() * len(self.prob))
+        return index if uniform() < self.prob[index] else int(self.alias[index])
+
+
+def skewable_fields(knowledge_base=None) -> Mapping[str, Sequence[str]]:
+    """
+    各可配置权重字段的候选值：公司、行业和城市取自知识库，其余字段取自内置目录
+    :param knowledge_base: 知识库（knowledge_base.KnowledgeBase），默认为内置目录
+    :return: 字段名 -> 候选值序列
+    """
+    if knowledge_base is None:
+        return SKEWABLE_FIELDS
+    return {**SKEWABLE_FIELDS, "companyFullName": knowledge_base.companies,
+            "industryField": knowledge_base.industries, "workAddress": knowledge_base.cities}
+
+
+def zipf_weights(k: int, exponent: float) -> List[float]:
+    """
+    Zipf 权重：排名第 r 的候选权重为 1 / r^exponent（exponent 为0时即均匀分布）
+    :param k: 候选数
+    :param exponent: 偏斜指数
+    :return: 权重列表
+    """
+    return [1.0 / rank ** exponent for rank in range(1, k + 1)]
+
+
+def build_field_distributions(spec: Mapping[str, object],
+                              catalogs: Optional[Mapping[str, Sequence[str]]] = None) -> Dict[str, AliasTable]:
+    """
+    由字段权重配置构建各字段的别名表
+    :param spec: 字段名（或简称）-> {"zipf": 指数} 或 {候选值: 权重}（未列出的候选值权重为0）
+    :param catalogs: 各字段的候选值，默认为 SKEWABLE_FIELDS
+    :return: 字段名 -> 别名表；未配置的字段不出现，仍按均匀分布抽取
+    """
+    catalogs = catalogs if catalogs is not None else SKEWABLE_FIELDS
+    distributions = {}
+    for name, weights in spec.items():
+        field = FIELD_ALIASES.get(name, name)
+        if field not in catalogs:
+            raise ValueError(f"字段 {name} 不支持配置权重，可选: {', '.join(catalogs)}")
+        if not isinstance(weights, Mapping):
+            raise ValueError(f"字段 {name} 的权重须为 {{\"zipf\": 指数}} 或 {{候选值: 权重}}")
+        values = catalogs[field]
+        if set(weights) == {"zipf"}:
+            distributions[field] = AliasTable(zipf_weights(len(values), float(weights["zipf"])))
+            continue
+        known = set(values)
+        unknown = [value for value in weights if value not in known]
+        if unknown:
+            raise ValueError(f"字段 {name} 没有候选值: {', '.join(map(str, unknown))}")
+        distributions[field] = AliasTable([float(weights.get(value, 0.0)) for value in values])
+    return distributions
+
+
+def load_field_weights(path: str) -> Dict[str, object]:
+    """
+    读取字段权重配置文件（JSON）
+    :param path: 文件路径
+    :return: 字段权重配置
+    """
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    if not isinstance(spec, dict):
+        raise ValueError(f"权重配置须为 JSON 对象: {path}")
+    return spec
@@ -0,0 +1,11 @@
+"""
+模块名称：conftest.py
+模块职责：pytest 公共配置：将 src 目录加入模块搜索路径（各模块以扁平方式互相导入）
+作者：D.C.Y.
+创建时间：2026/10/19 04:41:09
+最后修改时间：2026/10/19 04:41:09
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
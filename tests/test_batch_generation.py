@@ -0,0 +1,84 @@
+"""
+模块名称：test_batch_generation.py
+模块职责：向量化批量生成测试：字段与逐条生成一致、相同种子结果一致、薪资与发布时间落在规则范围内，
+         每行无放回抽样均匀且与候选池大小无关，以及保留的 generate_batch_data / save_data 入口
+作者：D.C.Y.
+创建时间：2026/10/19 05:18:02
+最后修改时间：2026/10/19 05:52:08
+"""
+import json
+from collections import Counter
+from datetime import date, timedelta
+
+import numpy as np
+
+import generate_data_to_upload_to_hdfs as hdfs_generator
+import generate_data_to_windows as windows_generator
+from batch_generation import _sample_rows, generate_batch_records
+from core_logic import salary_bounds
+from data_generation import generate_job_record
+
+
+def test_batch_records_have_the_legacy_fields():
+    """
+    批量生成的记录与逐条生成的记录字段相同、顺序相同（positionLables 为可选字段）
+    """
+    legacy = [key for key in generate_job_record() if key != "positionLables"]
+    for record in generate_batch_records(200, np.random.default_rng(1)):
+        assert [key for key in record if key != "positionLables"] == legacy
+
+
+def test_batch_records_follow_the_rules():
+    """
+    相同种子的两次生成结果一致；薪资在公司与职位类型的上下界内，发布时间在基准日期前一年内，职位ID按传入的取值
+    """
+    reference = date(2026, 1, 1)
+    position_ids = list(range(1000000, 1002000))
+    records = generate_batch_records(2000, np.random.default_rng(7), position_ids, reference)
+    assert records == generate_batch_records(2000, np.random.default_rng(7), position_ids, reference)
+    assert [record["positionId"] for record in records] == position_ids
+    for record in records:
+        min_salary, max_salary = salary_bounds(record["firstType"], record["companyFullName"])
+        lower, upper = (int(value[:-1]) for value in record["salary"].split("-"))
+        assert min_salary <= lower and lower + 5 <= upper <= max_salary
+        created = date.fromisoformat(record["formatCreateTime"])
+        assert reference - timedelta(days=365) <= created <= reference
+
+
+def test_row_sampling_is_uniform_without_replacement():
+    """
+    每行抽样不重复，5选3的60种有序结果出现频率接近均匀；分组抽样只取本组候选；候选池很大时同样可用
+    """
+    rng = np.random.default_rng(4)
+    pool = np.array(list("abcde"), dtype=object)
+    rows = _sample_rows(rng, pool, np.full(60000, 3), np.ones(60000, dtype=bool))
+    assert all(len(set(row)) == 3 for row in rows)
+    frequencies = Counter(tuple(row) for row in rows)
+    assert len(frequencies) == 60
+    assert max(abs(count - 1000) for count in frequencies.values()) < 150
+
+    groups = np.array([list("abcd"), list("wxyz")], dtype=object)
+    group_idx = rng.integers(0, 2, 1000)
+    rows = _sample_rows(rng, groups, np.full(1000, 4), np.ones(1000, dtype=bool), group_idx=group_idx)
+    assert all(sorted(row) == sorted(groups[group]) for row, group in zip(rows, group_idx))
+
+    large = np.arange(10 ** 7)
+    rows = _sample_rows(rng, large, np.full(1000, 5), rng.random(1000) > 0.5)
+    assert all(row is None or len(set(row)) == 5 for row in rows)
+
+
+def test_legacy_entry_points(tmp_path, monkeypatch):
+    """
+    generate_batch_data 返回指定数量的记录；save_data 将整页同时写入无扩展名版本和 .json 版本
+    """
+    assert len(hdfs_generator.generate_batch_data(50)) == 50
+    dataset = windows_generator.generate_batch_data(50)
+    assert len(dataset) == 50
+
+    for directory in ("JobData", "JobData-Json", "src"):
+        (tmp_path / directory).mkdir()
+    monkeypatch.chdir(tmp_path / "src")
+    windows_generator.save_data(1, dataset)
+    payload = (tmp_path / "JobData" / "page1").read_bytes()
+    assert payload == (tmp_path / "JobData-Json" / "page1.json").read_bytes()
+    assert json.loads(f"[{payload.decode('utf-8').rstrip(',')}]") == dataset
@@ -0,0 +1,68 @@
+"""
+模块名称：test_benchmark_generation.py
+模块职责：生成热路径基准测试脚本的测试：JSON结果包含各规模、各阶段的耗时与占比，与历史结果对比时吞吐下降超过容差以状态码1退出
+作者：D.C.Y.
+创建时间：2026/10/19 06:44:05
+最后修改时间：2026/10/19 06:44:05
+"""
+import json
+
+import pytest
+
+import benchmark_generation
+from benchmark_generation import STAGES, compare_with_baseline, parse_count
+
+
+def test_parse_count_accepts_suffixes():
+    """
+    记录数支持 k/M 后缀和小数
+    """
+    assert [parse_count(text) for text in ("500", "1k", "100K", "2.5M", " 10m ")] == [500, 1000, 100000, 2500000, 10000000]
+
+
+def test_results_cover_every_stage(tmp_path):
+    """
+    结果JSON包含单文件测量和各规模的全部阶段，顶层阶段的占比合计为1，批量引擎不计入占比
+    """
+    output = tmp_path / "results.json"
+    benchmark_generation.main(["--scales", "300,200", "--seed", "7", "--output", str(output)])
+    with open(output, encoding="utf-8") as f:
+        results = json.load(f)
+    assert results["seed"] == 7
+    assert results["page"]["records"] == benchmark_generation.PAGE_RECORDS
+    assert results["page"]["bytes"] > 0 and results["page"]["peak_traced_bytes"] > 0
+    assert [scale["records"] for scale in results["scales"]] == [300, 200]
+    for scale in results["scales"]:
+        stages = scale["stages"]
+        assert list(stages) == [name for name, _ in STAGES]
+        assert all(stage["seconds"] > 0 and stage["records_per_sec"] > 0 for stage in stages.values())
+        assert sum(stage["share"] for stage in stages.values() if stage["parent"] is None) == pytest.approx(1, abs=1e-3)
+        assert stages["generate_batch_records"]["share"] is None
+        assert scale["pipeline_records_per_sec"] == pytest.approx(
+            scale["records"] / scale["pipeline_seconds"], rel=1e-3)
+
+
+def test_baseline_comparison_flags_regressions(tmp_path, capsys):
+    """
+    与自身对比不报告回退；基线吞吐高出容差以上的阶段报告为回退，命令行以状态码1退出
+    """
+    output, faster = tmp_path / "results.json", tmp_path / "faster.json"
+    benchmark_generation.main(["--scales", "200", "--output", str(output)])
+    with open(output, encoding="utf-8") as f:
+        results = json.load(f)
+    assert compare_with_baseline(results, str(output), 0.1) == []
+
+    for stage in results["scales"][0]["stages"].values():
+        stage["records_per_sec"] *= 2
+    results["scales"][0]["stages"]["json_encoding"]["records_per_sec"] = None  # 缺少吞吐的阶段跳过对比
+    with open(faster, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+    with open(output, encoding="utf-8") as f:
+        current = json.load(f)
+    regressions = compare_with_baseline(current, str(faster), 0.1)
+    assert regressions == [f"200/{name}" for name, _ in STAGES if name != "json_encoding"]
+    assert f"共 {len(regressions)} 项性能回退" in capsys.readouterr().out
+
+    with pytest.raises(SystemExit) as exit_info:
+        benchmark_generation.main(["--scales", "200", "--output", "", "--baseline", str(faster), "--tolerance", "0.1"])
+    assert exit_info.value.code == 1
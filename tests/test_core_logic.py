@@ -0,0 +1,42 @@
+"""
+模块名称：test_core_logic.py
+模块职责：薪资与地址查找表测试：别名表抽取的薪资区间和地址频率与"先选下界再选上界""先选模板再选地址"的规则一致，
+         取值均落在规则范围内
+作者：D.C.Y.
+创建时间：2026/10/19 06:24:13
+最后修改时间：2026/10/19 06:24:13
+"""
+import random
+from collections import Counter
+
+import core_logic
+from data_definitions import ADDRESS_TEMPLATES
+
+
+def test_salary_draws_follow_the_two_step_rule():
+    """
+    下界在 [min, max-5] 中均匀、上界在 [下界+5, max] 中均匀：各区间的抽取频率与该规则的概率一致
+    """
+    random.seed(5)
+    min_salary, max_salary = core_logic.salary_bounds("数据分析", "无名科技有限公司")
+    draws = 100000
+    counts = Counter(core_logic.generate_salary("数据分析", "无名科技有限公司") for _ in range(draws))
+    lower_count = max_salary - 5 - min_salary + 1
+    for lower in range(min_salary, max_salary - 4):
+        for upper in range(lower + 5, max_salary + 1):
+            expected = 1 / (lower_count * (max_salary - lower - 4))
+            assert abs(counts.pop(f"{lower}k-{upper}k", 0) / draws - expected) < 0.004
+    assert not counts
+
+
+def test_address_draws_pick_templates_uniformly():
+    """
+    各地址模板被选中的频率相同；指定模板时只在该模板的地址中抽取
+    """
+    random.seed(6)
+    draws = 60000
+    owner = {address: index for index, group in enumerate(core_logic._ADDRESS_GROUPS) for address in group}
+    counts = Counter(owner[core_logic.generate_address()] for _ in range(draws))
+    assert len(counts) == len(ADDRESS_TEMPLATES)
+    assert all(abs(count / draws - 1 / len(ADDRESS_TEMPLATES)) < 0.01 for count in counts.values())
+    assert all(owner[core_logic.generate_address(3)] == 3 for _ in range(200))
@@ -0,0 +1,127 @@
+"""
+模块名称：test_data_profile.py
+模块职责：数据画像测试：流式统计的空值数、职位类型、薪资分位数与逐条计算一致，分块画像合并后与整体统计一致，
+         可合并状态往返不变，近似去重计数的误差，以及命令行不同进程数下写出的画像相同
+作者：D.C.Y.
+创建时间：2026/10/19 07:01:46
+最后修改时间：2026/10/19 07:01:46
+"""
+import json
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import generate_data_to_windows as windows_generator
+from batch_generation import generate_batch_records
+from data_profile import NULLABLE_FIELDS, PROFILE_FILE_NAME, DataProfile, DistinctCounter, parse_salary
+
+RECORD_COUNT = 3000
+
+
+@pytest.fixture(scope="module")
+def records() -> list:
+    """
+    固定随机数生成器与职位ID生成的测试记录，附带两条薪资无法解析的记录
+    """
+    generated = generate_batch_records(RECORD_COUNT, rng=np.random.default_rng(21),
+                                       position_ids=list(range(3000000, 3000000 + RECORD_COUNT)))
+    generated[0] = dict(generated[0], salary="面议")
+    generated[1] = dict(generated[1], salary=None)
+    return generated
+
+
+def test_streaming_stats_match_direct_computation(records):
+    """
+    空值数、职位类型计数、无法解析的薪资数与逐条计算一致，薪资分位数与排序后的取值一致（直方图精度为1k）
+    """
+    profile = DataProfile()
+    profile.add_records(records)
+    report = profile.report()
+    assert report["records"] == RECORD_COUNT
+    assert report["null_counts"] == {field: sum(1 for record in records if record.get(field) is None)
+                                     for field in NULLABLE_FIELDS}
+    assert {job_type: entry["count"] for job_type, entry in report["job_types"].items()} \
+        == Counter(record["firstType"] for record in records)
+    assert report["salary"]["unparsed"] == 2
+
+    bounds = sorted(parse_salary(record["salary"]) for record in records[2:])
+    overall = report["salary"]["overall"]
+    assert overall["count"] == RECORD_COUNT - 2
+    for row, bound in enumerate(("lower", "upper")):
+        values = sorted(pair[row] for pair in bounds)
+        assert overall[bound]["min"] == values[0]
+        assert overall[bound]["max"] == values[-1]
+        assert overall[bound]["p50"] == values[math.ceil(0.5 * len(values)) - 1]
+        assert overall[bound]["p99"] == values[math.ceil(0.99 * len(values)) - 1]
+        assert overall[bound]["mean"] == pytest.approx(sum(values) / len(values), abs=0.01)
+    assert sum(region["count"] for region in report["salary"]["by_region"].values()) == RECORD_COUNT - 2
+
+
+def test_merged_chunk_profiles_equal_the_whole(records):
+    """
+    按数据块分别统计后合并，结果与一次统计全部记录相同
+    """
+    whole = DataProfile()
+    whole.add_records(records)
+    merged = DataProfile()
+    for start in range(0, RECORD_COUNT, 700):
+        chunk = DataProfile()
+        chunk.add_records(records[start:start + 700])
+        merged.merge(chunk)
+    assert merged.report() == whole.report()
+
+
+def test_state_round_trip(records):
+    """
+    可合并状态经JSON往返后重建的画像与原画像相同，可以继续合并；版本不符时拒绝读取
+    """
+    profile = DataProfile()
+    profile.add_records(records[:1000])
+    state = json.loads(json.dumps(profile.to_state()))
+    restored = DataProfile.from_state(state)
+    assert restored.report() == profile.report()
+
+    rest = DataProfile()
+    rest.add_records(records[1000:])
+    restored.merge(rest)
+    whole = DataProfile()
+    whole.add_records(records)
+    assert restored.report() == whole.report()
+    assert json.loads(whole.to_json(include_state=True))["state"] == json.loads(json.dumps(whole.to_state()))
+
+    with pytest.raises(ValueError):
+        DataProfile.from_state(dict(state, version=state["version"] + 1))
+
+
+@pytest.mark.parametrize("count", [10, 1000, 200000])
+def test_distinct_counter_error(count):
+    """
+    近似去重计数在小基数与大基数下的误差都在几个标准误差以内，重复取值不重复计数
+    """
+    counter = DistinctCounter()
+    counter.add(list(range(count)))
+    counter.add(list(range(count)))
+    counter.add([None])
+    assert counter.estimate() == pytest.approx(count, rel=0.05)
+
+    strings = DistinctCounter()
+    strings.add([f"公司{index}" for index in range(count)] * 2)
+    assert strings.estimate() == pytest.approx(count, rel=0.05)
+
+
+def test_cli_profile_is_independent_of_workers(tmp_path):
+    """
+    命令行 --profile 写出的画像与进程数无关，职位ID去重数与记录数一致
+    """
+    reports = []
+    for workers in ("1", "3"):
+        root = tmp_path / workers
+        windows_generator.main(["--seed", "42", "--date", "20260101", "--page-count", "3", "--page-size", "1500",
+                                "--profile", "--workers", workers, "--output-dir", str(root)])
+        with open(root / "JobData" / PROFILE_FILE_NAME, encoding="utf-8") as f:
+            reports.append(json.load(f))
+    assert reports[0] == reports[1]
+    assert reports[0]["records"] == 4500
+    assert reports[0]["distinct"]["positionId"] == pytest.approx(4500, rel=0.05)
@@ -0,0 +1,153 @@
+"""
+模块名称：test_generation.py
+模块职责：生成流程的确定性测试：职位ID分配器的双射与取值范围、不同进程数与按页重建的输出逐字节一致、
+         断点续跑只补齐未完成的页、分片生成合并后与单节点运行结果一致
+作者：D.C.Y.
+创建时间：2026/10/19 04:41:09
+最后修改时间：2026/10/19 05:02:36
+"""
+import argparse
+import json
+import os
+
+import pytest
+
+import generate_data_to_upload_to_hdfs as hdfs_generator
+import generate_data_to_windows as windows_generator
+from id_allocator import MAX_ID_WIDTH, MIN_ID_WIDTH, PositionIdAllocator
+from local_webhdfs import LocalWebHdfsServer
+from parallel_generation import parse_id_width
+
+RUN_ARGS = ["--seed", "42", "--date", "20260101", "--page-count", "4", "--page-size", "1500"]  # 每页跨两个数据块
+
+
+def read_pages(root: str) -> dict:
+    """
+    读取本地输出的全部页面
+    :param root: 输出根目录
+    :return: 相对路径 -> 文件内容
+    """
+    pages = {}
+    for directory in ("JobData", "JobData-Json"):
+        for name in sorted(os.listdir(os.path.join(root, directory))):
+            if not name.startswith("_"):
+                with open(os.path.join(root, directory, name), "rb") as f:
+                    pages[f"{directory}/{name}"] = f.read()
+    return pages
+
+
+@pytest.mark.parametrize("width", [MIN_ID_WIDTH, 3, 4])
+def test_allocator_is_bijection_on_small_widths(width):
+    """
+    位数较小时遍历整个ID空间：每个序号对应唯一的职位ID，且恰好取遍全部 width 位十进制数
+    """
+    allocator = PositionIdAllocator(run_key=7, width=width)
+    ids = allocator.ids_for(0, allocator.capacity)
+    assert sorted(ids) == list(range(10 ** (width - 1), 10 ** width))
+    assert [allocator.id_at(index) for index in range(0, allocator.capacity, 97)] == ids[::97]
+
+
+@pytest.mark.parametrize("width", [7, 12, 18, MAX_ID_WIDTH])
+def test_allocator_range_and_offset_on_large_widths(width):
+    """
+    位数较大时抽查ID空间两端：取值不重复、位数正确，偏移后的分配器与原分配器的对应序号一致
+    """
+    allocator = PositionIdAllocator(run_key=7, width=width)
+    for start in (0, allocator.capacity - 5000):
+        ids = allocator.ids_for(start, 5000)
+        assert len(set(ids)) == len(ids)
+        assert all(10 ** (width - 1) <= position_id < 10 ** width for position_id in ids)
+        assert allocator.id_at(start + 1234) == ids[1234]
+    shifted = PositionIdAllocator(run_key=7, width=width, offset=1000)
+    assert shifted.ids_for(0, 100) == allocator.ids_for(1000, 100)
+    with pytest.raises(ValueError):
+        allocator.ids_for(allocator.capacity - 10, 11)
+
+
+def test_allocator_rejects_unsupported_widths():
+    """
+    超出分配器支持范围的位数在构造和解析命令行参数时均被拒绝
+    """
+    for width in (MIN_ID_WIDTH - 1, MAX_ID_WIDTH + 1):
+        with pytest.raises(ValueError):
+            PositionIdAllocator(run_key=7, width=width)
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_id_width(str(width))
+
+
+def test_id_width_is_sized_before_anything_is_written(tmp_path):
+    """
+    未指定位数时按运行规模自动加宽；指定的位数容量不足时在解析参数阶段报错，不会生成到中途才失败
+    """
+    assert windows_generator.parse_args(["--page-count", "30"]).id_width == 7
+    assert windows_generator.parse_args(["--page-count", "100000", "--page-size", "1000"]).id_width == 9
+    assert windows_generator.parse_args(["--max-bytes", "1TB"]).id_width == 10
+    with pytest.raises(SystemExit):
+        windows_generator.parse_args(["--page-count", "9000", "--page-size", "1000", "--id-width", "7",
+                                      "--id-offset", "1", "--output-dir", str(tmp_path)])
+    assert not os.listdir(tmp_path)
+
+
+@pytest.mark.parametrize("extra", [[], ["--compress", "bgzf"], ["--zipf", "company=1.1"]])
+def test_output_is_identical_across_workers_and_pages(tmp_path, extra):
+    """
+    相同种子下，单进程、多进程运行和按页重建得到的页面逐字节一致
+    """
+    outputs = {}
+    for name, args in (("serial", ["--workers", "1"]), ("parallel", ["--workers", "3"]), ("rebuild", ["--pages", "2,4"])):
+        windows_generator.main(RUN_ARGS + extra + args + ["--output-dir", str(tmp_path / name)])
+        outputs[name] = read_pages(str(tmp_path / name))
+    assert len(outputs["serial"]) == 8
+    assert outputs["parallel"] == outputs["serial"]
+    assert outputs["rebuild"] == {path: data for path, data in outputs["serial"].items()
+                                  if os.path.basename(path).startswith(("page2", "page4"))}
+
+
+def test_checkpoint_resume_regenerates_only_unfinished_pages(tmp_path, monkeypatch):
+    """
+    运行在第3页中断后，以同一断点续跑只生成剩余的页，结果与一次完整运行逐字节一致
+    """
+    windows_generator.main(RUN_ARGS + ["--output-dir", str(tmp_path / "full")])
+    argv = RUN_ARGS + ["--output-dir", str(tmp_path / "resumed"), "--checkpoint", str(tmp_path / "run.ckpt")]
+    open_page_writer = windows_generator.open_page_writer
+    opened = []
+
+    def interrupted_writer(file_index, *args, **kwargs):
+        if file_index == 3:
+            raise KeyboardInterrupt
+        return open_page_writer(file_index, *args, **kwargs)
+
+    monkeypatch.setattr(windows_generator, "open_page_writer", interrupted_writer)
+    with pytest.raises(KeyboardInterrupt):
+        windows_generator.main(argv)
+
+    def recording_writer(file_index, *args, **kwargs):
+        opened.append(file_index)
+        return open_page_writer(file_index, *args, **kwargs)
+
+    monkeypatch.setattr(windows_generator, "open_page_writer", recording_writer)
+    windows_generator.main(argv)
+    assert opened == [3, 4]
+    assert read_pages(str(tmp_path / "resumed")) == read_pages(str(tmp_path / "full"))
+
+
+def test_shard_merge_matches_single_node_run():
+    """
+    分片生成并合并后，页面、分区清单中的页与画像都与单节点运行一致
+    """
+    with LocalWebHdfsServer() as server:
+        base = ["--hdfs-url", server.url] + RUN_ARGS + ["--profile"]
+        hdfs_generator.main(base + ["--hdfs-dir", "/single"])
+        for shard in (1, 2, 3):
+            hdfs_generator.main(base + ["--hdfs-dir", "/sharded", "--shard", str(shard), "--of", "3"])
+        hdfs_generator.main(["--hdfs-url", server.url, "--hdfs-dir", "/sharded", "--date", "20260101",
+                             "--merge-shards", "--of", "3"])
+
+        for page in range(1, 5):
+            assert server.files[f"/sharded/20260101/page{page}.json"] == server.files[f"/single/20260101/page{page}.json"]
+        assert (json.loads(server.files["/sharded/20260101/_profile.json"])
+                == json.loads(server.files["/single/20260101/_profile.json"]))
+        partition = json.loads(server.files["/sharded/_manifest.json"])["partitions"]["20260101"]
+        assert partition["pages"] == [1, 2, 3, 4]
+        assert partition["page_count"] == 4
+        assert partition["records"] == 4 * 1500
@@ -0,0 +1,105 @@
+"""
+模块名称：test_hdfs_uploader.py
+模块职责：并发上传器测试：注入写入错误时按退避重试并最终写入完整的页、重试耗尽与创建客户端失败的页记入失败列表且不阻塞、
+         超出内存上限的页面溢写后上传内容不变、失败页汇总报告给出重建命令
+作者：D.C.Y.
+创建时间：2026/10/19 06:31:50
+最后修改时间：2026/10/19 06:31:50
+"""
+import pytest
+
+import generate_data_to_upload_to_hdfs as hdfs_generator
+from hdfs_uploader import ConcurrentUploader
+from local_webhdfs import LocalWebHdfsServer
+from run_metrics import RunMetrics
+
+PAGES = {file_index: [f"page{file_index}-chunk{i}\n".encode("utf-8") for i in range(3)] for file_index in range(1, 9)}
+
+
+def submit_pages(uploader: ConcurrentUploader):
+    """
+    提交全部测试页面
+    :param uploader: 并发上传器
+    """
+    for file_index, chunks in PAGES.items():
+        uploader.submit(file_index, f"/data/page{file_index}.json", chunks)
+
+
+def test_injected_errors_are_retried_until_every_page_lands():
+    """
+    部分写入请求失败时逐页重试，最终每页内容完整、没有失败页，也不留下临时文件
+    """
+    retries = []
+    with LocalWebHdfsServer(error_rate=0.3, error_seed=7) as server:
+        with ConcurrentUploader(lambda: hdfs_generator.create_hdfs_client(server.url), concurrency=3,
+                                max_retries=20, backoff=0.0,
+                                on_retry=lambda file_index, attempt, e: retries.append(file_index)) as uploader:
+            submit_pages(uploader)
+        assert server.injected_errors > 0
+        assert len(retries) == server.injected_errors
+        assert not uploader.failed_pages
+        assert uploader.uploaded_pages == len(PAGES)
+        assert server.files == {f"/data/page{file_index}.json": b"".join(chunks)
+                                for file_index, chunks in PAGES.items()}
+
+
+def test_exhausted_retries_are_reported_as_failed_pages():
+    """
+    每次写入都失败时，各页重试到上限后记入失败列表，指标中记录重试次数与失败页数
+    """
+    metrics = RunMetrics()
+    with LocalWebHdfsServer(error_rate=1.0) as server:
+        uploader = ConcurrentUploader(lambda: hdfs_generator.create_hdfs_client(server.url), concurrency=2,
+                                      max_retries=2, backoff=0.0, metrics=metrics)
+        submit_pages(uploader)
+        failed = uploader.close()
+        assert sorted(failed) == sorted(PAGES)
+        assert server.injected_errors == 3 * len(PAGES)
+        assert not server.file_sizes
+    assert uploader.uploaded_pages == 0
+    assert metrics.upload_retries == 2 * len(PAGES)
+    assert metrics.upload_failures == len(PAGES)
+
+
+def test_client_factory_failure_does_not_block_close():
+    """
+    创建客户端失败时该页记入失败列表，上传线程继续取出后续页面，submit 与 close 都能返回
+    """
+    def broken_factory():
+        raise ConnectionError("namenode unreachable")
+
+    uploader = ConcurrentUploader(broken_factory, concurrency=2, queue_size=1)
+    submit_pages(uploader)
+    failed = uploader.close()
+    assert sorted(failed) == sorted(PAGES)
+    assert all(isinstance(error, ConnectionError) for error in failed.values())
+
+
+def test_spooled_pages_upload_unchanged():
+    """
+    经 open_page 缓冲且超过内存上限的页面溢写到临时文件，上传后的内容与写入的数据块一致
+    """
+    with LocalWebHdfsServer() as server:
+        with ConcurrentUploader(lambda: hdfs_generator.create_hdfs_client(server.url), concurrency=2,
+                                spool_size=16) as uploader:
+            for file_index, chunks in PAGES.items():
+                with uploader.open_page(file_index, f"/data/page{file_index}.json") as page:
+                    for chunk in chunks:
+                        page.write_encoded(chunk)
+                    assert page.chunks.nbytes == sum(len(chunk) for chunk in chunks)
+        assert server.files == {f"/data/page{file_index}.json": b"".join(chunks)
+                                for file_index, chunks in PAGES.items()}
+
+
+def test_failed_pages_are_reported_with_rebuild_command(capsys):
+    """
+    整个运行中上传失败的页以非零状态退出，并输出失败页与按页重建的命令
+    """
+    with LocalWebHdfsServer(error_rate=1.0) as server:
+        with pytest.raises(SystemExit) as exit_info:
+            hdfs_generator.main(["--hdfs-url", server.url, "--seed", "42", "--date", "20260101",
+                                 "--page-count", "2", "--page-size", "50", "--retries", "1", "--retry-backoff", "0"])
+    assert exit_info.value.code == 1
+    out = capsys.readouterr().out
+    assert "以下 2 个页面重试后仍上传失败" in out
+    assert "可使用 --seed 42 --date 20260101 --page-size 50 --pages 1,2 重新生成并上传这些页面" in out
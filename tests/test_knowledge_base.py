@@ -0,0 +1,77 @@
+"""
+模块名称：test_knowledge_base.py
+模块职责：外部知识库测试：导出内置目录后编译、内存映射打开的往返结果与内置目录一致，大表按需解码，
+         传给工作进程时只序列化路径，编译失败时不影响已有的知识库文件
+作者：D.C.Y.
+创建时间：2026/10/19 05:44:21
+最后修改时间：2026/10/19 05:44:21
+"""
+import pickle
+from datetime import date
+
+import numpy as np
+import pytest
+
+import knowledge_base
+from batch_generation import generate_batch_records
+from core_logic import compute_salary_bounds
+from data_definitions import BIGDATA_COMPANIES, INDUSTRY_FIELDS, WELFARE_OPTIONS
+from data_generation import generate_short_name
+from record_schema import JOB_TYPES
+
+
+def test_compiled_catalogs_round_trip(tmp_path):
+    """
+    内置目录导出、编译并内存映射打开后，各表取值与内置目录一致，生成结果与内置知识库逐条相同
+    """
+    knowledge_base.export_builtin_catalogs(str(tmp_path / "catalogs"))
+    path = str(tmp_path / "catalog.kb")
+    counts, _ = knowledge_base.compile_knowledge_base(str(tmp_path / "catalogs"), path)
+    kb = knowledge_base.open_knowledge_base(path)
+    assert counts == kb.counts
+    assert list(kb.companies) == BIGDATA_COMPANIES
+    assert list(kb.industries) == INDUSTRY_FIELDS
+    assert list(kb.welfare) == WELFARE_OPTIONS
+    assert list(kb.short_names) == [generate_short_name(company) for company in BIGDATA_COMPANIES]
+    for i in range(0, len(BIGDATA_COMPANIES), 7):
+        for j, job_type in enumerate(JOB_TYPES):
+            assert tuple(kb.salary_bounds[i, j]) == compute_salary_bounds(job_type, BIGDATA_COMPANIES[i])
+
+    reference, position_ids = date(2026, 1, 1), list(range(1000000, 1000500))
+    assert (generate_batch_records(500, np.random.default_rng(9), position_ids, reference, knowledge_base=kb)
+            == generate_batch_records(500, np.random.default_rng(9), position_ids, reference))
+    assert pickle.loads(pickle.dumps(kb)) is kb
+    assert len(pickle.dumps(kb)) < 200 + len(path)
+
+
+def test_large_tables_decode_on_demand(tmp_path):
+    """
+    超过物化上限的大表不整体解码，按下标批量取值与逐个取值一致
+    """
+    companies = [f"第{i}号数据科技（杭州）有限公司" for i in range(knowledge_base.MATERIALIZE_LIMIT * 2)]
+    source = tmp_path / "catalogs"
+    source.mkdir()
+    (source / "companies.txt").write_text("".join(f"{company}\n" for company in companies), encoding="utf-8")
+    path = str(tmp_path / "large.kb")
+    knowledge_base.compile_knowledge_base(str(source), path)
+    kb = knowledge_base.open_knowledge_base(path)
+    indices = np.random.default_rng(1).integers(0, len(companies), 1000)
+    assert kb.companies.take(indices) == [companies[i] for i in indices]
+    assert kb.companies._values is None
+    records = generate_batch_records(300, np.random.default_rng(2), knowledge_base=kb)
+    assert {record["companyFullName"] for record in records} <= set(companies)
+
+
+def test_failed_compile_keeps_the_previous_file(tmp_path):
+    """
+    目录不合法时编译失败，不留下临时文件，已有的知识库文件保持不变
+    """
+    source = tmp_path / "catalogs"
+    source.mkdir()
+    path = tmp_path / "catalog.kb"
+    path.write_bytes(b"previous")
+    (source / "welfare.txt").write_text("五险一金\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        knowledge_base.compile_knowledge_base(str(source), str(path))
+    assert path.read_bytes() == b"previous"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["catalog.kb", "catalogs"]
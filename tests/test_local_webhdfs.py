@@ -0,0 +1,63 @@
+"""
+模块名称：test_local_webhdfs.py
+模块职责：本地 WebHDFS 替身服务与上传压测测试：客户端常用接口往返一致、逐页串行上传基线写入正确的页并在失败时不留下文件、
+         压测脚本输出串行基线与各并发度的结果
+作者：D.C.Y.
+创建时间：2026/10/19 05:24:37
+最后修改时间：2026/10/19 05:24:37
+"""
+import json
+
+import benchmark_hdfs_upload
+import generate_data_to_upload_to_hdfs as hdfs_generator
+from local_webhdfs import LocalWebHdfsServer
+
+
+def test_client_round_trip():
+    """
+    通过 hdfs.InsecureClient 写入、改名、列目录、读取和删除文件，结果与替身服务中保存的内容一致
+    """
+    with LocalWebHdfsServer() as server:
+        client = hdfs_generator.create_hdfs_client(server.url)
+        client.makedirs("/data/a")
+        with client.write("/data/a/file.tmp") as writer:
+            writer.write(b"hello")
+        client.rename("/data/a/file.tmp", "/data/a/file")
+        assert client.list("/data/a") == ["file"]
+        assert client.status("/data/a/file")["length"] == 5
+        assert client.status("/data/a/missing", strict=False) is None
+        with client.read("/data/a/file") as reader:
+            assert reader.read() == b"hello"
+        assert server.files == {"/data/a/file": b"hello"}
+        assert client.delete("/data", recursive=True)
+        assert not server.files
+
+
+def test_serial_upload_baseline_writes_the_page(capsys):
+    """
+    upload_data_to_hdfs 将校验、编码后的整页写到当天分区；写入失败时只输出提示，不留下页面或临时文件
+    """
+    dataset = hdfs_generator.generate_batch_data(20)
+    with LocalWebHdfsServer() as server:
+        client = hdfs_generator.create_hdfs_client(server.url)
+        hdfs_generator.upload_data_to_hdfs(1, client, dataset)
+        assert list(server.files) == [hdfs_generator.hdfs_page_path(1)]
+        payload = server.files[hdfs_generator.hdfs_page_path(1)].decode("utf-8")
+        assert json.loads(f"[{payload.rstrip(',')}]") == dataset
+
+    with LocalWebHdfsServer(error_rate=1.0) as server:
+        hdfs_generator.upload_data_to_hdfs(1, hdfs_generator.create_hdfs_client(server.url), dataset)
+        assert not server.file_sizes
+        assert server.injected_errors == 1
+    assert f"上传 {hdfs_generator.hdfs_page_path(1)} 到 HDFS 失败" in capsys.readouterr().out
+
+
+def test_benchmark_reports_every_mode(capsys):
+    """
+    压测脚本依次输出逐页串行基线和各并发度的结果
+    """
+    benchmark_hdfs_upload.main(["--page-count", "2", "--page-size", "100", "--latency", "0",
+                                "--concurrency", "1,2"])
+    out = capsys.readouterr().out
+    assert "逐页串行 upload_data_to_hdfs" in out
+    assert "并发上传 ×1" in out and "并发上传 ×2" in out
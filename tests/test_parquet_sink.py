@@ -0,0 +1,76 @@
+"""
+模块名称：test_parquet_sink.py
+模块职责：Parquet列式输出测试：文件结构与 JOB_RECORD_SCHEMA 一致、嵌套字段以列表列往返不变、低基数字段使用字典编码、
+         行组按行数切分，以及命令行 --format parquet 输出与 JSON 输出的记录一致
+作者：D.C.Y.
+创建时间：2026/10/19 06:35:12
+最后修改时间：2026/10/19 06:35:12
+"""
+import json
+import os
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+import generate_data_to_windows as windows_generator
+from batch_generation import generate_batch_records
+from parquet_sink import DICTIONARY_COLUMNS, JOB_RECORD_SCHEMA, ParquetSink
+from sinks import LocalFileSink
+
+RUN_ARGS = ["--seed", "42", "--date", "20260101", "--page-count", "1", "--page-size", "300"]
+
+
+def project(row: dict, record: dict) -> dict:
+    """
+    取出 Parquet 行中与原记录对应的字段（记录未出现的动态技术标签列读回为空值）
+    :param row: Parquet 读回的一行
+    :param record: 原职位记录
+    :return: 只含原记录字段的行
+    """
+    assert all(row[name] is None for name in row if name not in record)
+    return {name: row[name] for name in record}
+
+
+def test_schema_list_columns_and_dictionary_encoding(tmp_path):
+    """
+    写出的文件结构与 JOB_RECORD_SCHEMA 一致，列表列与嵌套要求往返不变，仅指定的低基数字段使用字典编码，行组按行数切分
+    """
+    records = generate_batch_records(250, position_ids=list(range(1000000, 1000250)))
+    path = str(tmp_path / "page1.parquet")
+    with ParquetSink(LocalFileSink(path, atomic=True), row_group_size=100) as sink:
+        sink.write_records(records[:120])
+        sink.write_records(records[120:])
+    assert sink.rows_written == len(records)
+
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.schema_arrow == JOB_RECORD_SCHEMA
+    assert [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)] == [100, 100, 50]
+    rows = parquet_file.read().to_pylist()
+    assert [project(row, record) for row, record in zip(rows, records)] == records
+    business_areas = [row["businessArea"] for row in rows if row["businessArea"] is not None]
+    requirements = [requirement for row in rows for requirement in row["requirements"] or ()]
+    assert business_areas and all(isinstance(areas, list) for areas in business_areas)
+    assert requirements and all(set(requirement) == {"一级要求", "二级要求"} for requirement in requirements)
+
+    row_group = parquet_file.metadata.row_group(0)
+    for index in range(row_group.num_columns):
+        column = row_group.column(index)
+        dictionary_encoded = column.dictionary_page_offset is not None
+        assert dictionary_encoded == (column.path_in_schema in DICTIONARY_COLUMNS), column.path_in_schema
+
+
+def test_cli_parquet_output_matches_json_output(tmp_path):
+    """
+    相同种子下 --format parquet 输出的记录与默认 JSON 输出逐条一致
+    """
+    windows_generator.main(RUN_ARGS + ["--output-dir", str(tmp_path / "json")])
+    windows_generator.main(RUN_ARGS + ["--output-dir", str(tmp_path / "parquet"), "--format", "parquet",
+                                       "--row-group-size", "128"])
+    with open(tmp_path / "json" / "JobData-Json" / "page1.json", encoding="utf-8") as f:
+        records = json.loads(f"[{f.read().rstrip(',')}]")
+    assert os.listdir(tmp_path / "parquet" / "JobData-Parquet") == ["page1.parquet"]
+    parquet_file = pq.ParquetFile(str(tmp_path / "parquet" / "JobData-Parquet" / "page1.parquet"))
+    assert parquet_file.num_row_groups == 3
+    assert parquet_file.metadata.num_rows == len(records) == 300
+    assert [project(row, record) for row, record in zip(parquet_file.read().to_pylist(), records)] == records
@@ -0,0 +1,89 @@
+"""
+模块名称：test_partition_manifest.py
+模块职责：增量追加与分区清单测试：追加新日期不改动已有分区、各分区职位ID互不重复，按页重建与首次生成一致且校验页范围和格式，
+         清单（含分片清单）在替换中断后可从临时文件恢复
+作者：D.C.Y.
+创建时间：2026/10/19 06:16:52
+最后修改时间：2026/10/19 06:16:52
+"""
+import json
+
+import pytest
+
+import generate_data_to_upload_to_hdfs as hdfs_generator
+from local_webhdfs import LocalWebHdfsServer
+from partition_manifest import MANIFEST_NAME, PartitionManifest
+from shard_plan import load_shard_manifests, shard_manifest_name
+from sinks import TEMP_SUFFIX
+
+APPEND_ARGS = ["--seed", "11", "--page-count", "2", "--page-size", "300", "--append"]
+
+
+def position_ids(payload: bytes) -> list:
+    """
+    提取一页中全部记录的职位ID
+    :param payload: 页面内容
+    :return: 职位ID列表
+    """
+    return [record["positionId"] for record in json.loads(f"[{payload.decode('utf-8').rstrip(',')}]")]
+
+
+def test_append_keeps_existing_partitions():
+    """
+    先追加两天、再追加第三天：已有分区的页面不变，清单按天分配互不重叠的职位ID区间，已存在的分区被跳过
+    """
+    with LocalWebHdfsServer() as server:
+        base = ["--hdfs-url", server.url, "--hdfs-dir", "/jobs"] + APPEND_ARGS
+        hdfs_generator.main(base + ["--date", "20260102", "--days", "2"])
+        before = dict(server.files)
+        hdfs_generator.main(base + ["--date", "20260103", "--days", "2"])
+        assert all(server.files[path] == data for path, data in before.items() if "/page" in path)
+
+        manifest = json.loads(server.files[f"/jobs/{MANIFEST_NAME}"])
+        partitions = manifest["partitions"]
+        assert sorted(partitions) == ["20260101", "20260102", "20260103"]
+        assert [partitions[name]["id_offset"] for name in sorted(partitions)] == [0, 600, 1200]
+        assert manifest["next_id_offset"] == 1800
+        assert all(partition["pages"] == [1, 2] and partition["page_count"] == 2 for partition in partitions.values())
+        ids = [position_id for path, data in server.files.items() if "/page" in path for position_id in position_ids(data)]
+        assert len(ids) == len(set(ids)) == 1800
+
+
+def test_page_rebuild_matches_and_is_checked():
+    """
+    按页重建已有分区的页面与首次生成逐字节一致；超出该分区页数或格式不同的重建请求被拒绝
+    """
+    with LocalWebHdfsServer() as server:
+        base = ["--hdfs-url", server.url, "--hdfs-dir", "/jobs", "--date", "20260101"] + APPEND_ARGS
+        hdfs_generator.main(base)
+        original = server.files["/jobs/20260101/page2.json"]
+        del server.files["/jobs/20260101/page2.json"]
+        del server.file_sizes["/jobs/20260101/page2.json"]
+        hdfs_generator.main(base + ["--pages", "2"])
+        assert server.files["/jobs/20260101/page2.json"] == original
+        for extra in (["--pages", "3"], ["--pages", "1", "--compress", "bgzf"]):
+            with pytest.raises(SystemExit):
+                hdfs_generator.main(base + extra)
+        assert sorted(path for path in server.files if "/page" in path) == ["/jobs/20260101/page1.json",
+                                                                             "/jobs/20260101/page2.json"]
+
+
+def test_manifests_recover_from_interrupted_replace():
+    """
+    替换清单时在删除旧文件后、改名前中断：分区清单和分片清单都从临时文件读回最新内容
+    """
+    with LocalWebHdfsServer() as server:
+        client = hdfs_generator.create_hdfs_client(server.url)
+        manifest = PartitionManifest.load(client, "/jobs", run_key=5)
+        manifest.reserve_ids(100)
+        manifest.save(client)
+        client.rename(manifest.path, manifest.path + TEMP_SUFFIX)
+        assert PartitionManifest.load(client, "/jobs").next_id_offset == 100
+
+        hdfs_generator.main(["--hdfs-url", server.url, "--hdfs-dir", "/jobs", "--seed", "1", "--date", "20260101",
+                             "--page-count", "2", "--page-size", "100", "--shard", "1", "--of", "2"])
+        path = f"/jobs/20260101/{shard_manifest_name(1, 2)}"
+        client.rename(path, path + TEMP_SUFFIX)
+        found, missing = load_shard_manifests(client, "/jobs/20260101", 2)
+        assert sorted(found) == [1] and missing == [2]
+        assert found[1]["files"] == [1]
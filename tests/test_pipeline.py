@@ -0,0 +1,75 @@
+"""
+模块名称：test_pipeline.py
+模块职责：流式流水线测试：页面按顺序完整写出，打开或关闭失败的页只触发失败回调、不计为完成，断点续跑时重新生成失败的页
+作者：D.C.Y.
+创建时间：2026/10/19 05:58:34
+最后修改时间：2026/10/19 05:58:34
+"""
+import generate_data_to_windows as windows_generator
+from pipeline import encode_data, run_pipeline
+from sinks import FanOutWriter, Sink
+
+
+class MemorySink(Sink):
+    """
+    内存输出目标，可指定关闭时失败
+    """
+
+    def __init__(self, pages: dict, page_index: int, fail_on_close: bool = False):
+        self.pages, self.page_index, self.fail_on_close = pages, page_index, fail_on_close
+        self.chunks = []
+
+    def write(self, chunk: bytes):
+        self.chunks.append(chunk)
+
+    def close(self):
+        if self.fail_on_close:
+            raise OSError("close failed")
+        self.pages[self.page_index] = b"".join(self.chunks)
+
+
+def test_failed_pages_are_not_reported_done():
+    """
+    第2页打开失败、第3页关闭失败：只有第1、4页触发完成回调并写出完整内容，失败回调按页码顺序触发
+    """
+    pages, done, errors = {}, [], []
+
+    def open_page(page_index: int) -> FanOutWriter:
+        if page_index == 2:
+            raise OSError("open failed")
+        return FanOutWriter([MemorySink(pages, page_index, fail_on_close=page_index == 3)], chunk_size=1024)
+
+    failed = run_pipeline(range(1, 5), 600, open_page, encode_data, seed=1, chunk_size=250,
+                          on_page_done=done.append, on_page_error=lambda page, e: errors.append((page, str(e))))
+    assert failed == [2, 3]
+    assert done == [1, 4]
+    assert errors == [(2, "open failed"), (3, "close failed")]
+    assert sorted(pages) == [1, 4]
+    assert all(payload.count(b'"positionId"') == 600 for payload in pages.values())
+
+
+def test_resume_regenerates_failed_pages(tmp_path, monkeypatch):
+    """
+    某页写入失败时断点不记录该页，以同一断点续跑只重新生成这一页
+    """
+    argv = ["--seed", "1", "--date", "20260101", "--page-count", "3", "--page-size", "200",
+            "--output-dir", str(tmp_path), "--checkpoint", str(tmp_path / "run.ckpt")]
+    open_page_writer = windows_generator.open_page_writer
+    opened = []
+
+    def failing_writer(file_index, *args, **kwargs):
+        if file_index == 2:
+            raise OSError("disk full")
+        return open_page_writer(file_index, *args, **kwargs)
+
+    def recording_writer(file_index, *args, **kwargs):
+        opened.append(file_index)
+        return open_page_writer(file_index, *args, **kwargs)
+
+    monkeypatch.setattr(windows_generator, "open_page_writer", failing_writer)
+    windows_generator.main(argv)
+    assert not (tmp_path / "JobData" / "page2").exists()
+    monkeypatch.setattr(windows_generator, "open_page_writer", recording_writer)
+    windows_generator.main(argv)
+    assert opened == [2]
+    assert (tmp_path / "JobData" / "page2").exists()
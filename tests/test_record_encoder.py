@@ -0,0 +1,81 @@
+"""
+模块名称：test_record_encoder.py
+模块职责：记录编码器测试：输出与 json.dumps 逐字节一致（含字段顺序不同、类型意外的记录），缓存满后不再加入新取值且保留已有取值，
+         目录字段按实际使用的知识库预热
+作者：D.C.Y.
+创建时间：2026/10/19 06:07:45
+最后修改时间：2026/10/19 06:07:45
+"""
+import json
+
+import numpy as np
+
+import data_profile
+import knowledge_base
+import record_encoder
+from batch_generation import generate_batch_records
+from data_generation import generate_job_record
+from record_encoder import RecordEncoder, encode_json
+
+
+def dumps(record: dict) -> str:
+    """
+    参照实现：标准库 JSON 编码
+    :param record: 职位记录
+    :return: 紧凑JSON字符串
+    """
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def test_output_matches_json_dumps():
+    """
+    批量生成、逐条生成和结构异常的记录，编码结果均与 json.dumps 逐字节一致
+    """
+    records = generate_batch_records(3000, np.random.default_rng(5)) + [generate_job_record() for _ in range(200)]
+    odd = dict(records[0])
+    odd["salary"] = 12.5
+    reordered = dict(reversed(list(records[1].items())))
+    escaped = dict(records[2], companyFullName='引号"与\\反斜杠\n换行', businessArea=["a", None])
+    nested = dict(records[3], welfare={"五险一金": True})
+    for record in records + [odd, reordered, escaped, nested]:
+        assert encode_json(record) == dumps(record)
+
+
+def test_full_caches_keep_their_entries(monkeypatch):
+    """
+    缓存达到上限后不再加入新取值，已缓存的取值保留，未缓存的取值照常编码
+    """
+    monkeypatch.setattr(record_encoder, "MAX_CACHED_VALUES", 4)
+    encoder = RecordEncoder(enum_values={"companyType": ["a", "b", "c"]})
+    cache = encoder._caches["companyType"]
+    record = generate_batch_records(1, np.random.default_rng(1))[0]
+    for value in ("d", "e", "f"):
+        record["companyType"] = value
+        assert encoder.encode(record) == dumps(record)
+    assert sorted(cache) == ["a", "b", "c", "d"]
+
+    monkeypatch.setattr(data_profile, "MAX_CACHED_VALUES", 2)
+    lookup = data_profile._LookupCache(len)
+    assert [lookup[value] for value in ("x", "yy", "zzz", "x")] == [1, 2, 3, 1]
+    assert sorted(lookup) == ["x", "yy"]
+
+
+def test_catalogs_are_warmed_from_the_active_knowledge_base(tmp_path):
+    """
+    预热使用传入的知识库目录，而不是内置公司库；同一知识库只预热一次
+    """
+    source = tmp_path / "catalogs"
+    source.mkdir()
+    (source / "companies.txt").write_text("预热测试（杭州）数据有限公司\n", encoding="utf-8")
+    path = str(tmp_path / "catalog.kb")
+    knowledge_base.compile_knowledge_base(str(source), path)
+    kb = knowledge_base.open_knowledge_base(path)
+
+    encoder = RecordEncoder()
+    encoder.warm_catalogs(kb)
+    assert list(encoder._caches["companyFullName"]) == ["预热测试（杭州）数据有限公司"]
+    assert set(encoder._caches["workAddress"]) == set(kb.addresses)
+    assert set(kb.welfare) <= set(encoder._strings)
+    encoder._caches["companyFullName"].clear()
+    encoder.warm_catalogs(kb)
+    assert not encoder._caches["companyFullName"]
@@ -0,0 +1,84 @@
+"""
+模块名称：test_record_schema.py
+模块职责：职位记录结构测试：逐条生成的记录按 BASE_TEMPLATE 字段顺序一次构造、常量片段与职位类型对应、
+         可变字段不在记录之间共享、紧凑行形式与记录字典往返一致，以及批量生成的行与记录逐条相同
+作者：D.C.Y.
+创建时间：2026/10/19 06:52:18
+最后修改时间：2026/10/19 06:52:18
+"""
+import numpy as np
+
+import data_generation
+from batch_generation import generate_batch_records, generate_batch_rows
+from data_definitions import BASE_TEMPLATE
+from record_schema import JOB_TYPE_PIECES, JOB_TYPES, RECORD_FIELDS, JobRow
+
+
+def generate_records(seed: int, count: int) -> list:
+    """
+    以固定种子逐条生成职位记录
+    :param seed: 随机种子
+    :param count: 记录数
+    :return: 职位记录列表
+    """
+    data_generation.set_seed(seed)
+    return [data_generation.generate_job_record() for _ in range(count)]
+
+
+def test_records_follow_template_order_and_job_type_pieces():
+    """
+    记录字段按 BASE_TEMPLATE 顺序排列（技术标签在最后），职位名称、描述开头与技术标签前缀取自该职位类型的常量片段
+    """
+    records = generate_records(3, 300)
+    assert RECORD_FIELDS == tuple(BASE_TEMPLATE) + ("positionLables",)
+    assert {record["firstType"] for record in records} == set(JOB_TYPES)
+    for record in records:
+        assert tuple(record) == RECORD_FIELDS[:len(record)]
+        pieces = JOB_TYPE_PIECES[record["firstType"]]
+        assert record["positionName"] == pieces.position_name
+        assert record["jobDescription"].startswith(pieces.description_prefix)
+        assert record["requirements"] in (None, pieces.requirements)
+        if "positionLables" in record:
+            assert tuple(record["positionLables"][:len(pieces.label_prefix)]) == pieces.label_prefix
+            assert len(record["positionLables"]) == len(pieces.label_prefix) + 5
+
+
+def test_seeded_records_are_reproducible_and_do_not_share_lists():
+    """
+    相同种子生成的记录相同；修改一条记录的列表字段不影响其他记录和常量片段
+    """
+    records = generate_records(5, 200)
+    assert generate_records(5, 200) == records
+    prefixes = {job_type: pieces.label_prefix for job_type, pieces in JOB_TYPE_PIECES.items()}
+    snapshot = generate_records(5, 200)
+    for record in records:
+        for field in ("businessArea", "welfare", "applicationRequirements", "positionLables"):
+            if record.get(field) is not None:
+                record[field].append("mutated")
+    assert all(record.get(field) is None or "mutated" not in record[field]
+               for record in snapshot for field in ("businessArea", "welfare", "applicationRequirements", "positionLables"))
+    assert {job_type: pieces.label_prefix for job_type, pieces in JOB_TYPE_PIECES.items()} == prefixes
+    assert all("mutated" not in pieces.application_requirements for pieces in JOB_TYPE_PIECES.values())
+
+
+def test_job_row_round_trip():
+    """
+    紧凑行与记录字典互相转换不丢失字段，没有技术标签的记录转换后仍不含 positionLables
+    """
+    records = generate_records(7, 200)
+    assert any("positionLables" not in record for record in records)
+    for record in records:
+        row = JobRow.from_record(record)
+        assert row.to_record() == record
+        assert list(row.to_record()) == list(record)
+
+
+def test_batch_rows_match_batch_records():
+    """
+    相同随机数生成器状态下，批量生成的紧凑行转换后与批量生成的记录逐条相同
+    """
+    position_ids = list(range(2000000, 2000500))
+    records = generate_batch_records(500, rng=np.random.default_rng(11), position_ids=position_ids)
+    rows = generate_batch_rows(500, rng=np.random.default_rng(11), position_ids=position_ids)
+    assert all(isinstance(row, JobRow) for row in rows)
+    assert [row.to_record() for row in rows] == records
@@ -0,0 +1,95 @@
+"""
+模块名称：test_record_validator.py
+模块职责：记录校验器测试：全量、抽样与关闭三种级别检查的记录、丢弃缺少必填字段的记录、就地修复薪资格式、
+         校验计数计入运行指标，以及命令行各校验级别下的指标计数
+作者：D.C.Y.
+创建时间：2026/10/19 06:56:34
+最后修改时间：2026/10/19 06:56:34
+"""
+import json
+
+import pytest
+
+import generate_data_to_windows as windows_generator
+from record_validator import RecordValidator
+from run_metrics import take_chunk_stats
+
+RUN_ARGS = ["--seed", "42", "--date", "20260101", "--page-count", "2", "--page-size", "300"]  # 每页一个数据块
+
+
+def make_records(count: int) -> list:
+    """
+    构造测试记录：下标为 3 的倍数的记录缺少职位名称，下标为 5 的倍数的记录薪资格式错误
+    :param count: 记录数
+    :return: 职位记录列表
+    """
+    return [{"positionId": 1000000 + index, "companyFullName": "测试公司",
+             "positionName": "" if index % 3 == 0 else "数据工程师",
+             "salary": "面议" if index % 5 == 0 else "20k-30k"} for index in range(count)]
+
+
+def test_full_level_checks_every_record():
+    """
+    全量校验丢弃所有缺少必填字段的记录，就地修复其余记录中格式错误的薪资，并记录检查、丢弃和修复的条数
+    """
+    take_chunk_stats()
+    records = make_records(30)
+    validated = RecordValidator("full", default_salary="10k-20k").validate(records)
+    assert [record["positionId"] - 1000000 for record in validated] == [index for index in range(30) if index % 3]
+    assert all(record["salary"] == ("10k-20k" if (record["positionId"] - 1000000) % 5 == 0 else "20k-30k")
+               for record in validated)
+    assert records[5]["salary"] == "10k-20k"  # 修复就地进行
+    assert take_chunk_stats() == {"validated": 30, "dropped": 10, "fixed": 4}
+
+
+def test_sampled_level_checks_every_nth_record():
+    """
+    抽样校验只检查下标为 0、N、2N…… 的记录，其余记录原样保留
+    """
+    take_chunk_stats()
+    records = make_records(30)
+    validated = RecordValidator("sampled", sample_every=5).validate(records)
+    assert [record["positionId"] - 1000000 for record in validated] == [index for index in range(30)
+                                                                       if index not in (0, 15)]
+    assert [record["salary"] for record in validated if record["salary"] != "20k-30k"] == ["15k-25k"] * 4
+    assert take_chunk_stats() == {"validated": 6, "dropped": 2, "fixed": 4}
+
+
+def test_off_level_and_clean_batches_return_the_input_list():
+    """
+    关闭校验时不检查也不计数；没有记录被丢弃时返回输入列表本身
+    """
+    take_chunk_stats()
+    records = make_records(30)
+    assert RecordValidator("off").validate(records) is records
+    assert take_chunk_stats() == {}
+    clean = [record for record in make_records(30) if record["positionName"] and record["salary"] != "面议"]
+    assert RecordValidator("full").validate(clean) is clean
+    assert take_chunk_stats() == {"validated": len(clean)}
+
+
+def test_invalid_configuration_is_rejected():
+    """
+    未知级别、非正抽样间隔以及模板中缺少校验字段时构造失败
+    """
+    with pytest.raises(ValueError):
+        RecordValidator("strict")
+    with pytest.raises(ValueError):
+        RecordValidator("sampled", sample_every=0)
+    with pytest.raises(ValueError):
+        RecordValidator(template={"positionId": None})
+
+
+@pytest.mark.parametrize("level, validated", [("full", 600), ("sampled", 2 * 2), ("off", 0)])
+def test_cli_validation_levels_report_counts(tmp_path, level, validated):
+    """
+    命令行各校验级别导出的检查条数：全量为全部记录，抽样为每个数据块每 N 条一条，关闭为 0
+    """
+    metrics_file = tmp_path / "metrics.jsonl"
+    windows_generator.main(RUN_ARGS + ["--output-dir", str(tmp_path / "out"), "--validation", level,
+                                       "--validation-sample", "150", "--metrics-file", str(metrics_file)])
+    with open(metrics_file, encoding="utf-8") as f:
+        snapshot = json.loads(f.readline())
+    assert snapshot["records_generated"] == 600
+    assert snapshot["records_validated"] == validated
+    assert snapshot["records_dropped"] == 0
@@ -0,0 +1,65 @@
+"""
+模块名称：test_region_resolver.py
+模块职责：地区解析测试：关键词自动机与逐个子串判断的结果一致、编译知识库时报告未能解析出地区的公司
+作者：D.C.Y.
+创建时间：2026/10/19 05:11:40
+最后修改时间：2026/10/19 05:11:40
+"""
+import random
+
+import knowledge_base
+from core_logic import _CITY_REGIONS, _GIANT_KEYWORDS, company_region, register_companies
+from data_definitions import BIGDATA_COMPANIES
+from region_resolver import KeywordMatcher
+
+
+def linear_first_match(keywords, text: str) -> int:
+    """
+    按顺序逐个判断关键词是否出现在文本中（自动机的参照实现）
+    :param keywords: 关键词列表（顺序即优先级）
+    :param text: 待匹配文本
+    :return: 首个出现的关键词下标，未匹配返回 -1
+    """
+    return next((index for index, keyword in enumerate(keywords) if keyword in text), -1)
+
+
+def test_matcher_agrees_with_linear_scan():
+    """
+    随机关键词（含互为前缀、后缀和重叠的关键词）与随机文本上，自动机的结果与逐个判断一致
+    """
+    rng = random.Random(6)
+    alphabet = "abcd"
+    for _ in range(200):
+        keywords = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 12))]
+        matcher = KeywordMatcher(keywords)
+        for _ in range(20):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+            assert matcher.first_match(text) == linear_first_match(keywords, text)
+
+
+def test_region_keywords_agree_with_linear_scan():
+    """
+    内置公司库上，地区关键词自动机与逐个判断巨头关键词、城市名称的结果一致
+    """
+    keywords = list(_GIANT_KEYWORDS) + [city for city, _, _ in _CITY_REGIONS]
+    matcher = KeywordMatcher(keywords)
+    for company in BIGDATA_COMPANIES + ["无名科技有限公司", "上海阿里云计算有限公司"]:
+        assert matcher.first_match(company) == linear_first_match(keywords, company)
+    assert company_region("上海阿里云计算有限公司") == "巨头"
+    assert company_region("无名科技有限公司") == "其他"
+
+
+def test_compile_reports_unresolved_companies(tmp_path, capsys):
+    """
+    编译知识库时返回并列出未能解析出地区的公司，可解析的公司不在其中
+    """
+    assert register_companies(["深圳某某数据有限公司", "无名科技有限公司"]) == ["无名科技有限公司"]
+    source = tmp_path / "catalogs"
+    source.mkdir()
+    (source / "companies.txt").write_text("杭州某某数据有限公司\n无名科技有限公司\n某某网络有限公司\n", encoding="utf-8")
+    counts, unresolved = knowledge_base.compile_knowledge_base(str(source), str(tmp_path / "a.kb"))
+    assert counts["companies"] == 3
+    assert unresolved == ["无名科技有限公司", "某某网络有限公司"]
+
+    knowledge_base.main([str(source), str(tmp_path / "b.kb")])
+    assert "无名科技有限公司、某某网络有限公司" in capsys.readouterr().out
@@ -0,0 +1,79 @@
+"""
+模块名称：test_rolling_output.py
+模块职责：按大小滚动输出测试：文件在记录边界处切分且不超过目标字节数/记录数、拼接后与按页输出逐字节一致、
+         按字节预算生成时总量不超过预算且只差不足一条记录
+作者：D.C.Y.
+创建时间：2026/10/19 06:39:27
+最后修改时间：2026/10/19 06:39:27
+"""
+import json
+import os
+
+import generate_data_to_windows as windows_generator
+
+RUN_ARGS = ["--seed", "42", "--date", "20260101", "--page-size", "300"]
+ROLL_SIZE = 100 * 1024
+
+
+def read_files(root: str) -> list:
+    """
+    按文件序号读取 JSON 输出目录下的全部文件
+    :param root: 输出根目录
+    :return: 各文件内容
+    """
+    directory = os.path.join(root, "JobData-Json")
+    names = [name for name in os.listdir(directory) if not name.startswith("_")]
+    names.sort(key=lambda name: int(name[len("page"):-len(".json")]))
+    contents = []
+    for name in names:
+        with open(os.path.join(directory, name), "rb") as f:
+            contents.append(f.read())
+    return contents
+
+
+def parse_records(content: bytes) -> list:
+    """
+    解析一个逗号分隔的紧凑JSON文件
+    :param content: 文件内容
+    :return: 职位记录列表
+    """
+    return json.loads(f"[{content.decode('utf-8').rstrip(',')}]")
+
+
+def test_roll_size_splits_on_record_boundaries(tmp_path):
+    """
+    按字节数滚动时每个文件不超过目标大小且只含完整记录，拼接后与按页输出逐字节一致
+    """
+    windows_generator.main(RUN_ARGS + ["--page-count", "2", "--output-dir", str(tmp_path / "paged")])
+    windows_generator.main(RUN_ARGS + ["--page-count", "2", "--output-dir", str(tmp_path / "rolled"),
+                                       "--roll-size", "100KB"])
+    paged, rolled = read_files(str(tmp_path / "paged")), read_files(str(tmp_path / "rolled"))
+    assert len(rolled) > 2
+    assert all(len(content) <= ROLL_SIZE for content in rolled)
+    assert all(len(content) > ROLL_SIZE // 2 for content in rolled[:-1])
+    assert sum(len(parse_records(content)) for content in rolled) == 600
+    assert b"".join(rolled) == b"".join(paged)
+
+
+def test_roll_records_caps_records_per_file(tmp_path):
+    """
+    按记录数滚动时除最后一个文件外每个文件恰好包含指定条数
+    """
+    windows_generator.main(RUN_ARGS + ["--page-count", "2", "--output-dir", str(tmp_path), "--roll-records", "250"])
+    assert [len(parse_records(content)) for content in read_files(str(tmp_path))] == [250, 250, 100]
+
+
+def test_byte_budget_stops_just_below_the_budget(tmp_path):
+    """
+    按字节预算生成时忽略页数，总字节数不超过预算且剩余不足一条记录，输出是按页生成流的前缀
+    """
+    budget = 300 * 1024
+    windows_generator.main(RUN_ARGS + ["--page-count", "2", "--output-dir", str(tmp_path / "paged")])
+    windows_generator.main(RUN_ARGS + ["--output-dir", str(tmp_path / "budget"), "--max-bytes", "300KB",
+                                       "--roll-size", "100KB"])
+    budgeted = b"".join(read_files(str(tmp_path / "budget")))
+    paged_records = parse_records(b"".join(read_files(str(tmp_path / "paged"))))
+    records = parse_records(budgeted)
+    next_record = json.dumps(paged_records[len(records)], ensure_ascii=False, separators=(",", ":")) + ","
+    assert len(budgeted) <= budget < len(budgeted) + len(next_record.encode("utf-8"))
+    assert records == paged_records[:len(records)]
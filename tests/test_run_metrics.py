@@ -0,0 +1,102 @@
+"""
+模块名称：test_run_metrics.py
+模块职责：运行指标测试：数据块统计的计时与计数汇总、上传延迟直方图、Prometheus 文本与 JSON Lines 导出，
+         以及命令行运行结束时导出的记录数、字节数与分阶段耗时
+作者：D.C.Y.
+创建时间：2026/10/19 06:48:40
+最后修改时间：2026/10/19 06:48:40
+"""
+import json
+import os
+
+import generate_data_to_windows as windows_generator
+from run_metrics import (STAGES, UPLOAD_LATENCY_BUCKETS, RunMetrics, count_event, format_eta, format_prometheus,
+                         take_chunk_stats, timed_stage)
+
+RUN_ARGS = ["--seed", "42", "--date", "20260101", "--page-count", "2", "--page-size", "300"]
+
+
+def test_chunk_stats_are_taken_once_and_summed():
+    """
+    数据块统计取出后清空，多个数据块的记录数、事件计数与各阶段耗时在汇总时累加
+    """
+    metrics = RunMetrics(total_records=200)
+    take_chunk_stats()
+    for _ in range(2):
+        with timed_stage("generate"):
+            pass
+        count_event("validated", 10)
+        count_event("dropped")
+        count_event("fixed", 2)
+        stats = take_chunk_stats()
+        assert stats["generate_seconds"] >= 0 and stats["validated"] == 10
+        assert take_chunk_stats() == {}
+        metrics.add_chunk(dict(stats, records=100))
+    assert (metrics.records_generated, metrics.records_validated, metrics.records_dropped, metrics.records_fixed) \
+        == (200, 20, 2, 4)
+    assert set(metrics.stage_seconds) == set(STAGES)
+    assert metrics.eta() == 0
+
+
+def test_upload_latency_histogram_and_prometheus_text():
+    """
+    上传延迟按上界落入直方图，Prometheus 文本中的桶为累计计数，只有成功的尝试计入上传字节数
+    """
+    metrics = RunMetrics()
+    for seconds, succeeded in ((0.001, True), (0.2, True), (0.2, False), (60.0, True)):
+        metrics.observe_upload(seconds, 100, succeeded)
+    metrics.observe_retry()
+    metrics.observe_upload_failure()
+    snapshot = metrics.snapshot()
+    assert snapshot["eta_seconds"] is None
+    assert snapshot["upload_latency"]["count"] == 4
+    assert snapshot["upload_latency"]["buckets"]["0.005"] == 1
+    assert snapshot["upload_latency"]["buckets"]["0.25"] == 2
+    assert snapshot["upload_latency"]["buckets"]["+Inf"] == 1
+    assert (snapshot["uploads"], snapshot["upload_bytes"]) == (3, 300)
+
+    lines = format_prometheus(snapshot).splitlines()
+    assert 'jobgen_upload_latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'jobgen_upload_latency_seconds_bucket{le="0.25"} 3' in lines
+    assert 'jobgen_upload_latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert f'jobgen_upload_latency_seconds_bucket{{le="{UPLOAD_LATENCY_BUCKETS[-1]}"}} 3' in lines
+    assert "jobgen_upload_retries_total 1" in lines
+    assert "jobgen_upload_failures_total 1" in lines
+    assert "# TYPE jobgen_upload_latency_seconds histogram" in lines
+
+
+def test_format_eta():
+    """
+    剩余时间按分秒或时分显示，未知时为空
+    """
+    assert format_eta(None) == ""
+    assert format_eta(75.4) == " 剩余约 1m15s"
+    assert format_eta(3725) == " 剩余约 1h02m"
+
+
+def test_cli_exports_final_metrics(tmp_path):
+    """
+    命令行运行结束时导出的记录数与写入字节数和输出一致；JSON Lines 逐次追加，Prometheus 文件整体替换且不留临时文件
+    """
+    jsonl, prometheus = tmp_path / "metrics.jsonl", tmp_path / "metrics.prom"
+    windows_generator.main(RUN_ARGS + ["--output-dir", str(tmp_path / "out"), "--metrics-file", str(jsonl)])
+    windows_generator.main(RUN_ARGS + ["--output-dir", str(tmp_path / "out"), "--metrics-file", str(jsonl)])
+    windows_generator.main(RUN_ARGS + ["--output-dir", str(tmp_path / "out"), "--metrics-file", str(prometheus),
+                                       "--metrics-format", "prometheus"])
+
+    with open(jsonl, encoding="utf-8") as f:
+        snapshots = [json.loads(line) for line in f]
+    output_bytes = sum(os.path.getsize(tmp_path / "out" / "JobData-Json" / f"page{page}.json") for page in (1, 2))
+    assert len(snapshots) == 2
+    for snapshot in snapshots:
+        assert snapshot["records_generated"] == 600
+        assert snapshot["bytes_written"] == output_bytes
+        assert 0 < snapshot["records_validated"] <= 600
+        assert all(snapshot["stage_seconds"][stage] > 0 for stage in ("generate", "validate", "encode", "write"))
+        assert snapshot["stage_seconds"]["profile"] == 0
+
+    assert sorted(os.listdir(tmp_path)) == ["metrics.jsonl", "metrics.prom", "out"]
+    with open(prometheus, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert "jobgen_records_generated_total 600" in lines
+    assert f"jobgen_bytes_written_total {output_bytes}" in lines
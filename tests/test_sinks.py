@@ -0,0 +1,80 @@
+"""
+模块名称：test_sinks.py
+模块职责：扇出写入测试：记录只编码一次、按块同时写入多个输出目标，原子提交的输出目标出错时保留原有文件，输出目标基类不可直接实例化
+作者：D.C.Y.
+创建时间：2026/10/19 05:38:50
+最后修改时间：2026/10/19 05:38:50
+"""
+from typing import List
+
+import numpy as np
+import pytest
+
+from batch_generation import generate_batch_records
+from sinks import FanOutWriter, LocalFileSink, Sink, encode_records
+
+
+class RecordingSink(Sink):
+    """
+    记录收到的每个字节块的输出目标
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, chunk: bytes):
+        self.chunks.append(chunk)
+
+    def close(self):
+        self.closed = True
+
+
+def test_sink_base_requires_write():
+    """
+    输出目标基类是抽象类，未实现 write 的子类不能实例化
+    """
+    with pytest.raises(TypeError):
+        Sink()
+
+    class Incomplete(Sink):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_fan_out_writes_the_same_chunks_to_every_sink(tmp_path):
+    """
+    逐条写入与整页写入混用时，各输出目标收到同一组字节块（按块写出而不是逐条写出），内容与一次性编码的结果一致
+    """
+    records = generate_batch_records(300, np.random.default_rng(3))
+    first, second = RecordingSink(), RecordingSink()
+    with FanOutWriter([first, second, LocalFileSink(str(tmp_path / "page"))], chunk_size=4096) as writer:
+        for record in records[:100]:
+            writer.write_record(record)
+        writer.write_encoded(encode_records(records[100:]))
+    assert first.closed and second.closed
+    assert all(a is b for a, b in zip(first.chunks, second.chunks))
+    assert 1 < len(first.chunks) < 100
+    assert b"".join(first.chunks) == encode_records(records) == (tmp_path / "page").read_bytes()
+    assert writer.bytes_written == len(encode_records(records))
+
+
+def test_atomic_sink_keeps_the_previous_file_on_error(tmp_path):
+    """
+    原子提交的本地输出在写入中途出错时丢弃临时文件，已有的正式文件保持不变；正常关闭时替换正式文件
+    """
+    path = tmp_path / "page.json"
+    path.write_bytes(b"old")
+    with pytest.raises(RuntimeError):
+        with FanOutWriter([LocalFileSink(str(path), atomic=True)], chunk_size=1) as writer:
+            writer.write_encoded(b"new")
+            raise RuntimeError("interrupted")
+    assert path.read_bytes() == b"old"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["page.json"]
+
+    with FanOutWriter([LocalFileSink(str(path), atomic=True)]) as writer:
+        writer.write_encoded(b"new")
+    assert path.read_bytes() == b"new"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["page.json"]
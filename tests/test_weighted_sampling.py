@@ -0,0 +1,108 @@
+"""
+模块名称：test_weighted_sampling.py
+模块职责：加权抽样测试：别名表隐含的抽取概率与归一化权重一致、向量化与逐条抽取的频率符合权重、
+         字段权重配置的解析与校验，以及按权重生成的记录中各取值的频率
+作者：D.C.Y.
+创建时间：2026/10/19 07:05:23
+最后修改时间：2026/10/19 07:05:23
+"""
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from batch_generation import generate_batch_records
+from weighted_sampling import SKEWABLE_FIELDS, AliasTable, build_field_distributions, zipf_weights
+
+WEIGHTS = [
+    [1.0],
+    [1, 1, 1, 1],
+    [5, 0, 3, 2],
+    zipf_weights(50, 1.1),
+    [1e-9, 1.0, 1e9],
+]
+
+
+def implied_probabilities(table: AliasTable) -> np.ndarray:
+    """
+    由别名表计算每个下标被抽中的概率：本格保留的概率加上其他格以别名指向它的概率，除以格数
+    :param table: 别名表
+    :return: 概率数组
+    """
+    probabilities = table.prob.copy()
+    np.add.at(probabilities, table.alias, 1.0 - table.prob)
+    return probabilities / len(table)
+
+
+@pytest.mark.parametrize("weights", WEIGHTS)
+def test_alias_table_reproduces_normalized_weights(weights):
+    """
+    别名表隐含的抽取概率与归一化权重一致，权重为0的候选不会被抽中
+    """
+    table = AliasTable(weights)
+    expected = np.asarray(weights, dtype=np.float64) / sum(weights)
+    assert len(table) == len(weights)
+    np.testing.assert_allclose(implied_probabilities(table), expected, atol=1e-12)
+    assert ((table.prob >= 0) & (table.prob <= 1 + 1e-12)).all()
+
+
+@pytest.mark.parametrize("weights", WEIGHTS[1:4])
+def test_draw_and_sample_frequencies(weights):
+    """
+    向量化抽取与逐条抽取的频率都与权重相符（误差在 5 个标准差以内）
+    """
+    n = 200000
+    table = AliasTable(weights)
+    expected = np.asarray(weights, dtype=np.float64) / sum(weights)
+    tolerance = 5 * np.sqrt(expected * (1 - expected) / n) + 1e-12
+    drawn = np.bincount(table.draw(np.random.default_rng(3), n), minlength=len(weights)) / n
+    rng = random.Random(3)
+    sampled = np.bincount([table.sample(rng.random) for _ in range(n)], minlength=len(weights)) / n
+    assert (np.abs(drawn - expected) <= tolerance).all()
+    assert (np.abs(sampled - expected) <= tolerance).all()
+
+
+def test_invalid_weights_are_rejected():
+    """
+    空权重、负权重和全为0的权重构造失败
+    """
+    for weights in ([], [1, -1], [0, 0], [[1, 2]]):
+        with pytest.raises(ValueError):
+            AliasTable(weights)
+
+
+def test_field_distribution_spec():
+    """
+    字段简称映射到记录字段；Zipf 配置按候选值顺序偏斜；未知字段与未知候选值报错
+    """
+    distributions = build_field_distributions({"city": {"zipf": 1.0}, "education": {"本科": 3, "硕士": 1}})
+    assert set(distributions) == {"workAddress", "education"}
+    cities = implied_probabilities(distributions["workAddress"])
+    assert len(cities) == len(SKEWABLE_FIELDS["workAddress"])
+    assert (np.diff(cities) < 0).all()
+    education = dict(zip(SKEWABLE_FIELDS["education"], implied_probabilities(distributions["education"])))
+    assert education["本科"] == pytest.approx(0.75) and education["硕士"] == pytest.approx(0.25)
+    assert sum(probability for level, probability in education.items() if level not in ("本科", "硕士")) == 0
+    with pytest.raises(ValueError):
+        build_field_distributions({"salary": {"zipf": 1.0}})
+    with pytest.raises(ValueError):
+        build_field_distributions({"education": {"小学": 1}})
+    with pytest.raises(ValueError):
+        build_field_distributions({"education": 1.0})
+
+
+def test_weighted_records_follow_the_distribution():
+    """
+    按权重批量生成的记录中，学历只取配置的候选值且比例与权重相符，热门公司的出现次数按 Zipf 排名递减
+    """
+    distributions = build_field_distributions({"education": {"本科": 3, "硕士": 1}, "company": {"zipf": 1.5}})
+    records = generate_batch_records(20000, rng=np.random.default_rng(5), position_ids=list(range(20000)),
+                                     distributions=distributions)
+    education = Counter(record["education"] for record in records if record["education"] is not None)
+    assert set(education) == {"本科", "硕士"}
+    assert education["本科"] / sum(education.values()) == pytest.approx(0.75, abs=0.02)
+    companies = Counter(record["companyFullName"] for record in records)
+    top = [companies[name] for name in SKEWABLE_FIELDS["companyFullName"][:3]]
+    assert top[0] > top[1] > top[2]
+    assert top[0] / len(records) == pytest.approx(implied_probabilities(distributions["companyFullName"])[0], abs=0.02)